@@ -14,8 +14,45 @@ SHEET_SALES_INVOICES = "Sales Invoices"  # MyBillBook sales invoices
 SHEET_EXPENSES = "Expenses"  # MyBillBook expenses
 SHEET_INVOICE_LINE_ITEMS = "Invoice Line Items"  # Individual products sold per invoice
 
+# Large writes are split into chunks so a single request never hits the
+# Sheets API payload limit. A chunk ends at whichever limit is reached first.
+WRITE_CHUNK_ROWS = 5000
+WRITE_CHUNK_BYTES = 2 * 1024 * 1024  # ~2 MB of JSON per request
+WRITE_MAX_WORKERS = 1  # Parallel chunk uploads (1 = sequential)
+
+# Local read-through cache for whole-tab reads (see utils/sheet_cache.py)
+# A cached tab is reused while the spreadsheet's Drive revision is unchanged
+SHEETS_CACHE_ENABLED = True
+SHEETS_CACHE_DIR = ".sheets_cache"
+SHEETS_CACHE_PROBE_SECONDS = 5  # Reuse one revision check for back-to-back reads
+
+# Sheets API quotas (per user, per minute). All SheetsManager instances in a
+# process share one read and one write budget; calls past it wait their turn.
+SHEETS_READ_REQUESTS_PER_MINUTE = 60
+SHEETS_WRITE_REQUESTS_PER_MINUTE = 60
+SHEETS_REQUEST_BURST = 10  # Calls allowed back-to-back before spacing kicks in
+SHEETS_MAX_RETRIES = 5  # Retries for 429 / 5xx responses
+SHEETS_RETRY_MAX_DELAY = 32  # Seconds, cap for jittered exponential backoff
+
+# upsert_rows() rewrites the whole tab instead of patching it when more than
+# this share of the rows changed (a full rewrite is cheaper at that point)
+UPSERT_MAX_CHANGE_RATIO = 0.5
+
+# Transform 1 names and barcodes for new items
+# Deterministic mode derives them from a hash of each item's Type, Name and
+# prices (plus CODE_SEED), so rerunning on the same RAW data gives the same
+# Inventory, ADD and WePrint output. Set to False for fresh random codes
+# every run. Collisions are redrawn in both modes.
+DETERMINISTIC_CODES = True
+CODE_SEED = "swadha"
+
 # OAuth Scopes
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+# drive.metadata.readonly is only used to read the spreadsheet's revision
+# for the sheet cache (no file contents are accessed through Drive)
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive.metadata.readonly',
+]
 
 # Credentials file path
 CREDENTIALS_FILE = 'credentials.json'
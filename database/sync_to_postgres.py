@@ -7,7 +7,6 @@ Loads data from Google Sheets into the analytics database
 import sys
 import os
 from pathlib import Path
-from datetime import datetime
 import psycopg2
 from psycopg2.extras import execute_batch
 from dotenv import load_dotenv
@@ -19,6 +18,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 load_dotenv(Path(__file__).parent.parent / ".env")
 
 from utils.sheets import SheetsManager
+from utils.frames import frame_records
 from config import (
     SHEET_MYBILLBOOK_CURRENT,
     SHEET_SALES_INVOICES,
@@ -38,57 +38,190 @@ DB_CONFIG = {
 # Sheet names
 EXPENSE_LINE_ITEMS_SHEET = "Expense Line Items"
 
+# Sheet columns in INSERT order, with their types (see utils/frames.py).
+# The sheets are read with UNFORMATTED_VALUE, so numbers arrive as numbers
+# and date-formatted cells as serial numbers; no display text is re-parsed.
+
+# Inventory sheet -> mybillbook.products
+PRODUCTS_COLUMNS = [
+    ("ID", "str"),                      # product_id
+    ("Name", "str"),                    # product_name
+    ("SKU Code", "str"),                # sku_code
+    ("MRP", "float"),                   # mrp
+    ("Selling Price", "float"),         # selling_price
+    ("Sales Price", "float"),           # sales_price
+    ("Purchase Price", "float"),        # purchase_price
+    ("Wholesale Price", "float"),       # wholesale_price
+    ("Wholesale Min Qty", "float"),     # wholesale_min_qty
+    ("Quantity", "float"),              # quantity
+    ("Minimum Quantity", "float"),      # minimum_quantity
+    ("Unit", "str"),                    # unit
+    ("Unit Long", "str"),               # unit_long
+    ("GST %", "float"),                 # gst_percentage
+    ("Sales Tax Included", "bool"),     # sales_tax_included
+    ("Purchase Tax Included", "bool"),  # purchase_tax_included
+    ("Description", "str"),             # description
+    ("Item Type", "str"),               # item_type
+    ("Show on Store", "bool"),          # show_on_store
+    ("Excel Imported", "bool"),         # excel_imported
+    ("Created Date", "str"),            # created_at
+    ("Identification Code", "str"),     # identification_code
+    ("Conversion Factor", "float"),     # conversion_factor
+]
+
+# Sales Invoices sheet -> mybillbook.sales_invoices
+SALES_INVOICES_COLUMNS = [
+    ("ID", "str"),                      # invoice_id (ID column)
+    ("MBB ID", "str"),                  # mbb_id
+    ("Invoice Number", "str"),          # invoice_number
+    ("Serial Number", "str"),           # serial_number
+    ("Invoice Date", "date"),           # invoice_date
+    ("Contact ID", "str"),              # contact_id
+    ("Contact Name", "str"),            # contact_name
+    ("Contact Type", "str"),            # contact_type
+    ("Total Amount", "float"),          # total_amount
+    ("Paid Amount", "float"),           # paid_amount
+    ("Remaining Amount", "float"),      # remaining_amount
+    ("Payment Mode", "str"),            # payment_mode
+    ("Payment Type", "str"),            # payment_type
+    ("Bank Account ID", "str"),         # bank_account_id
+    ("Due Date", "date"),               # due_date
+    ("Status", "str"),                  # status
+    ("Created At", "str"),              # created_at
+    ("Share Link", "str"),              # share_link
+    ("Notes", "str"),                   # notes
+    ("Source", "str"),                  # source
+    ("Ledger Category", "str"),         # ledger_category
+    ("Convertable ID", "str"),          # convertable_id
+    ("Recurring ID", "str"),            # recurring_id
+    ("E-Invoice Status", "str"),        # einvoice_status
+]
+
+# Invoice Line Items sheet -> mybillbook.sales_invoice_line_items
+SALES_INVOICE_LINE_ITEMS_COLUMNS = [
+    ("Invoice Number", "str"),          # invoice_number
+    ("Invoice Date", "date"),           # invoice_date
+    ("Customer Name", "str"),           # customer_name
+    ("Contact ID", "str"),              # contact_id
+    ("Invoice Total", "float"),         # invoice_total
+    ("Payment Mode", "str"),            # payment_mode
+    ("Invoice Discount", "float"),      # invoice_discount
+    ("Invoice Discount Type", "str"),   # invoice_discount_type
+    ("Round Off", "float"),             # round_off
+    ("TCS Amount", "float"),            # tcs_amount
+    ("TDS Amount", "float"),            # tds_amount
+    ("Cess Amount", "float"),           # cess_amount
+    ("Additional Charges", "float"),    # additional_charges
+    ("Billing Address ID", "str"),      # billing_address_id
+    ("Shipping Address ID", "str"),     # shipping_address_id
+    ("Item Name", "str"),               # item_name
+    ("SKU Code", "str"),                # sku_code
+    ("Quantity", "float"),              # quantity
+    ("Unit", "str"),                    # unit
+    ("Selling Price", "float"),         # selling_price
+    ("Cost Price", "float"),            # cost_price
+    ("Profit", "float"),                # profit
+    ("Profit Margin %", "float"),       # profit_margin_percent
+    ("Item Discount", "float"),         # item_discount
+    ("Item Discount Type", "str"),      # item_discount_type
+    ("Item Discount Amount", "float"),  # item_discount_amount
+    ("GST %", "float"),                 # gst_percentage
+    ("Tax Included", "bool"),           # tax_included
+    ("Item Final Amount", "float"),     # item_final_amount
+    ("Item Type", "str"),               # item_type
+    ("MRP", "float"),                   # mrp
+    ("Description", "str"),             # description
+    ("Notes", "str"),                   # notes
+]
+
+# Expenses sheet -> mybillbook.expenses
+EXPENSES_COLUMNS = [
+    ("ID", "str"),                      # expense_id (ID column)
+    ("MBB ID", "str"),                  # mbb_id
+    ("Expense Number", "str"),          # expense_number
+    ("Serial Number", "str"),           # serial_number
+    ("Expense Date", "date"),           # expense_date
+    ("Expense Category", "str"),        # ledger_category_name
+    ("Line Items Count", "float"),      # line_items_count
+    ("Total Amount", "float"),          # total_amount
+    ("Paid Amount", "float"),           # paid_amount
+    ("Payment Mode", "str"),            # payment_mode
+    ("Payment Type", "str"),            # payment_type
+    ("Created At", "str"),              # created_at
+    ("Notes", "str"),                   # notes
+    ("Source", "str"),                  # source
+    ("Bank Account ID", "str"),         # bank_account_id
+    ("Contact Name", "str"),            # contact_name
+    ("Contact ID", "str"),              # contact_id
+    ("Share Link", "str"),              # share_link
+]
+
+# Expense Line Items sheet -> mybillbook.expense_line_items
+EXPENSE_LINE_ITEMS_COLUMNS = [
+    ("Expense Number", "str"),          # expense_number
+    ("Expense Date", "date"),           # expense_date
+    ("Expense Category", "str"),        # expense_category
+    ("Expense Category ID", "str"),     # expense_category_id
+    ("Expense Total", "float"),         # expense_total
+    ("Payment Mode", "str"),            # payment_mode
+    ("Payment Type", "str"),            # payment_type
+    ("Expense Discount", "float"),      # expense_discount
+    ("Expense Discount Type", "str"),   # expense_discount_type
+    ("Round Off", "float"),             # round_off
+    ("Place of Supply", "str"),         # place_of_supply
+    ("Contact Name", "str"),            # contact_name
+    ("Contact ID", "str"),              # contact_id
+    ("Item Name", "str"),               # item_name
+    ("Item ID", "str"),                 # item_id
+    ("Ledger ID", "str"),               # ledger_id
+    ("Quantity", "float"),              # quantity
+    ("Unit", "str"),                    # unit
+    ("Unit Long", "str"),               # unit_long
+    ("Price Per Unit", "float"),        # price_per_unit
+    ("Rate", "float"),                  # rate
+    ("Item Total Amount", "float"),     # item_total_amount
+    ("Item Discount", "float"),         # item_discount
+    ("Item Discount Type", "str"),      # item_discount_type
+    ("GST %", "float"),                 # gst_percentage
+    ("Tax Included", "bool"),           # tax_included
+    ("Tax Applicable", "bool"),         # tax_applicable
+    ("Tax Exempted", "bool"),           # tax_exempted
+    ("ITC Type", "str"),                # itc_type
+    ("Item Type", "str"),               # item_type
+    ("Identification Code", "str"),     # identification_code
+    ("Notes", "str"),                   # notes
+    ("Source", "str"),                  # source
+]
+
 
 def get_db_connection():
     """Create PostgreSQL connection"""
     return psycopg2.connect(**DB_CONFIG)
 
 
-def parse_date(date_str):
-    """Parse date string to date object"""
-    if not date_str:
-        return None
-    try:
-        # Try different formats
-        for fmt in ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d"]:
-            try:
-                return datetime.strptime(str(date_str), fmt).date()
-            except ValueError:
-                continue
-        return None
-    except Exception:
-        return None
-
-
-def parse_float(value):
-    """Parse numeric value, handling commas"""
-    if value is None or value == "":
-        return None
-    try:
-        return float(str(value).replace(",", ""))
-    except (ValueError, TypeError):
-        return None
-
+def has_rows(frame, columns):
+    """
+    Whether a sheet frame has data rows, warning about missing columns
 
-def parse_bool(value):
-    """Parse boolean value"""
-    if value is None:
-        return None
-    return str(value).lower() in ("yes", "true", "1")
+    Missing columns are loaded as NULL, so a renamed header shows up here
+    rather than as a silently empty database column.
+    """
+    if frame.empty:
+        return False
+    missing = [name for name, _ in columns if name not in frame.columns]
+    if missing:
+        print(f"  [WARN] Columns not found in the sheet (loaded as NULL): {', '.join(missing)}")
+    return True
 
 
-def sync_products(conn, sheets_manager):
-    """Sync products/inventory to PostgreSQL"""
+def sync_products(conn, frame):
+    """Sync products/inventory to PostgreSQL (frame: DataFrame of the sheet, see PRODUCTS_COLUMNS)"""
     print("\nSyncing Products (Inventory)...")
 
-    data = sheets_manager.read_sheet(SHEET_MYBILLBOOK_CURRENT)
-    if not data or len(data) < 2:
+    if not has_rows(frame, PRODUCTS_COLUMNS):
         print("  No product data found")
         return 0
 
-    headers = data[0]
-    rows = data[1:]
-
     cursor = conn.cursor()
 
     # Clear existing data
@@ -109,36 +242,7 @@ def sync_products(conn, sheets_manager):
         )
     """
 
-    batch_data = []
-    for row in rows:
-        # Pad row to expected length
-        row = row + [""] * (24 - len(row)) if len(row) < 24 else row
-
-        batch_data.append((
-            str(row[0]) if row[0] else None,  # product_id
-            row[1] or None,  # product_name
-            row[2] or None,  # sku_code
-            parse_float(row[4]),  # mrp
-            parse_float(row[5]),  # selling_price
-            parse_float(row[6]),  # sales_price
-            parse_float(row[7]),  # purchase_price
-            parse_float(row[8]),  # wholesale_price
-            parse_float(row[9]),  # wholesale_min_qty
-            parse_float(row[10]),  # quantity
-            parse_float(row[11]),  # minimum_quantity
-            row[12] or None,  # unit
-            row[13] or None,  # unit_long
-            parse_float(row[14]),  # gst_percentage
-            parse_bool(row[15]),  # sales_tax_included
-            parse_bool(row[16]),  # purchase_tax_included
-            row[17] or None,  # description
-            row[18] or None,  # item_type
-            parse_bool(row[19]),  # show_on_store
-            parse_bool(row[20]),  # excel_imported
-            row[21] or None,  # created_at
-            row[22] or None,  # identification_code
-            parse_float(row[23]),  # conversion_factor
-        ))
+    batch_data = frame_records(frame, [name for name, _ in PRODUCTS_COLUMNS])
 
     execute_batch(cursor, insert_sql, batch_data)
     conn.commit()
@@ -147,8 +251,8 @@ def sync_products(conn, sheets_manager):
     return len(batch_data)
 
 
-def sync_contacts_from_invoices(conn, sheets_manager):
-    """Extract and sync unique contacts from invoices and expenses"""
+def sync_contacts_from_invoices(conn, invoice_frame, expense_frame):
+    """Extract and sync unique contacts from invoices and expenses (DataFrames of each sheet)"""
     print("\nSyncing Contacts...")
 
     cursor = conn.cursor()
@@ -157,28 +261,24 @@ def sync_contacts_from_invoices(conn, sheets_manager):
     contacts = {}
 
     # Extract from Sales Invoices
-    data = sheets_manager.read_sheet(SHEET_SALES_INVOICES)
-    if data and len(data) > 1:
-        for row in data[1:]:
-            row = row + [""] * (24 - len(row)) if len(row) < 24 else row
-            contact_id = row[5]  # Contact ID
+    if has_rows(invoice_frame, [("Contact ID", "str"), ("Contact Name", "str"), ("Contact Type", "str")]):
+        invoice_contacts = invoice_frame.reindex(columns=["Contact ID", "Contact Name", "Contact Type"]).fillna("")
+        for contact_id, contact_name, contact_type in invoice_contacts.itertuples(index=False, name=None):
             if contact_id and contact_id not in contacts:
                 contacts[contact_id] = {
                     "contact_id": contact_id,
-                    "contact_name": row[3] or "Unknown",  # Contact Name
-                    "contact_type": row[4] or "Customer",  # Contact Type
+                    "contact_name": contact_name or "Unknown",
+                    "contact_type": contact_type or "Customer",
                 }
 
     # Extract from Expenses
-    data = sheets_manager.read_sheet(SHEET_EXPENSES)
-    if data and len(data) > 1:
-        for row in data[1:]:
-            row = row + [""] * (19 - len(row)) if len(row) < 19 else row
-            contact_id = row[17]  # Contact ID
+    if has_rows(expense_frame, [("Contact ID", "str"), ("Contact Name", "str")]):
+        expense_contacts = expense_frame.reindex(columns=["Contact ID", "Contact Name"]).fillna("")
+        for contact_id, contact_name in expense_contacts.itertuples(index=False, name=None):
             if contact_id and contact_id not in contacts:
                 contacts[contact_id] = {
                     "contact_id": contact_id,
-                    "contact_name": row[16] or "Unknown",  # Contact Name
+                    "contact_name": contact_name or "Unknown",
                     "contact_type": "Vendor",
                 }
 
@@ -200,16 +300,14 @@ def sync_contacts_from_invoices(conn, sheets_manager):
     return len(batch_data)
 
 
-def sync_sales_invoices(conn, sheets_manager):
-    """Sync sales invoices to PostgreSQL"""
+def sync_sales_invoices(conn, frame):
+    """Sync sales invoices to PostgreSQL (frame: DataFrame of the sheet, see SALES_INVOICES_COLUMNS)"""
     print("\nSyncing Sales Invoices...")
 
-    data = sheets_manager.read_sheet(SHEET_SALES_INVOICES)
-    if not data or len(data) < 2:
+    if not has_rows(frame, SALES_INVOICES_COLUMNS):
         print("  No invoice data found")
         return 0
 
-    rows = data[1:]
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM mybillbook.sales_invoices")
@@ -229,36 +327,7 @@ def sync_sales_invoices(conn, sheets_manager):
         )
     """
 
-    batch_data = []
-    for row in rows:
-        row = row + [""] * (24 - len(row)) if len(row) < 24 else row
-
-        batch_data.append((
-            row[14] or None,  # invoice_id (ID column)
-            row[15] or None,  # mbb_id
-            row[0] or None,   # invoice_number
-            row[2] or None,   # serial_number
-            parse_date(row[1]),  # invoice_date
-            row[5] or None,   # contact_id
-            row[3] or None,   # contact_name
-            row[4] or None,   # contact_type
-            parse_float(row[6]),   # total_amount
-            parse_float(row[7]),   # paid_amount
-            parse_float(row[8]),   # remaining_amount
-            row[9] or None,   # payment_mode
-            row[10] or None,  # payment_type
-            row[20] or None,  # bank_account_id
-            parse_date(row[11]),  # due_date
-            row[12] or None,  # status
-            row[13] or None,  # created_at
-            row[16] or None,  # share_link
-            row[17] or None,  # notes
-            row[18] or None,  # source
-            row[19] or None,  # ledger_category
-            row[21] or None,  # convertable_id
-            row[22] or None,  # recurring_id
-            row[23] or None,  # einvoice_status
-        ))
+    batch_data = frame_records(frame, [name for name, _ in SALES_INVOICES_COLUMNS])
 
     execute_batch(cursor, insert_sql, batch_data)
     conn.commit()
@@ -267,16 +336,14 @@ def sync_sales_invoices(conn, sheets_manager):
     return len(batch_data)
 
 
-def sync_sales_invoice_line_items(conn, sheets_manager):
-    """Sync invoice line items to PostgreSQL"""
+def sync_sales_invoice_line_items(conn, frame):
+    """Sync invoice line items to PostgreSQL (frame: DataFrame of the sheet, see SALES_INVOICE_LINE_ITEMS_COLUMNS)"""
     print("\nSyncing Sales Invoice Line Items...")
 
-    data = sheets_manager.read_sheet(SHEET_INVOICE_LINE_ITEMS)
-    if not data or len(data) < 2:
+    if not has_rows(frame, SALES_INVOICE_LINE_ITEMS_COLUMNS):
         print("  No line item data found")
         return 0
 
-    rows = data[1:]
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM mybillbook.sales_invoice_line_items")
@@ -299,45 +366,7 @@ def sync_sales_invoice_line_items(conn, sheets_manager):
         )
     """
 
-    batch_data = []
-    for row in rows:
-        row = row + [""] * (33 - len(row)) if len(row) < 33 else row
-
-        batch_data.append((
-            row[0] or None,   # invoice_number
-            parse_date(row[1]),  # invoice_date
-            row[2] or None,   # customer_name
-            row[3] or None,   # contact_id
-            parse_float(row[4]),   # invoice_total
-            row[5] or None,   # payment_mode
-            parse_float(row[6]),   # invoice_discount
-            row[7] or None,   # invoice_discount_type
-            parse_float(row[8]),   # round_off
-            parse_float(row[9]),   # tcs_amount
-            parse_float(row[10]),  # tds_amount
-            parse_float(row[11]),  # cess_amount
-            parse_float(row[12]),  # additional_charges
-            row[13] or None,  # billing_address_id
-            row[14] or None,  # shipping_address_id
-            row[15] or None,  # item_name
-            row[16] or None,  # sku_code
-            parse_float(row[17]),  # quantity
-            row[18] or None,  # unit
-            parse_float(row[19]),  # selling_price
-            parse_float(row[20]),  # cost_price
-            parse_float(row[21]),  # profit
-            parse_float(row[22]),  # profit_margin_percent
-            parse_float(row[23]),  # item_discount
-            row[24] or None,  # item_discount_type
-            parse_float(row[25]),  # item_discount_amount
-            parse_float(row[26]),  # gst_percentage
-            parse_bool(row[27]),  # tax_included
-            parse_float(row[28]),  # item_final_amount
-            row[29] or None,  # item_type
-            parse_float(row[30]),  # mrp
-            row[31] or None,  # description
-            row[32] or None,  # notes
-        ))
+    batch_data = frame_records(frame, [name for name, _ in SALES_INVOICE_LINE_ITEMS_COLUMNS])
 
     execute_batch(cursor, insert_sql, batch_data)
     conn.commit()
@@ -346,16 +375,14 @@ def sync_sales_invoice_line_items(conn, sheets_manager):
     return len(batch_data)
 
 
-def sync_expenses(conn, sheets_manager):
-    """Sync expenses to PostgreSQL"""
+def sync_expenses(conn, frame):
+    """Sync expenses to PostgreSQL (frame: DataFrame of the sheet, see EXPENSES_COLUMNS)"""
     print("\nSyncing Expenses...")
 
-    data = sheets_manager.read_sheet(SHEET_EXPENSES)
-    if not data or len(data) < 2:
+    if not has_rows(frame, EXPENSES_COLUMNS):
         print("  No expense data found")
         return 0
 
-    rows = data[1:]
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM mybillbook.expenses")
@@ -372,30 +399,7 @@ def sync_expenses(conn, sheets_manager):
         )
     """
 
-    batch_data = []
-    for row in rows:
-        row = row + [""] * (19 - len(row)) if len(row) < 19 else row
-
-        batch_data.append((
-            row[11] or None,  # expense_id (ID column)
-            row[12] or None,  # mbb_id
-            row[0] or None,   # expense_number
-            row[2] or None,   # serial_number
-            parse_date(row[1]),  # expense_date
-            row[3] or None,   # ledger_category_name
-            parse_float(row[5]),  # line_items_count
-            parse_float(row[6]),  # total_amount
-            parse_float(row[7]),  # paid_amount
-            row[8] or None,   # payment_mode
-            row[9] or None,   # payment_type
-            row[10] or None,  # created_at
-            row[13] or None,  # notes
-            row[14] or None,  # source
-            row[15] or None,  # bank_account_id
-            row[16] or None,  # contact_name
-            row[17] or None,  # contact_id
-            row[18] or None,  # share_link
-        ))
+    batch_data = frame_records(frame, [name for name, _ in EXPENSES_COLUMNS])
 
     execute_batch(cursor, insert_sql, batch_data)
     conn.commit()
@@ -404,16 +408,14 @@ def sync_expenses(conn, sheets_manager):
     return len(batch_data)
 
 
-def sync_expense_line_items(conn, sheets_manager):
-    """Sync expense line items to PostgreSQL"""
+def sync_expense_line_items(conn, frame):
+    """Sync expense line items to PostgreSQL (frame: DataFrame of the sheet, see EXPENSE_LINE_ITEMS_COLUMNS)"""
     print("\nSyncing Expense Line Items...")
 
-    data = sheets_manager.read_sheet(EXPENSE_LINE_ITEMS_SHEET)
-    if not data or len(data) < 2:
+    if not has_rows(frame, EXPENSE_LINE_ITEMS_COLUMNS):
         print("  No expense line item data found")
         return 0
 
-    rows = data[1:]
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM mybillbook.expense_line_items")
@@ -435,45 +437,7 @@ def sync_expense_line_items(conn, sheets_manager):
         )
     """
 
-    batch_data = []
-    for row in rows:
-        row = row + [""] * (33 - len(row)) if len(row) < 33 else row
-
-        batch_data.append((
-            row[0] or None,   # expense_number
-            parse_date(row[1]),  # expense_date
-            row[2] or None,   # expense_category
-            row[3] or None,   # expense_category_id
-            parse_float(row[4]),  # expense_total
-            row[5] or None,   # payment_mode
-            row[6] or None,   # payment_type
-            parse_float(row[7]),  # expense_discount
-            row[8] or None,   # expense_discount_type
-            parse_float(row[9]),  # round_off
-            row[10] or None,  # place_of_supply
-            row[11] or None,  # contact_name
-            row[12] or None,  # contact_id
-            row[13] or None,  # item_name
-            row[14] or None,  # item_id
-            row[15] or None,  # ledger_id
-            parse_float(row[16]),  # quantity
-            row[17] or None,  # unit
-            row[18] or None,  # unit_long
-            parse_float(row[19]),  # price_per_unit
-            parse_float(row[20]),  # rate
-            parse_float(row[21]),  # item_total_amount
-            parse_float(row[22]),  # item_discount
-            row[23] or None,  # item_discount_type
-            parse_float(row[24]),  # gst_percentage
-            parse_bool(row[25]),  # tax_included
-            parse_bool(row[26]),  # tax_applicable
-            parse_bool(row[27]),  # tax_exempted
-            row[28] or None,  # itc_type
-            row[29] or None,  # item_type
-            row[30] or None,  # identification_code
-            row[31] or None,  # notes
-            row[32] or None,  # source
-        ))
+    batch_data = frame_records(frame, [name for name, _ in EXPENSE_LINE_ITEMS_COLUMNS])
 
     execute_batch(cursor, insert_sql, batch_data)
     conn.commit()
@@ -502,12 +466,23 @@ def main():
         # Sync all data
         total_records = 0
 
-        total_records += sync_contacts_from_invoices(conn, sheets)
-        total_records += sync_products(conn, sheets)
-        total_records += sync_sales_invoices(conn, sheets)
-        total_records += sync_sales_invoice_line_items(conn, sheets)
-        total_records += sync_expenses(conn, sheets)
-        total_records += sync_expense_line_items(conn, sheets)
+        # Read every tab once, in a single batchGet round trip, as typed frames
+        print("\nReading Google Sheets data...")
+        frames = sheets.read_frames({
+            SHEET_MYBILLBOOK_CURRENT: dict(PRODUCTS_COLUMNS),
+            SHEET_SALES_INVOICES: dict(SALES_INVOICES_COLUMNS),
+            SHEET_INVOICE_LINE_ITEMS: dict(SALES_INVOICE_LINE_ITEMS_COLUMNS),
+            SHEET_EXPENSES: dict(EXPENSES_COLUMNS),
+            EXPENSE_LINE_ITEMS_SHEET: dict(EXPENSE_LINE_ITEMS_COLUMNS),
+        })
+
+        total_records += sync_contacts_from_invoices(
+            conn, frames[SHEET_SALES_INVOICES], frames[SHEET_EXPENSES])
+        total_records += sync_products(conn, frames[SHEET_MYBILLBOOK_CURRENT])
+        total_records += sync_sales_invoices(conn, frames[SHEET_SALES_INVOICES])
+        total_records += sync_sales_invoice_line_items(conn, frames[SHEET_INVOICE_LINE_ITEMS])
+        total_records += sync_expenses(conn, frames[SHEET_EXPENSES])
+        total_records += sync_expense_line_items(conn, frames[EXPENSE_LINE_ITEMS_SHEET])
 
         print("\n" + "=" * 60)
         print(f"[SUCCESS] Synced {total_records} total records to PostgreSQL")
@@ -2,21 +2,105 @@
 MyBillBook API Client
 """
 
+import math
 import requests
+import threading
 import time
-from typing import Optional, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterator
 from mybillbook.config import (
     BASE_URL,
     get_headers,
     REQUEST_TIMEOUT,
     RETRY_ATTEMPTS,
     RETRY_DELAY,
+    ITEMS_PER_PAGE,
+    VOUCHERS_PER_PAGE,
+    MAX_CONCURRENT_REQUESTS,
+    REQUESTS_PER_SECOND,
+    ADAPTIVE_TUNING,
+    TUNING_FILE,
+    VOUCHERS_MIN_PER_PAGE,
+    VOUCHERS_MAX_PER_PAGE,
+    MAX_CONCURRENCY_LIMIT,
+    SLOW_RESPONSE_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_MIN,
 )
+from mybillbook.tuning import AdaptiveController
+from utils.circuit_breaker import CircuitBreaker, RetryBudget
+from utils.rate_limit import TokenBucket
+
+# Status codes worth retrying: rate limited or a temporary server problem
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class VoucherStream:
+    """
+    Vouchers yielded page by page as they arrive
+
+    Returned by MyBillBookAPI.iter_sales_invoices / iter_expenses so callers
+    can build rows (or start fetching details) while later pages are still
+    being fetched, without holding the whole voucher list. Iterate it once;
+    afterwards `complete` says whether every page arrived and the voucher
+    count matched the reported total.
+
+    Usage:
+        stream = api.iter_sales_invoices(start_date=..., end_date=...)
+        for voucher in stream:
+            ...
+        if not stream.complete:
+            ...  # some vouchers are missing
+    """
+
+    def __init__(self, pages):
+        """
+        Args:
+            pages: Function taking this stream and yielding lists of vouchers
+                in page order; it sets total_count and complete as it goes
+        """
+        self._pages = pages
+        self.total_count = None
+        self.complete = False
+        self.fetched = 0
+
+    @classmethod
+    def from_result(cls, result: Optional[Dict[str, Any]]) -> "VoucherStream":
+        """Stream over an already fetched get_sales_invoices/get_expenses result"""
+        def pages(stream):
+            result_ = result or {}
+            stream.total_count = result_.get("total_count", 0)
+            stream.complete = bool(result) and "vouchers" in result_ and result_.get("complete", True)
+            yield result_.get("vouchers", [])
+        return cls(pages)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Vouchers can shift between pages while we read; keep the first copy
+        seen_ids = set()
+        for vouchers in self._pages(self):
+            for voucher in vouchers:
+                voucher_id = voucher.get("id")
+                if voucher_id is not None:
+                    if voucher_id in seen_ids:
+                        continue
+                    seen_ids.add(voucher_id)
+                self.fetched += 1
+                yield voucher
 
 
 class MyBillBookAPI:
     """Handles API requests to MyBillBook"""
 
+    # One request budget for every client and worker thread in the process
+    _rate_limiter = TokenBucket(REQUESTS_PER_SECOND, per=1, capacity=REQUESTS_PER_SECOND)
+    # Likewise one circuit breaker and one retry budget for the whole run,
+    # replaced at the start of each sync (see start_run)
+    _breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+    _retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN)
+
     def __init__(self):
         self.base_url = BASE_URL
         self.headers = get_headers()
@@ -33,225 +117,681 @@ class MyBillBookAPI:
                     print(f"Warning: Skipping header {key} due to encoding issue")
                     pass
 
+        # Worker threads each get their own Session (see _get_session)
+        self._local = threading.local()
+        self._local.session = self.session
+        self._sessions = [self.session]
+        self._sessions_lock = threading.Lock()
+
+        # Controller for the run in progress, told about 429s (see _get_vouchers)
+        self._tuner = None
+
+    def _get_session(self) -> requests.Session:
+        """Session for the current thread, sharing the main session's headers"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.session.headers)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        """Close the connection pools of every thread's Session"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _make_request(
         self,
         endpoint: str,
         method: str = "GET",
         params: Optional[Dict] = None,
         data: Optional[Dict] = None,
-        retry_count: int = 0,
     ) -> Optional[Dict[str, Any]]:
-        """Make an API request with retry logic"""
-        url = f"{self.base_url}{endpoint}"
-
-        try:
-            if method == "GET":
-                response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUT)
-            elif method == "POST":
-                response = self.session.post(
-                    url, json=data, params=params, timeout=REQUEST_TIMEOUT
-                )
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+        """
+        Make an API request, retrying timeouts, connection errors, 429s and 5xx
 
-            response.raise_for_status()
-            return response.json()
+        Requests go through the shared circuit breaker: while it's open they
+        return None straight away instead of waiting out REQUEST_TIMEOUT.
+        Retries come out of the run's shared retry budget.
+        """
+        url = f"{self.base_url}{endpoint}"
 
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP Error: {e}")
-            if response.status_code == 401:
-                print("[ERROR] Authentication failed. Please check your MyBillBook credentials in .env")
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            if not self._breaker.allow():
                 return None
-            elif response.status_code == 429:
-                print("Rate limit exceeded. Waiting before retry...")
-                if retry_count < RETRY_ATTEMPTS:
-                    time.sleep(RETRY_DELAY * (retry_count + 1))
-                    return self._make_request(
-                        endpoint, method, params, data, retry_count + 1
+            self._rate_limiter.acquire()
+            self._retry_budget.record_request()
+            delay = RETRY_DELAY
+
+            try:
+                if method == "GET":
+                    response = self._get_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+                elif method == "POST":
+                    response = self._get_session().post(
+                        url, json=data, params=params, timeout=REQUEST_TIMEOUT
                     )
+                else:
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+            except requests.exceptions.ConnectionError:
+                print("[ERROR] Connection error. Please check your internet connection.")
+                self._record_failure()
+            except requests.exceptions.Timeout:
+                print("[ERROR] Request timed out.")
+                self._record_failure()
+            except Exception as e:
+                print(f"[ERROR] Unexpected error: {e}")
+                self._record_failure()  # Also releases a half-open probe
+                return None
             else:
-                print(f"Status Code: {response.status_code}")
-
-        except requests.exceptions.ConnectionError:
-            print("[ERROR] Connection error. Please check your internet connection.")
-            if retry_count < RETRY_ATTEMPTS:
-                print(f"Retrying... (Attempt {retry_count + 1}/{RETRY_ATTEMPTS})")
-                time.sleep(RETRY_DELAY)
-                return self._make_request(
-                    endpoint, method, params, data, retry_count + 1
-                )
-
-        except requests.exceptions.Timeout:
-            print("[ERROR] Request timed out.")
-            if retry_count < RETRY_ATTEMPTS:
-                print(f"Retrying... (Attempt {retry_count + 1}/{RETRY_ATTEMPTS})")
-                time.sleep(RETRY_DELAY)
-                return self._make_request(
-                    endpoint, method, params, data, retry_count + 1
-                )
-
-        except Exception as e:
-            print(f"[ERROR] Unexpected error: {e}")
+                status = response.status_code
+                if status >= 500:
+                    print(f"HTTP Error: {status} for {endpoint}")
+                    self._record_failure()
+                    if status not in RETRYABLE_STATUS_CODES:
+                        return None
+                else:
+                    # Any other answer means the service is up
+                    self._breaker.record_success()
+                    if status == 401:
+                        print("[ERROR] Authentication failed. Please check your MyBillBook credentials in .env")
+                        return None
+                    if status == 429:
+                        print("Rate limit exceeded. Waiting before retry...")
+                        if self._tuner:
+                            self._tuner.record_throttle()
+                        delay = RETRY_DELAY * (attempt + 1)
+                    elif status >= 400:
+                        print(f"HTTP Error: {status} for {endpoint}")
+                        return None
+                    else:
+                        try:
+                            return response.json()
+                        except ValueError:
+                            print(f"[ERROR] Invalid JSON from {endpoint}")
+                            return None
+
+            if attempt == RETRY_ATTEMPTS or self._breaker.is_open:
+                break
+            if not self.allow_retry():
+                break
+            print(f"Retrying... (Attempt {attempt + 1}/{RETRY_ATTEMPTS})")
+            time.sleep(delay)
 
         return None
 
-    def get_all_items(self, per_page: int = 500) -> Optional[Dict[str, Any]]:
+    @classmethod
+    def start_run(cls):
         """
-        Fetch all inventory items
+        Give a new sync its own circuit breaker and retry budget
+
+        The process can outlive a run (the Streamlit app handles many), so
+        without this a breaker opened in one run would still be open in the
+        next and the retry budget would carry over.
+        """
+        cls._breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+        cls._retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN)
+
+    @classmethod
+    def _record_failure(cls):
+        """Tell the shared circuit breaker a request failed, announcing when it opens"""
+        if cls._breaker.record_failure():
+            print(f"[ERROR] MyBillBook is not responding; pausing requests for {CIRCUIT_RESET_SECONDS}s "
+                  f"before trying again")
+
+    @property
+    def circuit_open(self) -> bool:
+        """True while the shared circuit breaker is failing requests fast"""
+        return self._breaker.is_open
+
+    @classmethod
+    def allow_retry(cls) -> bool:
+        """Take one retry from the run's retry budget (False once it's used up)"""
+        if cls._retry_budget.try_spend():
+            return True
+        if cls._retry_budget.denied == 1:
+            print("[WARN] Retry budget for this run is used up; failed requests won't be retried")
+        return False
+
+    def _fetch_page(
+        self,
+        endpoint: str,
+        params: Dict,
+        page: int,
+        tuner: Optional[AdaptiveController] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch one page, reporting its latency and outcome to the tuner if given"""
+        if tuner is None:
+            return self._make_request(endpoint, params={**params, "page": page})
+
+        with tuner.slot():
+            started = time.monotonic()
+            result = self._make_request(endpoint, params={**params, "page": page})
+            tuner.record(time.monotonic() - started, result is not None)
+        return result
+
+    def _fetch_pages(
+        self,
+        endpoint: str,
+        params: Dict,
+        pages: List[int],
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        tuner: Optional[AdaptiveController] = None,
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Fetch several pages of a list endpoint in parallel
 
         Args:
-            per_page: Number of items per page (default 500)
+            endpoint: API endpoint (e.g. "/items")
+            params: Query parameters shared by every page ("page" is filled in)
+            pages: Page numbers to fetch
+            max_workers: Maximum requests in flight
+            tuner: Optional AdaptiveController; its current concurrency then
+                limits requests in flight (max_workers is ignored)
 
         Returns:
-            Dictionary with inventory_items and total_count
+            Dict of page number -> response (None for a page that failed)
         """
-        print("Fetching inventory from MyBillBook API...")
-        params = {"page": 1, "per_page": per_page}
-        return self._make_request("/items", params=params)
+        def fetch(page):
+            return self._fetch_page(endpoint, params, page, tuner)
 
-    def get_sales_invoices(
+        if not pages:
+            return {}
+        if tuner is not None:
+            max_workers = tuner.max_concurrency
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as executor:
+            return dict(zip(pages, executor.map(fetch, pages)))
+
+    def _iter_pages(
         self,
-        per_page: int = 15,
-        start_date: str = None,
-        end_date: str = None,
-        status: str = "final",
+        endpoint: str,
+        params: Dict,
+        pages,
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        tuner: Optional[AdaptiveController] = None,
+    ):
+        """
+        Like _fetch_pages, but yields (page, response) in page order as soon
+        as each page and those before it have arrived. At most two requests
+        per worker run ahead of the consumer.
+        """
+        pages = iter(pages)
+        if tuner is not None:
+            max_workers = tuner.max_concurrency
+        max_workers = max(1, max_workers)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit_next():
+                page = next(pages, None)
+                if page is None:
+                    return False
+                pending.append((page, executor.submit(self._fetch_page, endpoint, params, page, tuner)))
+                return True
+
+            while len(pending) < max_workers * 2 and submit_next():
+                pass
+
+            while pending:
+                page, future = pending.popleft()
+                result = future.result()
+                submit_next()
+                yield page, result
+
+    @staticmethod
+    def _voucher_tuner() -> Optional[AdaptiveController]:
+        """Controller with the /vouchers settings learned on earlier runs"""
+        if not ADAPTIVE_TUNING:
+            return None
+        return AdaptiveController(
+            "vouchers",
+            per_page=VOUCHERS_PER_PAGE,
+            concurrency=MAX_CONCURRENT_REQUESTS,
+            min_per_page=VOUCHERS_MIN_PER_PAGE,
+            max_per_page=VOUCHERS_MAX_PER_PAGE,
+            max_concurrency=MAX_CONCURRENCY_LIMIT,
+            slow_seconds=SLOW_RESPONSE_SECONDS,
+            state_file=TUNING_FILE,
+        )
+
+    def get_all_items(
+        self,
+        per_page: int = ITEMS_PER_PAGE,
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
     ) -> Optional[Dict[str, Any]]:
         """
-        Fetch sales invoices (vouchers) with automatic pagination to get ALL invoices
+        Fetch all inventory items, across every page
+
+        The first page's total_count fixes the number of pages up front; the
+        remaining pages are fetched in parallel and the assembled list is
+        checked against total_count.
 
         Args:
-            per_page: Number of invoices per page (default 15, safe page size)
-            start_date: Start date filter (YYYY-MM-DD format)
-            end_date: End date filter (YYYY-MM-DD format)
-            status: Invoice status filter (default "final")
+            per_page: Number of items per page (default 500)
+            max_workers: Maximum pages fetched at once
 
         Returns:
-            Dictionary with all vouchers collected from all pages
+            Dictionary with inventory_items, total_count and complete (False
+            if a page failed or the item count doesn't match total_count),
+            or None if the first page could not be fetched
         """
-        print("Fetching sales invoices from MyBillBook API...")
-
-        # Set default date range (last year to today)
+        print("Fetching inventory from MyBillBook API...")
+        first = self._make_request("/items", params={"page": 1, "per_page": per_page})
+        if not first:
+            return None
+
+        first_items = first.get("inventory_items", [])
+        total_count = first.get("total_count")
+        if total_count is None:
+            total_count = len(first_items)
+            print("[WARN] Response has no total_count; only the first page was fetched")
+
+        # The server may cap per_page below what we asked for
+        page_size = per_page
+        if 0 < len(first_items) < min(per_page, total_count):
+            page_size = len(first_items)
+            print(f"  Server returned {page_size} items per page (asked for {per_page})")
+
+        total_pages = max(1, math.ceil(total_count / page_size)) if page_size else 1
+        if total_pages > 1:
+            print(f"  {total_count} items across {total_pages} pages, fetching {max_workers} at a time...")
+
+        results = {1: first}
+        results.update(self._fetch_pages(
+            "/items", {"per_page": per_page}, list(range(2, total_pages + 1)), max_workers))
+
+        # Assemble in page order, skipping items repeated across pages
+        items = []
+        seen_ids = set()
+        failed_pages = []
+        for page in range(1, total_pages + 1):
+            result = results.get(page)
+            if not result or "inventory_items" not in result:
+                failed_pages.append(page)
+                continue
+            for item in result["inventory_items"]:
+                item_id = item.get("id")
+                if item_id is not None:
+                    if item_id in seen_ids:
+                        continue
+                    seen_ids.add(item_id)
+                items.append(item)
+
+        complete = not failed_pages and len(items) == total_count
+        if failed_pages:
+            print(f"[ERROR] Failed to fetch inventory page(s): {', '.join(map(str, failed_pages))}")
+        elif len(items) != total_count:
+            print(f"[ERROR] Fetched {len(items)} items but MyBillBook reports {total_count}")
+
+        return {
+            "inventory_items": items,
+            "total_count": total_count,
+            "complete": complete,
+        }
+
+    @staticmethod
+    def _default_date_range(start_date: str = None, end_date: str = None):
+        """Fill in a missing date range with the last year up to today"""
         from datetime import datetime, timedelta
         if not start_date:
             start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
         if not end_date:
             end_date = datetime.now().strftime("%Y-%m-%d")
+        return start_date, end_date
+
+    @staticmethod
+    def _total_from(result: Dict[str, Any]) -> Optional[int]:
+        """Total record count reported by a list response, if any"""
+        for key in ("total_count", "count", "total"):
+            value = result.get(key)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        return None
 
-        all_vouchers = []
-        page = 1
-        total_fetched = 0
-
-        while True:
-            params = {
-                "per_page": per_page,
-                "page": page,
-                "status": status,
-                "start_date": start_date,
-                "end_date": end_date,
-                "sort_by": "voucher_date",
-                "sort_order": "",
-                "voucher_type": "sales_invoice",
-                "filter": "true",
-            }
-
-            print(f"  Fetching page {page} (per_page={per_page})...")
-            result = self._make_request("/vouchers", params=params)
+    def _get_vouchers(
+        self,
+        voucher_type: str,
+        status: str,
+        start_date: str,
+        end_date: str,
+        per_page: Optional[int],
+        max_workers: Optional[int],
+        label: str,
+    ) -> Dict[str, Any]:
+        """
+        Fetch every voucher of one type in a date range
+
+        Page 1 gives the total, so the remaining pages are planned up front
+        and fetched in parallel (all requests share the rate limit). Pages are
+        merged in order and de-duplicated by voucher id, in case vouchers move
+        between pages while we read. If the response has no total, or the
+        parallel pass doesn't add up, pages are walked one at a time instead.
+
+        When per_page is None the page size and concurrency come from the
+        adaptive controller (see mybillbook/tuning.py), which learns from
+        this run's responses and saves its settings for the next one.
+
+        Returns:
+            Dictionary with vouchers, total_count and complete (False if a
+            page could not be fetched)
+        """
+        tuner, params = self._voucher_plan(voucher_type, status, start_date, end_date, per_page)
+
+        self._tuner = tuner
+        try:
+            return self._collect_vouchers(params, max_workers or MAX_CONCURRENT_REQUESTS, tuner, label)
+        finally:
+            self._tuner = None
+            if tuner:
+                tuner.finish()
+
+    def _voucher_plan(
+        self,
+        voucher_type: str,
+        status: str,
+        start_date: str,
+        end_date: str,
+        per_page: Optional[int],
+    ):
+        """Adaptive controller (None for a fixed per_page) and /vouchers query parameters"""
+        tuner = self._voucher_tuner() if per_page is None else None
+        if per_page is None:
+            per_page = tuner.per_page if tuner else VOUCHERS_PER_PAGE
+        if tuner:
+            print(f"  Using per_page={per_page}, {tuner.concurrency} requests at a time (learned from earlier runs)")
+
+        params = {
+            "per_page": per_page,
+            "status": status,
+            "start_date": start_date,
+            "end_date": end_date,
+            "sort_by": "voucher_date",
+            "sort_order": "",
+            "voucher_type": voucher_type,
+            "filter": "true",
+        }
+        return tuner, params
+
+    def _stream_vouchers(
+        self,
+        voucher_type: str,
+        status: str,
+        start_date: str,
+        end_date: str,
+        per_page: Optional[int],
+        max_workers: Optional[int],
+        label: str,
+    ) -> VoucherStream:
+        """
+        VoucherStream over every voucher of one type in a date range
 
+        Pages are planned from page 1's total like _get_vouchers, but handed
+        over in order as they arrive. A failed page is retried once; if it
+        still fails, or the vouchers don't add up to the total, the stream
+        ends incomplete (pages already yielded can't be re-read).
+        """
+        def pages(stream):
+            tuner, params = self._voucher_plan(voucher_type, status, start_date, end_date, per_page)
+            self._tuner = tuner
+            try:
+                yield from self._voucher_pages(stream, params, max_workers or MAX_CONCURRENT_REQUESTS, tuner, label)
+            finally:
+                self._tuner = None
+                if tuner:
+                    tuner.finish()
+
+        return VoucherStream(pages)
+
+    def _voucher_pages(
+        self,
+        stream: VoucherStream,
+        params: Dict,
+        max_workers: int,
+        tuner: Optional[AdaptiveController],
+        label: str,
+    ):
+        """Page generator behind _stream_vouchers"""
+        per_page = params["per_page"]
+
+        print(f"  Fetching page 1 (per_page={per_page})...")
+        first = self._fetch_page("/vouchers", params, 1, tuner)
+        if not first or "vouchers" not in first:
+            print("[ERROR] Failed to fetch page 1")
+            return
+
+        first_vouchers = first.get("vouchers", [])
+        total = self._total_from(first)
+        stream.total_count = total
+        page_size = per_page
+        if total is not None and 0 < len(first_vouchers) < min(per_page, total):
+            page_size = len(first_vouchers)  # The server capped per_page
+        yield first_vouchers
+
+        if total is None:
+            # Nothing to plan with: walk pages until a short or empty one
+            page, last = 1, first_vouchers
+            while last and len(last) >= page_size:
+                page += 1
+                result = self._fetch_page("/vouchers", params, page, tuner)
+                if not result or "vouchers" not in result:
+                    print(f"[ERROR] Failed to fetch page {page}")
+                    return
+                last = result.get("vouchers", [])
+                yield last
+            stream.total_count = stream.fetched
+            stream.complete = True
+            return
+
+        total_pages = max(1, math.ceil(total / page_size)) if first_vouchers else 1
+        if total_pages > 1:
+            at_a_time = f"up to {tuner.max_concurrency}" if tuner else max_workers
+            print(f"  {total} {label} across {total_pages} pages, fetching {at_a_time} at a time...")
+
+        for page, result in self._iter_pages("/vouchers", params, range(2, total_pages + 1), max_workers, tuner):
+            if not result or "vouchers" not in result:
+                result = self._fetch_page("/vouchers", params, page, tuner)
             if not result or "vouchers" not in result:
                 print(f"[ERROR] Failed to fetch page {page}")
-                break
+                return
+            yield result.get("vouchers", [])
 
-            vouchers = result.get("vouchers", [])
+        if stream.fetched != total:
+            print(f"[ERROR] Got {stream.fetched} {label} but MyBillBook reports {total}")
+            return
+        print(f"\n[OK] Fetched {stream.fetched} {label} total!")
+        stream.complete = True
 
-            if not vouchers:
-                print(f"  No more invoices on page {page}. Done!")
-                break
+    def _collect_vouchers(
+        self,
+        params: Dict,
+        max_workers: int,
+        tuner: Optional[AdaptiveController],
+        label: str,
+    ) -> Dict[str, Any]:
+        """Planned parallel pass over the voucher pages, see _get_vouchers"""
+        per_page = params["per_page"]
+
+        print(f"  Fetching page 1 (per_page={per_page})...")
+        first = self._fetch_page("/vouchers", params, 1, tuner)
+        if not first or "vouchers" not in first:
+            print("[ERROR] Failed to fetch page 1")
+            return {"vouchers": [], "total_count": 0, "complete": False}
+
+        first_vouchers = first.get("vouchers", [])
+        total = self._total_from(first)
+        page_size = per_page
+
+        if total is not None and first_vouchers:
+            # The server may cap per_page below what we asked for
+            if len(first_vouchers) < min(per_page, total):
+                page_size = len(first_vouchers)
+            total_pages = max(1, math.ceil(total / page_size))
+
+            if total_pages > 1:
+                at_a_time = f"up to {tuner.max_concurrency}" if tuner else max_workers
+                print(f"  {total} {label} across {total_pages} pages, fetching {at_a_time} at a time...")
+            results = {1: first}
+            results.update(self._fetch_pages(
+                "/vouchers", params, list(range(2, total_pages + 1)), max_workers, tuner))
+
+            if all(results[page] and "vouchers" in results[page] for page in results):
+                vouchers = self._merge_pages([results[page]["vouchers"] for page in sorted(results)])
+                if len(vouchers) == total:
+                    print(f"\n[OK] Fetched {len(vouchers)} {label} total!")
+                    return {"vouchers": vouchers, "total_count": len(vouchers), "complete": True}
+                print(f"  Got {len(vouchers)} {label} but expected {total}; re-reading pages in order...")
+            else:
+                failed = [page for page in sorted(results) if not results[page] or "vouchers" not in results[page]]
+                print(f"  Page(s) {', '.join(map(str, failed))} failed; re-reading pages in order...")
 
-            all_vouchers.extend(vouchers)
-            total_fetched += len(vouchers)
-            print(f"  Page {page}: {len(vouchers)} invoices (Total: {total_fetched})")
+        return self._get_vouchers_sequential(params, first_vouchers, page_size, label, tuner)
 
-            # If we got fewer vouchers than per_page, we're on the last page
-            if len(vouchers) < per_page:
-                print(f"  Last page reached!")
-                break
+    def _get_vouchers_sequential(
+        self,
+        params: Dict,
+        first_vouchers: List[Dict[str, Any]],
+        page_size: int,
+        label: str,
+        tuner: Optional[AdaptiveController] = None,
+    ) -> Dict[str, Any]:
+        """Walk voucher pages one at a time until a short or empty page"""
+        pages = [first_vouchers]
+        page = 1
+        complete = True
 
+        while pages[-1] and len(pages[-1]) >= page_size:
             page += 1
-            time.sleep(0.5)  # Small delay to be nice to the API
+            print(f"  Fetching page {page} (per_page={params['per_page']})...")
+            result = self._fetch_page("/vouchers", params, page, tuner)
+
+            if not result or "vouchers" not in result:
+                print(f"[ERROR] Failed to fetch page {page}")
+                complete = False
+                break
 
-        print(f"\n[OK] Fetched {total_fetched} sales invoices total!")
-        return {"vouchers": all_vouchers, "total_count": total_fetched}
+            pages.append(result.get("vouchers", []))
+            print(f"  Page {page}: {len(pages[-1])} {label}")
+
+        vouchers = self._merge_pages(pages)
+        print(f"\n[OK] Fetched {len(vouchers)} {label} total!")
+        return {"vouchers": vouchers, "total_count": len(vouchers), "complete": complete}
+
+    @staticmethod
+    def _merge_pages(pages: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Concatenate pages in order, keeping the first copy of each voucher id"""
+        merged = []
+        seen_ids = set()
+        for vouchers in pages:
+            for voucher in vouchers:
+                voucher_id = voucher.get("id")
+                if voucher_id is not None:
+                    if voucher_id in seen_ids:
+                        continue
+                    seen_ids.add(voucher_id)
+                merged.append(voucher)
+        return merged
 
-    def get_expenses(
+    def get_sales_invoices(
         self,
-        per_page: int = 15,
+        per_page: Optional[int] = None,
         start_date: str = None,
         end_date: str = None,
+        status: str = "final",
+        max_workers: Optional[int] = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        Fetch expenses (vouchers) with automatic pagination to get ALL expenses
+        Fetch sales invoices (vouchers) with automatic pagination to get ALL invoices
 
         Args:
-            per_page: Number of expenses per page (default 15, safe page size)
+            per_page: Number of invoices per page (default: adaptive, starting at 15)
             start_date: Start date filter (YYYY-MM-DD format)
             end_date: End date filter (YYYY-MM-DD format)
+            status: Invoice status filter (default "final")
+            max_workers: Maximum pages fetched at once (only used with a fixed per_page)
 
         Returns:
             Dictionary with all vouchers collected from all pages
         """
-        print("Fetching expenses from MyBillBook API...")
+        print("Fetching sales invoices from MyBillBook API...")
+        start_date, end_date = self._default_date_range(start_date, end_date)
+        return self._get_vouchers(
+            "sales_invoice", status, start_date, end_date, per_page, max_workers, "sales invoices")
 
-        # Set default date range (last year to today)
-        from datetime import datetime, timedelta
-        if not start_date:
-            start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
-        if not end_date:
-            end_date = datetime.now().strftime("%Y-%m-%d")
+    def get_expenses(
+        self,
+        per_page: Optional[int] = None,
+        start_date: str = None,
+        end_date: str = None,
+        max_workers: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetch expenses (vouchers) with automatic pagination to get ALL expenses
 
-        all_vouchers = []
-        page = 1
-        total_fetched = 0
-
-        while True:
-            params = {
-                "per_page": per_page,
-                "page": page,
-                "status": "",
-                "start_date": start_date,
-                "end_date": end_date,
-                "sort_by": "voucher_date",
-                "sort_order": "",
-                "voucher_type": "expense",
-                "filter": "true",
-            }
-
-            print(f"  Fetching page {page} (per_page={per_page})...")
-            result = self._make_request("/vouchers", params=params)
+        Args:
+            per_page: Number of expenses per page (default: adaptive, starting at 15)
+            start_date: Start date filter (YYYY-MM-DD format)
+            end_date: End date filter (YYYY-MM-DD format)
+            max_workers: Maximum pages fetched at once (only used with a fixed per_page)
 
-            if not result or "vouchers" not in result:
-                print(f"[ERROR] Failed to fetch page {page}")
-                break
+        Returns:
+            Dictionary with all vouchers collected from all pages
+        """
+        print("Fetching expenses from MyBillBook API...")
+        start_date, end_date = self._default_date_range(start_date, end_date)
+        return self._get_vouchers(
+            "expense", "", start_date, end_date, per_page, max_workers, "expenses")
 
-            vouchers = result.get("vouchers", [])
+    def iter_sales_invoices(
+        self,
+        per_page: Optional[int] = None,
+        start_date: str = None,
+        end_date: str = None,
+        status: str = "final",
+        max_workers: Optional[int] = None,
+    ) -> VoucherStream:
+        """
+        Sales invoices page by page, without collecting them into one list
 
-            if not vouchers:
-                print(f"  No more expenses on page {page}. Done!")
-                break
+        Args:
+            Same as get_sales_invoices
 
-            all_vouchers.extend(vouchers)
-            total_fetched += len(vouchers)
-            print(f"  Page {page}: {len(vouchers)} expenses (Total: {total_fetched})")
+        Returns:
+            VoucherStream; check its `complete` flag after iterating
+        """
+        print("Fetching sales invoices from MyBillBook API...")
+        start_date, end_date = self._default_date_range(start_date, end_date)
+        return self._stream_vouchers(
+            "sales_invoice", status, start_date, end_date, per_page, max_workers, "sales invoices")
 
-            # If we got fewer vouchers than per_page, we're on the last page
-            if len(vouchers) < per_page:
-                print(f"  Last page reached!")
-                break
+    def iter_expenses(
+        self,
+        per_page: Optional[int] = None,
+        start_date: str = None,
+        end_date: str = None,
+        max_workers: Optional[int] = None,
+    ) -> VoucherStream:
+        """
+        Expenses page by page, without collecting them into one list
 
-            page += 1
-            time.sleep(0.5)  # Small delay to be nice to the API
+        Args:
+            Same as get_expenses
 
-        print(f"\n[OK] Fetched {total_fetched} expenses total!")
-        return {"vouchers": all_vouchers, "total_count": total_fetched}
+        Returns:
+            VoucherStream; check its `complete` flag after iterating
+        """
+        print("Fetching expenses from MyBillBook API...")
+        start_date, end_date = self._default_date_range(start_date, end_date)
+        return self._stream_vouchers(
+            "expense", "", start_date, end_date, per_page, max_workers, "expenses")
 
     def test_connection(self) -> bool:
         """Test API connection and authentication"""
@@ -0,0 +1,419 @@
+"""
+Async MyBillBook API Client
+asyncio/httpx counterpart of MyBillBookAPI: one pooled keep-alive connection
+set (HTTP/2 when available), a cap on requests in flight and loop-based
+retries, so many list and detail calls can be awaited at once
+
+httpx is optional (pip install "httpx[http2]"). Without it, create_api()
+falls back to the requests-based MyBillBookAPI.
+"""
+
+import asyncio
+import importlib.util
+import math
+import random
+import threading
+from typing import Optional, Dict, Any, List
+
+from mybillbook.api_client import MyBillBookAPI, VoucherStream, RETRYABLE_STATUS_CODES
+from mybillbook.config import (
+    BASE_URL,
+    get_headers,
+    REQUEST_TIMEOUT,
+    RETRY_ATTEMPTS,
+    RETRY_DELAY,
+    ITEMS_PER_PAGE,
+    VOUCHERS_PER_PAGE,
+    MAX_CONCURRENT_REQUESTS,
+    USE_ASYNC_CLIENT,
+    HTTP2_ENABLED,
+)
+
+
+def httpx_available() -> bool:
+    return importlib.util.find_spec("httpx") is not None
+
+
+class AsyncMyBillBookAPI:
+    """
+    Async MyBillBook client with the same methods as MyBillBookAPI
+
+    Usage:
+        async with AsyncMyBillBookAPI() as api:
+            result = await api.get_sales_invoices(start_date, end_date)
+            details = await api.get_details("/invoices/{id}", result["vouchers"])
+
+    Requests share MyBillBookAPI's process-wide rate limiter, circuit
+    breaker and retry budget, so mixing both clients can't exceed
+    REQUESTS_PER_SECOND or keep calling a service that is down.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        http2: bool = HTTP2_ENABLED,
+    ):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError('The async client needs httpx: pip install "httpx[http2]"')
+
+        self._httpx = httpx
+        self.base_url = BASE_URL
+        self.headers = {key: value for key, value in get_headers().items() if value}
+        # HTTP/2 needs the h2 package; plain keep-alive HTTP/1.1 otherwise
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.max_concurrency = max(1, max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=REQUEST_TIMEOUT,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    @staticmethod
+    async def _acquire_token():
+        """Wait for the shared rate limiter without blocking the event loop"""
+        while True:
+            delay = MyBillBookAPI._rate_limiter.try_acquire()
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, response=None) -> float:
+        """Retry-After if the server sent one, else exponential backoff with jitter"""
+        if response is not None:
+            try:
+                return float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                pass
+        return RETRY_DELAY * (2 ** attempt) * random.uniform(0.5, 1.0)
+
+    async def _make_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Make an API request, retrying timeouts, connection errors, 429s and 5xx"""
+        httpx = self._httpx
+        shared = MyBillBookAPI  # Process-wide breaker and retry budget
+
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            response = None
+            if not shared._breaker.allow():
+                return None
+            await self._acquire_token()
+            shared._retry_budget.record_request()
+            try:
+                async with self._semaphore:
+                    response = await self._client.request(method, endpoint, params=params, json=data)
+            except httpx.TimeoutException:
+                print("[ERROR] Request timed out.")
+                shared._record_failure()
+            except httpx.TransportError:
+                print("[ERROR] Connection error. Please check your internet connection.")
+                shared._record_failure()
+            except Exception as e:
+                print(f"[ERROR] Unexpected error: {e}")
+                shared._record_failure()  # Also releases a half-open probe
+                return None
+            else:
+                if response.status_code >= 500:
+                    shared._record_failure()
+                else:
+                    shared._breaker.record_success()
+                if response.status_code == 401:
+                    print("[ERROR] Authentication failed. Please check your MyBillBook credentials in .env")
+                    return None
+                if response.status_code == 429:
+                    print("Rate limit exceeded. Waiting before retry...")
+                    MyBillBookAPI._rate_limiter.drain()
+                elif response.status_code in RETRYABLE_STATUS_CODES:
+                    print(f"HTTP Error: {response.status_code} for {endpoint}")
+                elif response.is_error:
+                    print(f"HTTP Error: {response.status_code} for {endpoint}")
+                    return None
+                else:
+                    try:
+                        return response.json()
+                    except ValueError:
+                        print(f"[ERROR] Invalid JSON from {endpoint}")
+                        return None
+
+            if attempt == RETRY_ATTEMPTS or shared._breaker.is_open or not shared.allow_retry():
+                break
+            print(f"Retrying... (Attempt {attempt + 1}/{RETRY_ATTEMPTS})")
+            await asyncio.sleep(self._backoff(attempt, response))
+
+        return None
+
+    async def _fetch_pages(self, endpoint: str, params: Dict, pages: List[int]) -> Dict[int, Optional[Dict]]:
+        """Fetch several pages at once (the semaphore caps requests in flight)"""
+        results = await asyncio.gather(
+            *(self._make_request(endpoint, params={**params, "page": page}) for page in pages))
+        return dict(zip(pages, results))
+
+    async def get_all_items(self, per_page: int = ITEMS_PER_PAGE) -> Optional[Dict[str, Any]]:
+        """Fetch all inventory items, across every page (see MyBillBookAPI.get_all_items)"""
+        print("Fetching inventory from MyBillBook API...")
+        first = await self._make_request("/items", params={"page": 1, "per_page": per_page})
+        if not first:
+            return None
+
+        first_items = first.get("inventory_items", [])
+        total_count = first.get("total_count")
+        if total_count is None:
+            total_count = len(first_items)
+            print("[WARN] Response has no total_count; only the first page was fetched")
+
+        page_size = per_page
+        if 0 < len(first_items) < min(per_page, total_count):
+            page_size = len(first_items)
+            print(f"  Server returned {page_size} items per page (asked for {per_page})")
+        total_pages = max(1, math.ceil(total_count / page_size)) if page_size else 1
+
+        results = {1: first}
+        results.update(await self._fetch_pages("/items", {"per_page": per_page}, list(range(2, total_pages + 1))))
+
+        failed_pages = [page for page in sorted(results) if not results[page] or "inventory_items" not in results[page]]
+        pages = [results[page]["inventory_items"] for page in sorted(results) if page not in failed_pages]
+        items = MyBillBookAPI._merge_pages(pages)
+
+        complete = not failed_pages and len(items) == total_count
+        if failed_pages:
+            print(f"[ERROR] Failed to fetch inventory page(s): {', '.join(map(str, failed_pages))}")
+        elif len(items) != total_count:
+            print(f"[ERROR] Fetched {len(items)} items but MyBillBook reports {total_count}")
+
+        return {"inventory_items": items, "total_count": total_count, "complete": complete}
+
+    async def _get_vouchers(
+        self,
+        voucher_type: str,
+        status: str,
+        start_date: str,
+        end_date: str,
+        per_page: Optional[int],
+        label: str,
+    ) -> Dict[str, Any]:
+        """
+        Fetch every voucher of one type in a date range
+
+        Same plan as MyBillBookAPI._get_vouchers: page 1 gives the total,
+        the rest are fetched at once, and pages are walked in order instead
+        if the total is missing or the pages don't add up.
+        """
+        start_date, end_date = MyBillBookAPI._default_date_range(start_date, end_date)
+        per_page = per_page or VOUCHERS_PER_PAGE
+        params = {
+            "per_page": per_page,
+            "status": status,
+            "start_date": start_date,
+            "end_date": end_date,
+            "sort_by": "voucher_date",
+            "sort_order": "",
+            "voucher_type": voucher_type,
+            "filter": "true",
+        }
+
+        first = await self._make_request("/vouchers", params={**params, "page": 1})
+        if not first or "vouchers" not in first:
+            print("[ERROR] Failed to fetch page 1")
+            return {"vouchers": [], "total_count": 0, "complete": False}
+
+        pages = [first.get("vouchers", [])]
+        total = MyBillBookAPI._total_from(first)
+        page_size = per_page
+
+        if total is not None and pages[0]:
+            if len(pages[0]) < min(per_page, total):
+                page_size = len(pages[0])
+            total_pages = max(1, math.ceil(total / page_size))
+            if total_pages > 1:
+                print(f"  {total} {label} across {total_pages} pages, up to {self.max_concurrency} at a time...")
+            results = await self._fetch_pages("/vouchers", params, list(range(2, total_pages + 1)))
+
+            if all(result and "vouchers" in result for result in results.values()):
+                vouchers = MyBillBookAPI._merge_pages(pages + [results[page]["vouchers"] for page in sorted(results)])
+                if len(vouchers) == total:
+                    print(f"\n[OK] Fetched {len(vouchers)} {label} total!")
+                    return {"vouchers": vouchers, "total_count": len(vouchers), "complete": True}
+            print(f"  Pages didn't add up to {total} {label}; re-reading pages in order...")
+
+        # Walk pages one at a time until a short or empty page
+        complete = True
+        page = 1
+        while pages[-1] and len(pages[-1]) >= page_size:
+            page += 1
+            result = await self._make_request("/vouchers", params={**params, "page": page})
+            if not result or "vouchers" not in result:
+                print(f"[ERROR] Failed to fetch page {page}")
+                complete = False
+                break
+            pages.append(result.get("vouchers", []))
+
+        vouchers = MyBillBookAPI._merge_pages(pages)
+        print(f"\n[OK] Fetched {len(vouchers)} {label} total!")
+        return {"vouchers": vouchers, "total_count": len(vouchers), "complete": complete}
+
+    async def get_sales_invoices(
+        self,
+        per_page: Optional[int] = None,
+        start_date: str = None,
+        end_date: str = None,
+        status: str = "final",
+        max_workers: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch every sales invoice in a date range (max_workers is accepted for compatibility)"""
+        print("Fetching sales invoices from MyBillBook API...")
+        return await self._get_vouchers("sales_invoice", status, start_date, end_date, per_page, "sales invoices")
+
+    async def get_expenses(
+        self,
+        per_page: Optional[int] = None,
+        start_date: str = None,
+        end_date: str = None,
+        max_workers: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch every expense in a date range (max_workers is accepted for compatibility)"""
+        print("Fetching expenses from MyBillBook API...")
+        return await self._get_vouchers("expense", "", start_date, end_date, per_page, "expenses")
+
+    async def get_details(self, path: str, vouchers: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch the detail of every voucher at once
+
+        Args:
+            path: Detail endpoint with an {id} placeholder (e.g. "/invoices/{id}")
+            vouchers: Vouchers from a list response
+
+        Returns:
+            Details in the same order as vouchers (None where a fetch failed)
+        """
+        return list(await asyncio.gather(
+            *(self._make_request(path.format(id=voucher.get("id"))) for voucher in vouchers)))
+
+    async def test_connection(self) -> bool:
+        """Test API connection and authentication"""
+        print("Testing MyBillBook API connection...")
+        result = await self._make_request("/items/stats")
+        if result:
+            print("[OK] MyBillBook API connection successful!")
+            return True
+        print("[ERROR] MyBillBook API connection failed.")
+        return False
+
+
+class SyncMyBillBookAPI:
+    """
+    Blocking facade over AsyncMyBillBookAPI
+
+    Runs the async client on a private event loop thread, so existing
+    synchronous callers (and DetailFetcher's worker threads) can use it in
+    place of MyBillBookAPI. Calls from several threads are multiplexed over
+    the same connection pool.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS, http2: bool = HTTP2_ENABLED):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mybillbook-async", daemon=True)
+        self._thread.start()
+
+        async def build():
+            return AsyncMyBillBookAPI(max_concurrency, http2)
+
+        try:
+            self._api = self._run(build())
+        except Exception:
+            self.close()
+            raise
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _make_request(self, endpoint, method="GET", params=None, data=None):
+        return self._run(self._api._make_request(endpoint, method, params, data))
+
+    def get_all_items(self, per_page: int = ITEMS_PER_PAGE, max_workers: Optional[int] = None):
+        return self._run(self._api.get_all_items(per_page))
+
+    def get_sales_invoices(self, per_page=None, start_date=None, end_date=None, status="final", max_workers=None):
+        return self._run(self._api.get_sales_invoices(per_page, start_date, end_date, status))
+
+    def get_expenses(self, per_page=None, start_date=None, end_date=None, max_workers=None):
+        return self._run(self._api.get_expenses(per_page, start_date, end_date))
+
+    def iter_sales_invoices(self, per_page=None, start_date=None, end_date=None, status="final", max_workers=None):
+        """All pages are awaited together, then handed over as a VoucherStream"""
+        return VoucherStream.from_result(self.get_sales_invoices(per_page, start_date, end_date, status))
+
+    def iter_expenses(self, per_page=None, start_date=None, end_date=None, max_workers=None):
+        """All pages are awaited together, then handed over as a VoucherStream"""
+        return VoucherStream.from_result(self.get_expenses(per_page, start_date, end_date))
+
+    def get_details(self, path, vouchers):
+        return self._run(self._api.get_details(path, vouchers))
+
+    def test_connection(self) -> bool:
+        return self._run(self._api.test_connection())
+
+    @property
+    def circuit_open(self) -> bool:
+        return MyBillBookAPI._breaker.is_open
+
+    def allow_retry(self) -> bool:
+        return MyBillBookAPI.allow_retry()
+
+    def close(self):
+        """Close the connection pool and stop the loop thread"""
+        if self._loop.is_closed():
+            return
+        if getattr(self, "_api", None) is not None:
+            self._run(self._api.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_api(use_async: bool = USE_ASYNC_CLIENT):
+    """
+    MyBillBook client for the sync scripts
+
+    Returns SyncMyBillBookAPI when use_async is set and httpx is installed,
+    otherwise the requests-based MyBillBookAPI. Both have the same methods,
+    and both should be closed when the sync is done (close(), or use the
+    client as a context manager) to release the connection pool and, for
+    the async client, its event loop thread.
+    Each call starts a new run: the shared circuit breaker and retry budget
+    are reset (see MyBillBookAPI.start_run).
+    """
+    MyBillBookAPI.start_run()
+    if use_async:
+        if httpx_available():
+            return SyncMyBillBookAPI()
+        print('[WARN] MYBILLBOOK_ASYNC is on but httpx is not installed (pip install "httpx[http2]"); '
+              'using the standard client')
+    return MyBillBookAPI()
@@ -9,7 +9,8 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # API Configuration
-BASE_URL = "https://mybillbook.in/api/web"
+# Override to point the clients at a local stand-in (see mybillbook/fake_server.py)
+BASE_URL = os.getenv("MYBILLBOOK_BASE_URL", "https://mybillbook.in/api/web")
 
 # Authentication credentials from environment
 AUTH_TOKEN = os.getenv("MYBILLBOOK_AUTH_TOKEN", "")
@@ -21,6 +22,63 @@ REQUEST_TIMEOUT = 30
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 2
 
+# Shared by every request in a run (see utils/circuit_breaker.py)
+# After CIRCUIT_FAILURE_THRESHOLD timeouts, connection errors or 5xx in a row,
+# requests fail at once for CIRCUIT_RESET_SECONDS, then one probe request
+# decides whether to resume. Retries across the run are capped at
+# RETRY_BUDGET_MIN plus RETRY_BUDGET_RATIO of the requests made.
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_SECONDS = 60
+RETRY_BUDGET_RATIO = 0.1
+RETRY_BUDGET_MIN = 20
+
+# Pagination
+ITEMS_PER_PAGE = 500
+VOUCHERS_PER_PAGE = 15  # Invoices/expenses per page
+MAX_CONCURRENT_REQUESTS = 4  # Pages fetched in parallel once the page count is known
+REQUESTS_PER_SECOND = 4  # Shared by all requests, replaces fixed sleeps between pages
+
+# Invoice/expense detail requests for the line-item syncs (see mybillbook/details.py)
+DETAIL_WORKERS = 4  # Detail requests in flight at once, still bound by REQUESTS_PER_SECOND
+DETAIL_RETRY_ATTEMPTS = 2  # Extra attempts for a detail that comes back empty
+
+# Async client (see mybillbook/async_client.py), needs httpx: pip install "httpx[http2]"
+# Used by the voucher sync scripts when MYBILLBOOK_ASYNC=1; falls back to
+# the requests-based client when httpx isn't installed
+USE_ASYNC_CLIENT = os.getenv("MYBILLBOOK_ASYNC", "").lower() in ("1", "true", "yes")
+HTTP2_ENABLED = True  # Only takes effect when the h2 package is installed too
+
+# On-disk cache of voucher details (see mybillbook/detail_cache.py)
+# Details are re-fetched only for new vouchers or ones whose amount, status or
+# timestamps changed in the list response
+DETAIL_CACHE_ENABLED = True
+DETAIL_CACHE_FILE = ".mybillbook_details.sqlite3"
+DETAIL_CACHE_MAX_MB = 200
+DETAIL_CACHE_MAX_AGE_DAYS = 400  # Unused entries older than this are dropped (just over the 1-year sync range)
+# Stored details are committed this often, so an interrupted sync keeps them
+DETAIL_CACHE_COMMIT_EVERY = 100  # writes
+DETAIL_CACHE_COMMIT_SECONDS = 5
+
+# Adaptive tuning for the /vouchers pager (see mybillbook/tuning.py)
+# Page size and concurrency start from the values above, then follow what
+# worked on previous runs, within these limits
+ADAPTIVE_TUNING = True
+TUNING_FILE = ".mybillbook_tuning.json"
+VOUCHERS_MIN_PER_PAGE = 15
+VOUCHERS_MAX_PER_PAGE = 100
+MAX_CONCURRENCY_LIMIT = 8
+SLOW_RESPONSE_SECONDS = 5  # Responses slower than this count as a sign to back off
+
+# Incremental voucher syncs (see mybillbook/incremental.py)
+# After a full sync, later runs only re-fetch vouchers dated within
+# SYNC_OVERLAP_DAYS of the last one seen and merge them into the sheet.
+# A full reconciliation still runs every FULL_SYNC_INTERVAL_DAYS to pick up
+# back-dated vouchers, edits to older vouchers and deletions.
+INCREMENTAL_SYNC = True
+WATERMARK_FILE = ".mybillbook_watermarks.json"
+SYNC_OVERLAP_DAYS = 7
+FULL_SYNC_INTERVAL_DAYS = 7
+
 
 def get_headers():
     """Returns headers for API requests"""
@@ -0,0 +1,192 @@
+"""
+Voucher Detail Cache
+Persistent SQLite store of /invoices/{id} and /expense/{id} responses, tagged
+with a change stamp from the voucher list so unchanged vouchers are served
+without a detail request
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from mybillbook.config import (
+    DETAIL_CACHE_FILE,
+    DETAIL_CACHE_MAX_MB,
+    DETAIL_CACHE_MAX_AGE_DAYS,
+    DETAIL_CACHE_COMMIT_EVERY,
+    DETAIL_CACHE_COMMIT_SECONDS,
+)
+
+
+# List-response fields that change whenever a voucher is edited
+STAMP_FIELDS = ("updated_at", "created_at", "total_amount", "remaining_amount", "status")
+
+
+def change_stamp(voucher: Dict[str, Any]) -> str:
+    """Change indicator for a voucher, built from its list-response fields"""
+    return json.dumps([voucher.get(field) for field in STAMP_FIELDS], default=str)
+
+
+class DetailCache:
+    """
+    Stores voucher details keyed by (endpoint, voucher id)
+
+    An entry is only served while the voucher's change stamp matches the
+    one it was stored with, so an edited voucher is fetched again. Entries
+    unused for DETAIL_CACHE_MAX_AGE_DAYS are evicted, then the least recently
+    used ones until the stored details fit in DETAIL_CACHE_MAX_MB.
+
+    Writes are committed every DETAIL_CACHE_COMMIT_EVERY writes or
+    DETAIL_CACHE_COMMIT_SECONDS, whichever comes first, so details fetched
+    before a crash or an interrupted sync are kept for the next run.
+    """
+
+    def __init__(
+        self,
+        path: str = DETAIL_CACHE_FILE,
+        max_mb: float = DETAIL_CACHE_MAX_MB,
+        max_age_days: float = DETAIL_CACHE_MAX_AGE_DAYS,
+    ):
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+        try:
+            # Detail fetcher threads store entries, so share one connection under the lock
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS details ("
+                " endpoint TEXT NOT NULL,"
+                " voucher_id TEXT NOT NULL,"
+                " stamp TEXT NOT NULL,"
+                " body TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (endpoint, voucher_id))"
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"[WARN] Detail cache unavailable ({path}): {e}")
+            self._conn = None
+
+    def get(self, endpoint: str, voucher: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Cached details for a voucher, if stored with its current change stamp
+
+        Args:
+            endpoint: Detail endpoint template (e.g. "/invoices/{id}")
+            voucher: Voucher from the list response
+
+        Returns:
+            Details dict, or None on a miss
+        """
+        if self._conn is None:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT stamp, body FROM details WHERE endpoint = ? AND voucher_id = ?",
+                    (endpoint, str(voucher.get("id"))),
+                ).fetchone()
+                if row is None or row[0] != change_stamp(voucher):
+                    self.misses += 1
+                    return None
+                details = json.loads(row[1])
+                self._conn.execute(
+                    "UPDATE details SET last_used = ? WHERE endpoint = ? AND voucher_id = ?",
+                    (time.time(), endpoint, str(voucher.get("id"))),
+                )
+                self._wrote()
+            except (sqlite3.Error, ValueError):
+                # Unreadable entry - treat as a miss and let put() replace it
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return details
+
+    def put(self, endpoint: str, voucher: Dict[str, Any], details: Dict[str, Any]):
+        """Store freshly fetched details under the voucher's current change stamp"""
+        if self._conn is None:
+            return
+        body = json.dumps(details)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?, ?, ?)",
+                    (endpoint, str(voucher.get("id")), change_stamp(voucher), body, len(body), time.time()),
+                )
+                self._wrote()
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not cache details for voucher {voucher.get('id')}: {e}")
+
+    def _wrote(self):
+        """Count a write and commit when enough have built up (caller holds the lock)"""
+        self._pending += 1
+        if (self._pending >= DETAIL_CACHE_COMMIT_EVERY
+                or time.monotonic() - self._last_commit >= DETAIL_CACHE_COMMIT_SECONDS):
+            self._commit()
+
+    def _commit(self):
+        self._conn.commit()
+        self._pending = 0
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        """Commit everything stored so far"""
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._commit()
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not save detail cache {self.path}: {e}")
+
+    def close(self):
+        """Evict old and excess entries, then save and close the cache"""
+        if self._conn is None:
+            return
+        with self._lock:
+            try:
+                self._evict()
+                self._conn.commit()
+                self._conn.close()
+            except sqlite3.Error as e:
+                print(f"[WARN] Could not save detail cache {self.path}: {e}")
+            self._conn = None
+
+    def _evict(self):
+        cutoff = time.time() - self.max_age_seconds
+        self._conn.execute("DELETE FROM details WHERE last_used < ?", (cutoff,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM details").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Least recently used first, until the rest fits
+        excess = total - self.max_bytes
+        doomed = []
+        for endpoint, voucher_id, size in self._conn.execute(
+                "SELECT endpoint, voucher_id, size FROM details ORDER BY last_used"):
+            if excess <= 0:
+                break
+            doomed.append((endpoint, voucher_id))
+            excess -= size
+        self._conn.executemany("DELETE FROM details WHERE endpoint = ? AND voucher_id = ?", doomed)
+
+    def summary(self) -> str:
+        """Hit rate for this run, for the sync summary"""
+        lookups = self.hits + self.misses
+        if not lookups:
+            return "no lookups"
+        return f"{self.hits}/{lookups} hits ({self.hits / lookups:.0%})"
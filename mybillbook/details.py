@@ -0,0 +1,128 @@
+"""
+Voucher Detail Fetcher
+Fetches full invoice/expense details (with their line items) in parallel for
+the line-item syncs, handing them back in the original voucher order
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, Iterator, Tuple
+
+from mybillbook.config import DETAIL_WORKERS, DETAIL_RETRY_ATTEMPTS, RETRY_DELAY
+from mybillbook.detail_cache import DetailCache
+
+
+class DetailFetcher:
+    """
+    Bounded-pool fetcher for /invoices/{id} or /expense/{id}
+
+    Requests go through MyBillBookAPI._make_request, so they share its
+    rate limiter (one budget for the whole process) and its retries for
+    429s and connection errors. A detail that still comes back empty is
+    retried here up to DETAIL_RETRY_ATTEMPTS more times, out of the same
+    retry budget. With a DetailCache, vouchers whose change stamp matches a
+    stored entry skip the request.
+
+    If the API's circuit breaker opens, iteration stops at the first detail
+    that failed and `stopped` is set; what was fetched so far is in the
+    cache, so the next run picks up from there.
+
+    Usage:
+        fetcher = DetailFetcher(api, "/invoices/{id}", cache=DetailCache())
+        for invoice, details in fetcher.iter_details(invoices):
+            ...  # details is None if it could not be fetched
+    """
+
+    def __init__(
+        self,
+        api,
+        path: str,
+        max_workers: int = DETAIL_WORKERS,
+        retries: int = DETAIL_RETRY_ATTEMPTS,
+        cache: Optional[DetailCache] = None,
+    ):
+        """
+        Args:
+            api: MyBillBookAPI instance
+            path: Detail endpoint with an {id} placeholder
+            max_workers: Detail requests in flight at once
+            retries: Extra attempts for a detail that came back empty
+            cache: Optional DetailCache for details of unchanged vouchers
+        """
+        self.api = api
+        self.path = path
+        self.max_workers = max(1, max_workers)
+        self.retries = retries
+        self.cache = cache
+        self.stats = {"fetched": 0, "cached": 0, "failed": 0, "retried": 0}
+        self.stopped = False
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def fetch(self, voucher: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch one voucher's details, retrying empty responses"""
+        endpoint = self.path.format(id=voucher.get("id"))
+        for attempt in range(self.retries + 1):
+            if attempt:
+                if self.api.circuit_open or not self.api.allow_retry():
+                    break
+                self._count("retried")
+                time.sleep(RETRY_DELAY * attempt)
+            details = self.api._make_request(endpoint)
+            if details:
+                self._count("fetched")
+                if self.cache:
+                    self.cache.put(self.path, voucher, details)
+                return details
+        self._count("failed")
+        return None
+
+    def iter_details(
+        self, vouchers: Iterable[Dict[str, Any]]
+    ) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Yield (voucher, details) pairs in the same order as vouchers
+
+        Up to max_workers requests run ahead of the consumer. Each pair is
+        yielded as soon as it and every voucher before it has arrived, so
+        flattening overlaps with fetching and the output order never depends
+        on which request finished first.
+        """
+        vouchers = iter(vouchers)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def submit_next():
+                voucher = next(vouchers, None)
+                if voucher is None:
+                    return False
+                details = self.cache.get(self.path, voucher) if self.cache else None
+                if details is not None:
+                    self._count("cached")
+                    future = Future()
+                    future.set_result(details)
+                else:
+                    future = executor.submit(self.fetch, voucher)
+                pending.append((voucher, future))
+                return True
+
+            # Keep the pool busy with one extra request queued per worker
+            while len(pending) < self.max_workers * 2 and submit_next():
+                pass
+
+            while pending:
+                voucher, future = pending.popleft()
+                details = future.result()
+                if details is None and self.api.circuit_open:
+                    # MyBillBook is down: drop the queued requests and let the caller stop
+                    self.stopped = True
+                    for _, queued in pending:
+                        queued.cancel()
+                    return
+                submit_next()
+                yield voucher, details
@@ -0,0 +1,375 @@
+"""
+MyBillBook Stand-in Server
+Local HTTP server that answers the MyBillBook endpoints we use from
+synthetic or recorded data, for running the syncs and benchmarks offline
+
+Serves /items, /items/stats, /vouchers, /invoices/{id} and /expense/{id}
+under any path prefix. Point the client at it with:
+
+    MYBILLBOOK_BASE_URL=http://127.0.0.1:8765/api/web
+
+Usage:
+    python -m mybillbook.fake_server --invoices 100000 --latency 50
+    python -m mybillbook.fake_server --fixtures recorded.json --throttle-every 20
+"""
+
+import argparse
+import bisect
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+CATEGORIES = ["Earrings", "Necklaces", "Bracelets", "Rings", "Charms", "Anklets"]
+EXPENSE_CATEGORIES = ["Rent", "Food & Snacks", "Transportation", "Packaging", "Utilities"]
+PAYMENT_MODES = ["cash", "upi", "card", "bank_transfer"]
+
+
+class Dataset:
+    """
+    Items, vouchers and voucher details for the stand-in server
+
+    Synthetic data is generated from a seed: the same arguments always give
+    the same dataset. Vouchers and details are built on request from the
+    voucher's index, so a 100k-invoice dataset costs little memory.
+    Recorded data (load_fixtures) is served exactly as stored instead.
+    """
+
+    def __init__(self, items=500, invoices=2000, expenses=300, days=365, seed=42):
+        self.seed = seed
+        self.item_count = items
+        self.counts = {"sales_invoice": invoices, "expense": expenses}
+        self.today = datetime.now().date()
+        self.days = days
+        self.recorded = None
+
+        # Voucher dates, newest first (the order /vouchers returns them in),
+        # plus an ascending copy for bisecting date filters
+        self._dates = {}
+        self._ascending = {}
+        for voucher_type, count in self.counts.items():
+            rng = random.Random(f"{seed}-{voucher_type}-dates")
+            offsets = sorted(rng.randrange(days) for _ in range(count))
+            self._dates[voucher_type] = [
+                (self.today - timedelta(days=offset)).strftime("%Y-%m-%d") for offset in offsets]
+            self._ascending[voucher_type] = self._dates[voucher_type][::-1]
+
+    @classmethod
+    def load_fixtures(cls, path):
+        """
+        Dataset from a recorded JSON file with any of these keys:
+        items, sales_invoices, expenses (lists as returned by the API) and
+        invoice_details, expense_details (objects keyed by voucher id)
+        """
+        with open(path, "r") as f:
+            recorded = json.load(f)
+        dataset = cls(items=0, invoices=0, expenses=0)
+        dataset.recorded = recorded
+        dataset.item_count = len(recorded.get("items", []))
+        dataset.counts = {
+            "sales_invoice": len(recorded.get("sales_invoices", [])),
+            "expense": len(recorded.get("expenses", [])),
+        }
+        return dataset
+
+    # Items
+
+    def item(self, index):
+        if self.recorded is not None:
+            return self.recorded["items"][index]
+        rng = random.Random(f"{self.seed}-item-{index}")
+        category = CATEGORIES[index % len(CATEGORIES)]
+        cost = rng.randrange(20, 400)
+        return {
+            "id": 100000 + index,
+            "name": f"{category} {cost} ITEM{index}",
+            "sku_code": f"SKU{index:06d}",
+            "item_category_name": category,
+            "mrp": cost * 3,
+            "selling_price": cost * 2,
+            "sales_price": cost * 2,
+            "purchase_price": cost,
+            "quantity": rng.randrange(0, 50),
+            "unit": "PCS",
+            "gst_percentage": 3,
+            "created_at": "2024-01-01T10:00:00Z",
+        }
+
+    # Vouchers
+
+    def voucher_ids(self, voucher_type, start_date, end_date):
+        """Indexes of the vouchers dated within the range, newest first"""
+        if self.recorded is not None:
+            key = "sales_invoices" if voucher_type == "sales_invoice" else "expenses"
+            return [i for i, voucher in enumerate(self.recorded.get(key, []))
+                    if (not start_date or voucher.get("invoice_date", "") >= start_date)
+                    and (not end_date or voucher.get("invoice_date", "") <= end_date)]
+
+        ascending = self._ascending[voucher_type]
+        low = bisect.bisect_left(ascending, start_date) if start_date else 0
+        high = bisect.bisect_right(ascending, end_date) if end_date else len(ascending)
+        count = len(ascending)
+        return range(count - high, count - low)
+
+    def voucher(self, voucher_type, index):
+        if self.recorded is not None:
+            key = "sales_invoices" if voucher_type == "sales_invoice" else "expenses"
+            return self.recorded[key][index]
+
+        rng = random.Random(f"{self.seed}-{voucher_type}-{index}")
+        date = self._dates[voucher_type][index]
+        total = round(rng.uniform(100, 5000), 2)
+        prefix = "INV" if voucher_type == "sales_invoice" else "EXP"
+        voucher = {
+            "id": self.voucher_id(voucher_type, index),
+            "invoice_number": f"{prefix}{index + 1}",
+            "invoice_date": date,
+            "serial_number": index + 1,
+            "contact_name": f"Customer {rng.randrange(1, 500)}",
+            "contact_type": "customer",
+            "total_amount": total,
+            "initial_payment_amount": total,
+            "remaining_amount": 0,
+            "payment_mode": rng.choice(PAYMENT_MODES),
+            "status": "final",
+            "created_at": f"{date}T{rng.randrange(9, 21):02d}:{rng.randrange(60):02d}:00Z",
+        }
+        if voucher_type == "expense":
+            voucher["ledger_category_name"] = rng.choice(EXPENSE_CATEGORIES)
+            voucher["txn_ledgers"] = [{"name": voucher["ledger_category_name"]}]
+        return voucher
+
+    @staticmethod
+    def voucher_id(voucher_type, index):
+        return f"{'s' if voucher_type == 'sales_invoice' else 'e'}{index}"
+
+    def details(self, voucher_type, voucher_id):
+        """Detail response for a voucher id, or None if there's no such voucher"""
+        if self.recorded is not None:
+            key = "invoice_details" if voucher_type == "sales_invoice" else "expense_details"
+            return self.recorded.get(key, {}).get(str(voucher_id))
+
+        prefix = "s" if voucher_type == "sales_invoice" else "e"
+        if not voucher_id.startswith(prefix) or not voucher_id[1:].isdigit():
+            return None
+        index = int(voucher_id[1:])
+        if index >= self.counts[voucher_type]:
+            return None
+
+        voucher = self.voucher(voucher_type, index)
+        rng = random.Random(f"{self.seed}-{voucher_type}-{index}-details")
+        details = dict(voucher, discount=0, discount_type="", round_off=0, additional_charges=[])
+
+        if voucher_type == "sales_invoice":
+            details["items"] = []
+            for _ in range(rng.randrange(1, 5)):
+                item = self.item(rng.randrange(max(1, self.item_count)))
+                quantity = rng.randrange(1, 4)
+                details["items"].append({
+                    "name": item["name"],
+                    "sku_code": item["sku_code"],
+                    "quantity": quantity,
+                    "unit": "PCS",
+                    "price_per_unit": item["selling_price"],
+                    "item_final_amount": item["selling_price"] * quantity,
+                    "purchase_info": {"price_per_unit": item["purchase_price"]},
+                    "gst_percentage": 3,
+                    "mrp": item["mrp"],
+                })
+        else:
+            details["txn_ledgers"] = [{
+                "id": f"{voucher_id}-1",
+                "name": voucher["ledger_category_name"],
+                "ledger_id": f"L{rng.randrange(1, 20)}",
+                "quantity": 1,
+                "price_per_unit": voucher["total_amount"],
+                "unit": "NOS",
+            }]
+        return details
+
+
+class FakeMyBillBookServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server over a Dataset
+
+    Args:
+        dataset: Dataset to serve
+        latency_ms: Delay added to every response
+        jitter_ms: Extra random delay, 0..jitter_ms
+        max_per_page: Cap on per_page, like the real API's server-side limit
+        throttle_every: Answer every Nth request with 429 (0 = never)
+        retry_after: Retry-After seconds sent with each 429
+        fail_after: Answer 503 to every request after this many (0 = never),
+            to simulate an outage
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, dataset, latency_ms=0, jitter_ms=0, max_per_page=100,
+                 throttle_every=0, retry_after=1, fail_after=0):
+        super().__init__(address, FakeMyBillBookHandler)
+        self.dataset = dataset
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.max_per_page = max_per_page
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.fail_after = fail_after
+        self.stats = {"requests": 0, "throttled": 0, "not_found": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/api/web"
+
+    def count_request(self):
+        """Count a request; returns the error status to answer it with, if any"""
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            if self.fail_after and self.stats["requests"] > self.fail_after:
+                self.stats["failed"] += 1
+                return 503
+            if self.throttle_every and self.stats["requests"] % self.throttle_every == 0:
+                self.stats["throttled"] += 1
+                return 429
+        return None
+
+
+class FakeMyBillBookHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass  # Quiet: benchmarks send thousands of requests
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body if body is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        error = server.count_request()
+        if error == 503:
+            self._send(503, {"error": "Service Unavailable"})
+            return
+        if error == 429:
+            self._send(429, {"error": "Too Many Requests"}, {"Retry-After": str(server.retry_after)})
+            return
+
+        delay = server.latency_ms + (random.uniform(0, server.jitter_ms) if server.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        body = self._route(parts, query)
+
+        if body is None:
+            with server._stats_lock:
+                server.stats["not_found"] += 1
+            self._send(404, {"error": "Not Found"})
+        else:
+            self._send(200, body)
+
+    def _route(self, parts, query):
+        dataset = self.server.dataset
+        # Any prefix (e.g. /api/web) is ignored; match on the trailing segments
+        if parts[-2:] == ["items", "stats"]:
+            return {"total_items": dataset.item_count}
+        if parts[-1:] == ["items"]:
+            page, per_page = self._paging(query)
+            start = (page - 1) * per_page
+            indexes = range(start, min(dataset.item_count, start + per_page))
+            return {"inventory_items": [dataset.item(i) for i in indexes], "total_count": dataset.item_count}
+        if parts[-1:] == ["vouchers"]:
+            voucher_type = query.get("voucher_type", "sales_invoice")
+            if voucher_type not in dataset.counts:
+                return None
+            page, per_page = self._paging(query)
+            indexes = dataset.voucher_ids(voucher_type, query.get("start_date"), query.get("end_date"))
+            chunk = indexes[(page - 1) * per_page:page * per_page]
+            return {"vouchers": [dataset.voucher(voucher_type, i) for i in chunk], "total_count": len(indexes)}
+        if len(parts) >= 2 and parts[-2] == "invoices":
+            return dataset.details("sales_invoice", parts[-1])
+        if len(parts) >= 2 and parts[-2] == "expense":
+            return dataset.details("expense", parts[-1])
+        return None
+
+    def _paging(self, query):
+        try:
+            page = max(1, int(query.get("page", 1)))
+            per_page = max(1, int(query.get("per_page", 15)))
+        except ValueError:
+            page, per_page = 1, 15
+        return page, min(per_page, self.server.max_per_page)
+
+
+def start_server(dataset, host="127.0.0.1", port=0, **options):
+    """
+    Start a stand-in server on a background thread
+
+    Args:
+        dataset: Dataset to serve
+        host: Interface to listen on
+        port: Port (0 picks a free one)
+        **options: FakeMyBillBookServer options (latency_ms, throttle_every, ...)
+
+    Returns:
+        The running FakeMyBillBookServer; call shutdown() to stop it
+    """
+    server = FakeMyBillBookServer((host, port), dataset, **options)
+    threading.Thread(target=server.serve_forever, name="fake-mybillbook", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the MyBillBook API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="Serve a recorded JSON dataset instead of synthetic data")
+    parser.add_argument("--items", type=int, default=500, help="Synthetic inventory items (default 500)")
+    parser.add_argument("--invoices", type=int, default=2000, help="Synthetic sales invoices (default 2000)")
+    parser.add_argument("--expenses", type=int, default=300, help="Synthetic expenses (default 300)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0, help="Added delay per response, ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Extra random delay up to this many ms")
+    parser.add_argument("--max-per-page", type=int, default=100, help="Server-side cap on per_page")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--fail-after", type=int, default=0, help="Answer 503 to every request after this many")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        dataset = Dataset.load_fixtures(args.fixtures)
+    else:
+        dataset = Dataset(items=args.items, invoices=args.invoices, expenses=args.expenses, seed=args.seed)
+
+    server = FakeMyBillBookServer(
+        (args.host, args.port), dataset,
+        latency_ms=args.latency, jitter_ms=args.jitter, max_per_page=args.max_per_page,
+        throttle_every=args.throttle_every, retry_after=args.retry_after, fail_after=args.fail_after,
+    )
+    print(f"[OK] MyBillBook stand-in serving {dataset.item_count} items, "
+          f"{dataset.counts['sales_invoice']} invoices, {dataset.counts['expense']} expenses")
+    print(f"     MYBILLBOOK_BASE_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
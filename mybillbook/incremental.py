@@ -0,0 +1,318 @@
+"""
+Incremental Voucher Sync
+Remembers how far each voucher sheet has been synced (a watermark) so the
+next run only re-downloads a short overlap window and merges it into the
+rows already in the sheet
+"""
+
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from mybillbook.config import (
+    INCREMENTAL_SYNC,
+    WATERMARK_FILE,
+    SYNC_OVERLAP_DAYS,
+    FULL_SYNC_INTERVAL_DAYS,
+)
+from utils.frames import DATE_FORMATS, SHEETS_EPOCH
+
+
+def parse_day(value):
+    """
+    Voucher/sheet date -> datetime.date, or None if it isn't a date
+
+    Accepts text dates, created_at style timestamps and the serial numbers
+    that FORMULA/UNFORMATTED_VALUE reads return for date-formatted cells.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Sheets serial date: days since SHEETS_EPOCH (the fraction is the time of day)
+        try:
+            return datetime.strptime(SHEETS_EPOCH, "%Y-%m-%d").date() + timedelta(days=int(value))
+        except (OverflowError, ValueError):
+            return None
+    if not value or not isinstance(value, str):
+        return None
+    text = value.strip()
+    # created_at style timestamps ("2025-01-31T10:15:00Z") start with the date
+    for candidate in (text[:10], text):
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(candidate, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+class WatermarkStore:
+    """
+    Per-source sync state, saved as JSON
+
+    Each source (one per synced sheet) records the latest voucher date
+    seen, the voucher keys the sheet holds, the start of the date
+    range the sheet covers and when the last full reconciliation ran.
+    """
+
+    def __init__(self, path: str = WATERMARK_FILE):
+        self.path = path
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, source: str) -> dict:
+        """Saved state for a source ({} if it has never been synced)"""
+        return self._load().get(source, {})
+
+    def save(self, source: str, state: dict):
+        if not self.path:
+            return
+        data = self._load()
+        data[source] = dict(state, updated_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+        try:
+            with open(self.path, "w") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print(f"[WARN] Could not save sync watermark to {self.path}: {e}")
+
+    def clear(self, source: str):
+        """Forget a source, so its next sync is a full one"""
+        data = self._load()
+        if data.pop(source, None) is not None and self.path:
+            try:
+                with open(self.path, "w") as f:
+                    json.dump(data, f, indent=2)
+            except OSError as e:
+                print(f"[WARN] Could not update sync watermark {self.path}: {e}")
+
+
+class IncrementalSync:
+    """
+    Plans one voucher sheet sync and merges its results
+
+    Usage:
+        sync = IncrementalSync(sheets_manager, "Sales Invoices", "sales_invoices",
+                               headers, key_column="ID", date_column="Invoice Date")
+        fetch_start, fetch_end = sync.plan(start_date, end_date, full=False)
+        for voucher in ...:  # vouchers from fetch_start to fetch_end
+            sync.track(voucher, key=..., fetched=...)
+            ... build rows ...
+        output = sync.merge(rows)
+        sheets_manager.upsert_rows(...)
+        sync.commit(output)
+
+    A run is incremental when the sheet already covers the requested range,
+    the range ends today and a full reconciliation isn't due. It then only
+    fetches from SYNC_OVERLAP_DAYS before the watermark. Otherwise (first
+    run, custom range, changed headers, --full, or FULL_SYNC_INTERVAL_DAYS
+    since the last full run) the whole range is fetched, which is what
+    catches back-dated vouchers and deletions outside the overlap window.
+    """
+
+    def __init__(
+        self,
+        sheets_manager,
+        sheet_name: str,
+        source: str,
+        headers: list,
+        key_column: str,
+        date_column: str,
+        store: Optional[WatermarkStore] = None,
+    ):
+        self.sheets_manager = sheets_manager
+        self.sheet_name = sheet_name
+        self.source = source
+        self.headers = headers
+        self.key_index = headers.index(key_column)
+        self.date_index = headers.index(date_column)
+        self.store = store or WatermarkStore()
+
+        self.full = True
+        self.start_date = None
+        self.end_date = None
+        self.fetch_start = None
+        self._existing = []
+        self._previous = {}
+        self._last_date = None
+        self._fetched_keys = set()
+        self._unfetched_keys = set()
+        self._first_unfetched_date = None
+
+    def plan(self, start_date: str, end_date: str, full: bool = False):
+        """
+        Decide what to fetch for this run
+
+        Args:
+            start_date: Start of the range the sheet should hold (YYYY-MM-DD)
+            end_date: End of the range (YYYY-MM-DD)
+            full: Force a full reconciliation
+
+        Returns:
+            (fetch_start, fetch_end) date strings
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.full = True
+        self.fetch_start = start_date
+        self._previous = self.store.get(self.source)
+
+        reason = self._full_sync_reason(full)
+        if reason is None:
+            # Only trust the watermark if the sheet still holds what it describes
+            current = self.sheets_manager.read_sheet(self.sheet_name, value_render_option='FORMULA')
+            if not current or list(current[0][:len(self.headers)]) != self.headers:
+                reason = "sheet is empty or its columns changed"
+            else:
+                self._existing = current[1:]
+
+        if reason is None:
+            watermark = datetime.strptime(self._previous["last_date"], "%Y-%m-%d").date()
+            window_start = watermark - timedelta(days=SYNC_OVERLAP_DAYS)
+            self.fetch_start = max(start_date, window_start.strftime("%Y-%m-%d"))
+            self.full = False
+            print(f"[INFO] Incremental sync: fetching {self.fetch_start} to {end_date} "
+                  f"(watermark {self._previous['last_date']}, {SYNC_OVERLAP_DAYS}-day overlap)")
+        else:
+            print(f"[INFO] Full sync of {start_date} to {end_date}: {reason}")
+
+        return self.fetch_start, end_date
+
+    def _full_sync_reason(self, full):
+        """Why this run has to fetch the whole range (None if it doesn't)"""
+        previous = self._previous
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        if full:
+            return "full reconciliation requested"
+        if not INCREMENTAL_SYNC:
+            return "incremental sync is turned off"
+        if not previous.get("last_date") or not previous.get("last_full_sync"):
+            return "no previous sync recorded"
+        if self.end_date < today:
+            return "custom date range"
+        if previous.get("range_start", "9999-12-31") > self.start_date:
+            return "range starts before what the sheet holds"
+
+        last_full = datetime.strptime(previous["last_full_sync"][:10], "%Y-%m-%d")
+        if datetime.now() - last_full >= timedelta(days=FULL_SYNC_INTERVAL_DAYS):
+            return f"last full reconciliation was over {FULL_SYNC_INTERVAL_DAYS} days ago"
+        return None
+
+    def track(self, voucher: dict, key=None, fetched: bool = True):
+        """
+        Note a listed voucher's date for the next watermark
+
+        Args:
+            voucher: Voucher from the list endpoint
+            key: The voucher's value in key_column, if its rows use one
+            fetched: False if the voucher's rows couldn't be built (e.g. its
+                detail fetch failed), so its rows already in the sheet are kept
+                and the next run fetches it again
+        """
+        day = parse_day(voucher.get("invoice_date"))
+        if not fetched:
+            if key is not None:
+                self._unfetched_keys.add(str(key))
+            if day and (self._first_unfetched_date is None or day < self._first_unfetched_date):
+                self._first_unfetched_date = day
+        elif key is not None:
+            self._fetched_keys.add(str(key))
+        if day and (self._last_date is None or day > self._last_date):
+            self._last_date = day
+
+    def merge(self, rows: list) -> list:
+        """
+        Combine freshly fetched rows with the sheet rows they don't replace
+
+        Existing rows are kept when they fall between the range start and the
+        fetch window and belong to a voucher that wasn't re-fetched. Rows in
+        the window that weren't returned again were deleted upstream, and
+        rows before the range start have aged out, so both are dropped.
+        Rows of vouchers tracked with fetched=False are always kept (on a
+        full run too), since the voucher still exists but wasn't re-read.
+
+        Args:
+            rows: Data rows (no header) built from the fetched vouchers
+
+        Returns:
+            Header plus merged data rows, ready for upsert_rows
+        """
+        if self.full and self._unfetched_keys:
+            # A full run doesn't read the sheet up front; only the rows of
+            # vouchers that couldn't be fetched are needed from it
+            current = self.sheets_manager.read_sheet(self.sheet_name, value_render_option='FORMULA')
+            kept = [
+                row for row in (current or [])[1:]
+                if len(row) > self.key_index and str(row[self.key_index]) in self._unfetched_keys
+            ]
+            print(f"[WARN] Kept {len(kept)} existing rows of {len(self._unfetched_keys)} vouchers "
+                  f"whose details could not be fetched")
+            return [self.headers] + rows + kept
+        if self.full:
+            return [self.headers] + rows
+
+        range_start = parse_day(self.start_date)
+        window_start = parse_day(self.fetch_start)
+        fetched_keys = self._fetched_keys | {str(row[self.key_index]) for row in rows}
+
+        kept = []
+        for row in self._existing:
+            key = str(row[self.key_index]) if len(row) > self.key_index else ""
+            if key in self._unfetched_keys and key not in fetched_keys:
+                kept.append(row)
+                continue
+            if key in fetched_keys:
+                continue
+            day = parse_day(row[self.date_index]) if len(row) > self.date_index else None
+            if day is not None and (day < range_start or day >= window_start):
+                continue
+            kept.append(row)
+
+        print(f"[INFO] Merged {len(rows)} fetched rows with {len(kept)} unchanged rows "
+              f"({len(self._existing) - len(kept)} replaced or removed)")
+        return [self.headers] + rows + kept
+
+    def commit(self, output: list):
+        """
+        Record the new watermark once the sheet has been written
+
+        Args:
+            output: Rows written to the sheet (header first)
+        """
+        previous = self._previous
+        keys = sorted({str(row[self.key_index]) for row in output[1:] if len(row) > self.key_index})
+
+        # Deletions only show up reliably when everything was re-fetched
+        if self.full and previous.get("ids"):
+            removed = set(previous["ids"]) - set(keys)
+            if removed:
+                print(f"[INFO] {len(removed)} previously synced vouchers are no longer in MyBillBook "
+                      f"(or fell outside the date range) and were removed")
+
+        last_date = self._last_date.strftime("%Y-%m-%d") if self._last_date else None
+        if not self.full and previous.get("last_date"):
+            last_date = max(filter(None, [last_date, previous["last_date"]]))
+        # Hold the watermark back so vouchers that couldn't be fetched fall
+        # inside the next run's overlap window
+        if self._first_unfetched_date:
+            last_date = min(filter(None, [last_date, self._first_unfetched_date.strftime("%Y-%m-%d")]))
+
+        self.store.save(self.source, {
+            "last_date": last_date or self.end_date,
+            "range_start": self.start_date,
+            "ids": keys,
+            "last_full_sync": (datetime.now().strftime("%Y-%m-%dT%H:%M:%S") if self.full
+                               else previous.get("last_full_sync")),
+            "mode": "full" if self.full else "incremental",
+        })
@@ -19,14 +19,14 @@ def fetch_mybillbook_inventory() -> List[Dict[str, Any]]:
     Returns:
         List of inventory items as dictionaries
     """
-    api = MyBillBookAPI()
+    MyBillBookAPI.start_run()
+    with MyBillBookAPI() as api:
+        # Test connection first
+        if not api.test_connection():
+            return []
 
-    # Test connection first
-    if not api.test_connection():
-        return []
-
-    # Fetch all items
-    response = api.get_all_items(per_page=500)
+        # Fetch all items (every page)
+        response = api.get_all_items()
 
     if not response:
         print("[ERROR] Failed to fetch inventory from MyBillBook")
@@ -38,6 +38,11 @@ def fetch_mybillbook_inventory() -> List[Dict[str, Any]]:
     print(f"Fetched {len(inventory_items)} items from MyBillBook")
     print(f"Total items in system: {total_count}")
 
+    # A partial list would drop the missing items from the sheet, so don't sync it
+    if not response.get("complete", False):
+        print("[ERROR] Inventory fetch was incomplete. Sync aborted; the sheet was left unchanged.")
+        return []
+
     return inventory_items
 
 
@@ -132,47 +137,45 @@ def sync_to_sheets(sheets_manager):
 
     output = [headers] + rows
 
-    # Create SAFETY BACKUP before clearing (automatic, no prompt)
+    # Create SAFETY BACKUP before writing (automatic, no prompt)
     create_safety_backup(sheets_manager, SYNC_SHEET_NAME, "mybillbook_inventory_BACKUP")
 
-    # Write to Google Sheets
+    # Write only the rows that changed since the last sync
     print(f"\nWriting {len(rows)} items to Google Sheets...")
-    sheets_manager.clear_sheet(SYNC_SHEET_NAME)
-    sheets_manager.write_sheet(SYNC_SHEET_NAME, output)
-
-    # Apply formatting
-    if len(rows) > 0:
-        last_row = len(rows) + 1
-
+    result = sheets_manager.upsert_rows(SYNC_SHEET_NAME, output, key_columns=["ID"], formats={
         # Text columns
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"A2:A{last_row}")  # ID
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"B2:B{last_row}")  # Name
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"C2:C{last_row}")  # SKU Code
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"D2:D{last_row}")  # Category
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"M2:M{last_row}")  # Unit
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"N2:N{last_row}")  # Unit Long
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"P2:P{last_row}")  # Sales Tax Included
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"Q2:Q{last_row}")  # Purchase Tax Included
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"R2:R{last_row}")  # Description
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"S2:S{last_row}")  # Item Type
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"T2:T{last_row}")  # Show on Store
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"U2:U{last_row}")  # Excel Imported
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"V2:V{last_row}")  # Created Date
-        sheets_manager.format_as_text(SYNC_SHEET_NAME, f"W2:W{last_row}")  # Identification Code
+        "A": "text",  # ID
+        "B": "text",  # Name
+        "C": "text",  # SKU Code
+        "D": "text",  # Category
+        "M": "text",  # Unit
+        "N": "text",  # Unit Long
+        "P": "text",  # Sales Tax Included
+        "Q": "text",  # Purchase Tax Included
+        "R": "text",  # Description
+        "S": "text",  # Item Type
+        "T": "text",  # Show on Store
+        "U": "text",  # Excel Imported
+        "V": "text",  # Created Date
+        "W": "text",  # Identification Code
 
         # Numeric columns with 2 decimals
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"E2:E{last_row}", decimal_places=2)  # MRP
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"F2:F{last_row}", decimal_places=2)  # Selling Price
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"G2:G{last_row}", decimal_places=2)  # Sales Price
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"H2:H{last_row}", decimal_places=2)  # Purchase Price
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"I2:I{last_row}", decimal_places=2)  # Wholesale Price
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"J2:J{last_row}", decimal_places=2)  # Wholesale Min Qty
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"O2:O{last_row}", decimal_places=2)  # GST %
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"X2:X{last_row}", decimal_places=2)  # Conversion Factor
+        "E": ("number", 2),  # MRP
+        "F": ("number", 2),  # Selling Price
+        "G": ("number", 2),  # Sales Price
+        "H": ("number", 2),  # Purchase Price
+        "I": ("number", 2),  # Wholesale Price
+        "J": ("number", 2),  # Wholesale Min Qty
+        "O": ("number", 2),  # GST %
+        "X": ("number", 2),  # Conversion Factor
 
         # Numeric columns with 0 decimals
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"K2:K{last_row}", decimal_places=0)  # Quantity
-        sheets_manager.format_as_number(SYNC_SHEET_NAME, f"L2:L{last_row}", decimal_places=0)  # Minimum Quantity
+        "K": "number",  # Quantity
+        "L": "number",  # Minimum Quantity
+    })
+    if result is None:
+        print(f"[ERROR] Writing to '{SYNC_SHEET_NAME}' failed. Run the sync again.")
+        return False
 
     print(f"\n[OK] Successfully synced {len(rows)} items to '{SYNC_SHEET_NAME}' sheet!")
 
@@ -0,0 +1,137 @@
+"""
+Adaptive Request Tuning
+Learns a page size and request concurrency for a list endpoint from how the
+API responds, and remembers them between runs
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class AdaptiveController:
+    """
+    Page size and concurrency controller for one endpoint
+
+    Concurrency follows AIMD: one more request in flight after a full window
+    of fast, successful responses, halved on a 429, an error or a slow
+    response. The page size is fixed for the length of a run (pages are
+    planned up front), so it is adjusted when the run finishes: doubled if
+    every response was fast and error-free, halved if any were not.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_page: int,
+        concurrency: int,
+        min_per_page: int,
+        max_per_page: int,
+        max_concurrency: int,
+        slow_seconds: float,
+        state_file: Optional[str] = None,
+    ):
+        self.name = name
+        self.min_per_page = min_per_page
+        self.max_per_page = max_per_page
+        self.max_concurrency = max_concurrency
+        self.slow_seconds = slow_seconds
+        self.state_file = state_file
+
+        saved = self._load_state()
+        self.per_page = self._clamp(saved.get("per_page", per_page), min_per_page, max_per_page)
+        self.concurrency = self._clamp(saved.get("concurrency", concurrency), 1, max_concurrency)
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._fast_streak = 0
+        self._responses = 0
+        self._setbacks = 0  # 429s, errors and slow responses this run
+
+    @staticmethod
+    def _clamp(value, low, high):
+        return max(low, min(high, int(value)))
+
+    def _load_state(self):
+        """Settings saved for this endpoint by a previous run ({} if none)"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r") as f:
+                return json.load(f).get(self.name, {})
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the currently allowed in-flight request slots"""
+        with self._cond:
+            while self._in_flight >= self.concurrency:
+                self._cond.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, seconds: float, ok: bool):
+        """Feed back one response: how long it took and whether it succeeded"""
+        with self._cond:
+            self._responses += 1
+            if not ok or seconds > self.slow_seconds:
+                self._back_off()
+                return
+
+            self._fast_streak += 1
+            if self._fast_streak >= self.concurrency and self.concurrency < self.max_concurrency:
+                self.concurrency += 1  # Additive increase
+                self._fast_streak = 0
+                self._cond.notify_all()
+
+    def record_throttle(self):
+        """The server answered 429 Too Many Requests"""
+        with self._cond:
+            self._back_off()
+
+    def _back_off(self):
+        self._setbacks += 1
+        self._fast_streak = 0
+        self.concurrency = max(1, self.concurrency // 2)  # Multiplicative decrease
+
+    def finish(self):
+        """End of run: adjust the page size for next time and save the settings"""
+        with self._cond:
+            if self._setbacks:
+                self.per_page = max(self.min_per_page, self.per_page // 2)
+            elif self._responses:
+                self.per_page = min(self.max_per_page, self.per_page * 2)
+            self._responses = 0
+            self._setbacks = 0
+        self._save_state()
+
+    def _save_state(self):
+        if not self.state_file:
+            return
+        try:
+            state = {}
+            if os.path.exists(self.state_file):
+                with open(self.state_file, "r") as f:
+                    state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+
+        state[self.name] = {
+            "per_page": self.per_page,
+            "concurrency": self.concurrency,
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        try:
+            with open(self.state_file, "w") as f:
+                json.dump(state, f, indent=2)
+        except OSError as e:
+            print(f"[WARN] Could not save request tuning to {self.state_file}: {e}")
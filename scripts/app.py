@@ -17,8 +17,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.sheets import SheetsManager
 from transforms.transform1_consolidate import consolidate_inventory
 from transforms.transform2_mybillbook import export_to_mybillbook
+from transforms.pipeline import run_pipeline
 from mybillbook.sync import sync_to_sheets
 from utils.csv_exporter import list_exports, EXPORT_FOLDERS
+from utils.frames import to_frame
 from config import SHEET_MYBILLBOOK_CURRENT, SHEET_WEPRINT
 
 
@@ -1007,25 +1009,20 @@ def run_all_operations(sheets):
         from contextlib import redirect_stdout
 
         # Step 1
-        status_text.markdown("**Step 1/3** — Syncing inventory...")
+        status_text.markdown("**Step 1/2** — Syncing inventory...")
         progress.progress(10)
         f = io.StringIO()
         with redirect_stdout(f):
             sync_to_sheets(sheets)
-        progress.progress(33)
+        progress.progress(50)
 
-        # Step 2
-        status_text.markdown("**Step 2/3** — Consolidating items...")
+        # Step 2: consolidate, MyBillBook and WePrint tables built in memory, written together
+        status_text.markdown("**Step 2/2** — Consolidating items and generating exports...")
         f = io.StringIO()
         with redirect_stdout(f):
-            consolidate_inventory(sheets)
-        progress.progress(66)
-
-        # Step 3
-        status_text.markdown("**Step 3/3** — Generating exports...")
-        f = io.StringIO()
-        with redirect_stdout(f):
-            export_to_mybillbook(sheets)
+            tables = run_pipeline(sheets, auto_save=st.session_state.auto_export_csv)
+        if tables is None:
+            raise RuntimeError("Transforms did not complete; output tabs were not updated")
         progress.progress(100)
 
         status_text.markdown("**Complete** — All operations finished successfully")
@@ -1060,16 +1057,17 @@ def labels_page():
         st.warning("Inventory is empty. Run sync first.")
         return
 
-    headers = data[0]
-    rows = data[1:]
-    df = pd.DataFrame(rows, columns=headers)
+    # Quantity parsed once for the whole column (blanks count as 0)
+    df = to_frame(data, {"Quantity": "int"})
+    if 'Quantity' in df.columns:
+        df['Quantity'] = df['Quantity'].fillna(0)
 
     # Stats
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Total Items", f"{len(df):,}")
     with col2:
-        total_qty = df['Quantity'].apply(lambda x: int(float(str(x).replace(',', ''))) if x else 0).sum()
+        total_qty = int(df['Quantity'].sum()) if 'Quantity' in df.columns else 0
         st.metric("Total Qty", f"{total_qty:,}")
     with col3:
         categories = df['Category'].nunique() if 'Category' in df.columns else 0
@@ -1147,25 +1145,15 @@ def labels_page():
     if generate and method == "Use current quantities":
         with st.status("Generating labels...", expanded=True) as status:
             try:
-                output = [["Product", "Barcode", "Price"]]
-                total = 0
-
-                for _, row in filtered.iterrows():
-                    name = row.get('Name', '')
-                    sku = row.get('SKU Code', '')
-                    price = row.get('Selling Price', '')
-                    qty_str = str(row.get('Quantity', 0)).replace(',', '')
-                    qty = int(float(qty_str)) if qty_str else 0
-
-                    for _ in range(qty):
-                        output.append([name, sku, price])
-                        total += 1
+                # One label row per unit in stock
+                label_cols = ['Name', 'SKU Code', 'Selling Price']
+                labels = filtered.reindex(columns=label_cols, fill_value='')
+                labels = labels.loc[labels.index.repeat(filtered['Quantity'].clip(lower=0))]
 
-                sheets.clear_sheet(SHEET_WEPRINT)
-                sheets.write_sheet(SHEET_WEPRINT, output)
+                output = [["Product", "Barcode", "Price"]] + labels.values.tolist()
+                total = len(labels)
 
-                if len(output) > 1:
-                    sheets.format_as_text(SHEET_WEPRINT, f"B2:B{len(output)}")
+                sheets.replace_sheet(SHEET_WEPRINT, output, formats={"B": "text"})
 
                 status.update(label="Labels generated", state="complete")
                 st.success(f"Generated {total:,} labels")
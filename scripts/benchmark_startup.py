@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures time-to-first-read for the CLI (main.py) and the web UI (app.py)
+
+Each run starts a fresh Python process that imports the entry point's
+modules, creates the SheetsManager and reads the inventory tab, just like
+the first thing either tool does. Reports the median of several runs.
+
+Usage:
+    python scripts/benchmark_startup.py                 # both targets, 5 runs each
+    python scripts/benchmark_startup.py --target main --runs 10
+    python scripts/benchmark_startup.py --no-cache      # bypass the local sheet cache
+    python scripts/benchmark_startup.py --output startup.json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+PHASES = ["imports", "init", "first_read"]
+
+
+def probe(target, no_cache=False):
+    """Run inside the child process: time each start-up phase and print JSON"""
+    started = time.perf_counter()
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+    if target == "main":
+        sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+        import main  # noqa: F401 - same imports as `python scripts/main.py`
+        from utils.sheets import SheetsManager
+        from config import SHEET_MYBILLBOOK_CURRENT
+
+        imported = time.perf_counter()
+        disable_cache(no_cache)
+        sheets = SheetsManager()
+        initialized = time.perf_counter()
+        rows = sheets.read_sheet(SHEET_MYBILLBOOK_CURRENT)
+    else:
+        import runpy
+
+        # Executes the page set-up but not main(), as a fresh session would
+        app = runpy.run_path(str(PROJECT_ROOT / "scripts" / "app.py"), run_name="benchmark")
+        from config import SHEET_MYBILLBOOK_CURRENT
+
+        imported = time.perf_counter()
+        disable_cache(no_cache)
+        sheets = app["get_sheets_manager"]()
+        initialized = time.perf_counter()
+        rows = sheets.read_sheet(SHEET_MYBILLBOOK_CURRENT) if sheets else []
+
+    finished = time.perf_counter()
+    print(json.dumps({
+        "imports": imported - started,
+        "init": initialized - imported,
+        "first_read": finished - initialized,
+        "rows": len(rows or []),
+    }))
+
+
+def disable_cache(no_cache):
+    """Turn off the local sheet cache for managers created after this call"""
+    if no_cache:
+        import utils.sheets
+        utils.sheets.SHEETS_CACHE_ENABLED = False
+
+
+def run_once(target, no_cache):
+    """Start one child process and collect its phase timings"""
+    command = [sys.executable, __file__, "--probe", target]
+    if no_cache:
+        command.append("--no-cache")
+
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+
+    if result.returncode != 0:
+        raise RuntimeError(f"{target} probe failed:\n{result.stderr.strip()}")
+
+    # The probe's JSON is the last line; anything before it is app output
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process"] = elapsed
+    return timings
+
+
+def benchmark(target, runs, no_cache):
+    """Run the probe several times and return median timings"""
+    samples = [run_once(target, no_cache) for _ in range(runs)]
+    summary = {
+        phase: statistics.median(sample[phase] for sample in samples)
+        for phase in PHASES + ["process"]
+    }
+    summary["time_to_first_read"] = statistics.median(
+        sum(sample[phase] for phase in PHASES) for sample in samples)
+    summary["rows"] = samples[-1]["rows"]
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure start-up time to the first sheet read")
+    parser.add_argument("--target", choices=["main", "app", "all"], default="all")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes per target (default 5)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the local sheet cache")
+    parser.add_argument("--output", help="Also save the results to this JSON file")
+    parser.add_argument("--probe", choices=["main", "app"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.probe, args.no_cache)
+        return
+
+    targets = ["main", "app"] if args.target == "all" else [args.target]
+    results = {}
+
+    print("\n" + "=" * 60)
+    print(f"STARTUP BENCHMARK (median of {args.runs} runs)")
+    print("=" * 60)
+
+    for target in targets:
+        try:
+            results[target] = benchmark(target, args.runs, args.no_cache)
+        except Exception as e:
+            print(f"\n[ERROR] {target}: {e}")
+            continue
+
+        r = results[target]
+        print(f"\n{target}.py")
+        print(f"  Imports:            {r['imports'] * 1000:8.0f} ms")
+        print(f"  SheetsManager():    {r['init'] * 1000:8.0f} ms")
+        print(f"  First read:         {r['first_read'] * 1000:8.0f} ms ({r['rows']} rows)")
+        print(f"  Time to first read: {r['time_to_first_read'] * 1000:8.0f} ms")
+        print(f"  Whole process:      {r['process'] * 1000:8.0f} ms")
+
+    if args.output and results:
+        with open(args.output, "w") as f:
+            json.dump({
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "runs": args.runs,
+                "sheet_cache": not args.no_cache,
+                "results": results,
+            }, f, indent=2)
+        print(f"\n[OK] Results saved to {args.output}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
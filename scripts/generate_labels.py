@@ -187,12 +187,8 @@ def generate_weprint_labels(sheets_manager):
 
     # Write to WePrint sheet
     print(f"\nWriting {total_labels} labels to WePrint sheet...")
-    sheets_manager.clear_sheet(SHEET_WEPRINT)
-    sheets_manager.write_sheet(SHEET_WEPRINT, output)
-
-    # Format Barcode column as text
-    if len(output) > 1:
-        sheets_manager.format_as_text(SHEET_WEPRINT, f"B2:B{len(output)}")
+    # Barcode column is formatted as text
+    sheets_manager.replace_sheet(SHEET_WEPRINT, output, formats={"B": "text"})
 
     print(f"\n[OK] WePrint labels generated successfully! {total_labels} labels total")
 
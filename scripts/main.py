@@ -14,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.sheets import SheetsManager
 from transforms.transform1_consolidate import consolidate_inventory
 from transforms.transform2_mybillbook import export_to_mybillbook
+from transforms.pipeline import run_pipeline
 from mybillbook.sync import sync_to_sheets
 
 
@@ -69,17 +70,19 @@ def main():
                 try:
                     print("\nStep 1: Syncing MyBillBook Inventory...")
                     sync_to_sheets(sheets)
-                    print("\nStep 2: Consolidating Inventory...")
-                    consolidate_inventory(sheets)
-                    print("\nStep 3: Generating MyBillBook Import Data...")
-                    export_to_mybillbook(sheets)
-                    print("\n" + "="*50)
-                    print("[OK] ALL OPERATIONS COMPLETED SUCCESSFULLY!")
-                    print("="*50)
-                    print("[OK] MyBillBook inventory synced")
-                    print("[OK] Inventory consolidated")
-                    print("[OK] MyBillBook data exported")
-                    print("="*50)
+                    # Transform 1 -> Transform 2 -> WePrint in memory, one write at the end
+                    print("\nStep 2: Running Transforms...")
+                    if run_pipeline(sheets) is None:
+                        print("\n[ERROR] Transforms did not complete; output tabs were not updated")
+                    else:
+                        print("\n" + "="*50)
+                        print("[OK] ALL OPERATIONS COMPLETED SUCCESSFULLY!")
+                        print("="*50)
+                        print("[OK] MyBillBook inventory synced")
+                        print("[OK] Inventory consolidated")
+                        print("[OK] MyBillBook data exported")
+                        print("[OK] WePrint labels generated")
+                        print("="*50)
                 except Exception as e:
                     print(f"\n[ERROR] Error during operations: {str(e)}")
 
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+MyBillBook Fetch Benchmark
+Times the MyBillBook fetch paths against the local stand-in server
+(mybillbook/fake_server.py), so changes to paging, concurrency, retries and
+caching can be compared on one machine without credentials
+
+Each case runs against the same seeded dataset and reports wall time,
+requests sent, 429s served and records returned.
+
+Usage:
+    python scripts/mybillbook/benchmark_fetch.py                      # 2000 invoices, no latency
+    python scripts/mybillbook/benchmark_fetch.py --invoices 100000 --latency 50 --rps 50
+    python scripts/mybillbook/benchmark_fetch.py --throttle-every 25 --max-per-page 50
+    python scripts/mybillbook/benchmark_fetch.py --url http://127.0.0.1:8765/api/web
+    python scripts/mybillbook/benchmark_fetch.py --output fetch.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+CASES = ["items", "invoices", "invoices_stream", "invoice_details", "invoice_details_cached", "async_invoices"]
+
+
+def configure(base_url, rps, tuning):
+    """Point the clients at base_url; must run before mybillbook.api_client is imported"""
+    os.environ["MYBILLBOOK_BASE_URL"] = base_url
+    os.environ.setdefault("MYBILLBOOK_AUTH_TOKEN", "Bearer benchmark")
+    os.environ.setdefault("MYBILLBOOK_COMPANY_ID", "benchmark")
+
+    import mybillbook.api_client as api_client
+    from utils.rate_limit import TokenBucket
+
+    api_client.MyBillBookAPI._rate_limiter = TokenBucket(rps, per=1, capacity=rps)
+    # Learned page sizes would make runs depend on the ones before them
+    api_client.ADAPTIVE_TUNING = tuning
+
+
+def reset_stats(server):
+    """Zero the stand-in's request counters (no-op for a server started elsewhere)"""
+    if server:
+        server.stats.update(requests=0, throttled=0, not_found=0, failed=0)
+
+
+def run_case(case, server, invoices_limit):
+    """Run one fetch path and return (seconds, records)"""
+    from mybillbook.api_client import MyBillBookAPI
+
+    # Each case gets a fresh circuit breaker and retry budget
+    MyBillBookAPI.start_run()
+    with MyBillBookAPI() as api:
+        return _run_case(api, case, server, invoices_limit)
+
+
+def _run_case(api, case, server, invoices_limit):
+    from mybillbook.details import DetailFetcher
+    from mybillbook.detail_cache import DetailCache
+
+    if case == "items":
+        started = time.perf_counter()
+        result = api.get_all_items()
+        return time.perf_counter() - started, len((result or {}).get("inventory_items", []))
+
+    if case == "invoices":
+        started = time.perf_counter()
+        result = api.get_sales_invoices()
+        return time.perf_counter() - started, len((result or {}).get("vouchers", []))
+
+    if case == "invoices_stream":
+        started = time.perf_counter()
+        records = sum(1 for _ in api.iter_sales_invoices())
+        return time.perf_counter() - started, records
+
+    if case == "async_invoices":
+        from mybillbook.async_client import SyncMyBillBookAPI, httpx_available
+        if not httpx_available():
+            return None, 0
+        client = SyncMyBillBookAPI()
+        try:
+            started = time.perf_counter()
+            result = client.get_sales_invoices()
+            return time.perf_counter() - started, len((result or {}).get("vouchers", []))
+        finally:
+            client.close()
+
+    # Detail cases: fetch details for the newest invoices (not timed), then
+    # time the detail pass, once against an empty cache and once warm
+    vouchers = list(api.iter_sales_invoices())[:invoices_limit]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "details.sqlite3")
+        if case == "invoice_details_cached":
+            warm = DetailCache(cache_path)
+            for _ in DetailFetcher(api, "/invoices/{id}", cache=warm).iter_details(vouchers):
+                pass
+            warm.close()
+
+        reset_stats(server)
+        cache = DetailCache(cache_path) if case == "invoice_details_cached" else None
+        fetcher = DetailFetcher(api, "/invoices/{id}", cache=cache)
+        started = time.perf_counter()
+        records = sum(1 for _, details in fetcher.iter_details(vouchers) if details)
+        elapsed = time.perf_counter() - started
+        if cache:
+            cache.close()
+        return elapsed, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MyBillBook fetch paths against a local stand-in")
+    parser.add_argument("--case", choices=CASES + ["all"], default="all")
+    parser.add_argument("--url", help="Use an already running stand-in server at this base URL")
+    parser.add_argument("--fixtures", help="Serve a recorded JSON dataset instead of synthetic data")
+    parser.add_argument("--items", type=int, default=500, help="Synthetic inventory items (default 500)")
+    parser.add_argument("--invoices", type=int, default=2000, help="Synthetic sales invoices (default 2000)")
+    parser.add_argument("--details", type=int, default=200, help="Invoices in the detail cases (default 200)")
+    parser.add_argument("--latency", type=float, default=0, help="Server delay per response, ms")
+    parser.add_argument("--jitter", type=float, default=0, help="Extra random server delay up to this many ms")
+    parser.add_argument("--max-per-page", type=int, default=100, help="Server-side cap on per_page")
+    parser.add_argument("--throttle-every", type=int, default=0, help="Server answers every Nth request with 429")
+    parser.add_argument("--rps", type=float, default=1000,
+                        help="Client rate limit for the benchmark (default 1000; the real client uses REQUESTS_PER_SECOND)")
+    parser.add_argument("--tuning", action="store_true", help="Keep adaptive page-size tuning on (uses the saved tuning state)")
+    parser.add_argument("--output", help="Also save the results to this JSON file")
+    args = parser.parse_args()
+
+    from mybillbook.fake_server import Dataset, start_server
+
+    # A server started elsewhere (--url) has no request counters to read
+    server = None
+    if not args.url:
+        if args.fixtures:
+            dataset = Dataset.load_fixtures(args.fixtures)
+        else:
+            dataset = Dataset(items=args.items, invoices=args.invoices, expenses=0)
+        server = start_server(
+            dataset,
+            latency_ms=args.latency, jitter_ms=args.jitter, max_per_page=args.max_per_page,
+            throttle_every=args.throttle_every, retry_after=0,
+        )
+    base_url = args.url or server.base_url
+
+    configure(base_url, args.rps, args.tuning)
+
+    cases = CASES if args.case == "all" else [args.case]
+    results = {}
+
+    print("\n" + "=" * 60)
+    print(f"FETCH BENCHMARK ({base_url})")
+    print("=" * 60)
+
+    try:
+        for case in cases:
+            reset_stats(server)
+            print(f"\n--- {case} ---")
+            try:
+                elapsed, records = run_case(case, server, args.details)
+            except Exception as e:
+                print(f"[ERROR] {case}: {e}")
+                continue
+            if elapsed is None:
+                print(f"[WARN] Skipped {case}: httpx is not installed")
+                continue
+            results[case] = {"seconds": elapsed, "records": records, **(server.stats if server else {})}
+    finally:
+        if server:
+            server.shutdown()
+
+    print("\n" + "=" * 60)
+    print("RESULTS")
+    print("=" * 60)
+    for case, r in results.items():
+        requests = f"{r['requests']:6d} requests, {r['throttled']:4d} x 429" if "requests" in r else ""
+        print(f"  {case:24s} {r['seconds'] * 1000:9.0f} ms  {r['records']:7d} records  {requests}")
+
+    if args.output and results:
+        with open(args.output, "w") as f:
+            json.dump({
+                "recorded_at": datetime.now().isoformat(timespec="seconds"),
+                "settings": {key: value for key, value in vars(args).items() if key not in ("output", "case")},
+                "results": results,
+            }, f, indent=2)
+        print(f"\n[OK] Results saved to {args.output}")
+
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,14 +8,16 @@ Creates a denormalized table with one row per expense item
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-import time
 
 # Add project root to path (two levels up: scripts/mybillbook -> scripts -> root)
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from utils.sheets import SheetsManager
-from mybillbook.api_client import MyBillBookAPI
-from mybillbook.config import has_credentials
+from mybillbook.async_client import create_api
+from mybillbook.config import has_credentials, DETAIL_CACHE_ENABLED
+from mybillbook.detail_cache import DetailCache
+from mybillbook.details import DetailFetcher
+from mybillbook.incremental import IncrementalSync
 from utils.csv_exporter import export_sheet_data, create_safety_backup
 
 
@@ -23,25 +25,50 @@ from utils.csv_exporter import export_sheet_data, create_safety_backup
 LINE_ITEMS_SHEET = "Expense Line Items"  # Sheet name in Google Sheets
 
 
-def fetch_expense_details(api, expense_id):
-    """
-    Fetch detailed expense including line items
-
-    Args:
-        api: MyBillBookAPI instance
-        expense_id: Expense ID
-
-    Returns:
-        Expense details dict with 'txn_ledgers' array, or None if failed
-    """
-    result = api._make_request(f'/expense/{expense_id}')
-    return result
+def line_item_row(item):
+    """Sheet row for one flattened line item, in header order"""
+    return [
+        item["expense_number"],
+        item["expense_date"],
+        item["expense_category"],
+        item["expense_category_id"],
+        item["expense_total"],
+        item["payment_mode"],
+        item["payment_type"],
+        item["expense_discount"],
+        item["expense_discount_type"],
+        item["round_off"],
+        item["place_of_supply"],
+        item["contact_name"],
+        item["contact_id"],
+        item["item_name"],
+        item["item_id"],
+        item["ledger_id"],
+        item["quantity"],
+        item["unit"],
+        item["unit_long"],
+        item["price_per_unit"],
+        item["rate"],
+        item["item_total_amount"],
+        item["item_discount"],
+        item["item_discount_type"],
+        item["gst_percentage"],
+        item["is_tax_included"],
+        item["is_tax_applicable"],
+        item["is_tax_exempted"],
+        item["itc_type"],
+        item["item_type"],
+        item["identification_code"],
+        item["notes"],
+        item["source"],
+    ]
 
 
 def sync_expense_line_items_to_sheets(
     sheets_manager,
     start_date: str = None,
     end_date: str = None,
+    full: bool = False,
 ):
     """
     Sync expense line items to Google Sheets
@@ -50,6 +77,8 @@ def sync_expense_line_items_to_sheets(
         sheets_manager: SheetsManager instance
         start_date: Start date filter (YYYY-MM-DD), default is 1 year ago
         end_date: End date filter (YYYY-MM-DD), default is today
+        full: Re-fetch the whole date range instead of only the expenses
+              changed since the last sync
 
     Returns:
         True if successful, False otherwise
@@ -76,136 +105,7 @@ def sync_expense_line_items_to_sheets(
 
     print(f"Date range: {start_date} to {end_date}\n")
 
-    # Initialize API client
-    api = MyBillBookAPI()
-
-    # Test connection first
-    if not api.test_connection():
-        return False
-
-    # Step 1: Get all expenses (summary)
-    print("Step 1: Fetching all expenses...")
-    print("-" * 60)
-    result = api.get_expenses(
-        per_page=15,
-        start_date=start_date,
-        end_date=end_date,
-    )
-
-    if not result or "vouchers" not in result:
-        print("[ERROR] No expenses fetched. Sync failed.")
-        return False
-
-    expenses = result.get("vouchers", [])
-    total_expenses = result.get("total_count", 0)
-
-    if not expenses:
-        print("[INFO] No expenses found for the specified date range.")
-        return True
-
-    print(f"Found {len(expenses)} expenses to process\n")
-
-    # Step 2: Fetch detailed expense for each to get line items
-    print("Step 2: Fetching line items from each expense...")
-    print("-" * 60)
-
-    all_line_items = []
-    expenses_with_items = 0
-    expenses_without_items = 0
-    total_items_found = 0
-
-    for idx, expense in enumerate(expenses, 1):
-        expense_id = expense.get("id")
-        expense_number = expense.get("invoice_number")
-        expense_date = expense.get("invoice_date")
-        total_amount = expense.get("total_amount")
-        payment_mode = expense.get("payment_mode")
-
-        # Fetch detailed expense
-        print(f"  [{idx}/{len(expenses)}] Expense #{expense_number}...", end=" ")
-
-        details = fetch_expense_details(api, expense_id)
-
-        if details and "txn_ledgers" in details and details["txn_ledgers"]:
-            items = details["txn_ledgers"]
-            print(f"OK {len(items)} items")
-            expenses_with_items += 1
-            total_items_found += len(items)
-
-            # Get expense-level fields
-            expense_category = details.get("ledger_category_name", "")
-            expense_category_id = details.get("ledger_category_id", "")
-            payment_type = details.get("payment_type", "")
-            notes = details.get("notes", "")
-            source = details.get("source", "")
-            discount = float(details.get("discount") or 0)
-            discount_type = details.get("discount_type", "")
-            round_off = float(details.get("round_off") or 0)
-            place_of_supply = details.get("place_of_supply", "")
-
-            # Get contact info if available
-            contact_info = details.get("contact", {}) or {}
-            contact_name = contact_info.get("name", "") if contact_info else ""
-            contact_id = contact_info.get("id", "") if contact_info else ""
-
-            # Extract each line item
-            for item in items:
-                line_item = {
-                    "expense_number": expense_number,
-                    "expense_date": expense_date,
-                    "expense_category": expense_category,
-                    "expense_category_id": expense_category_id,
-                    "expense_total": float(total_amount) if total_amount else 0,
-                    "payment_mode": payment_mode,
-                    "payment_type": payment_type,
-                    "expense_discount": discount,
-                    "expense_discount_type": discount_type,
-                    "round_off": round_off,
-                    "place_of_supply": place_of_supply,
-                    "contact_name": contact_name,
-                    "contact_id": contact_id,
-                    "item_name": item.get("name", ""),
-                    "item_id": item.get("id", ""),
-                    "ledger_id": item.get("ledger_id", ""),
-                    "quantity": float(item.get("quantity") or 0),
-                    "unit": item.get("unit", ""),
-                    "unit_long": item.get("unit_long", ""),
-                    "price_per_unit": float(item.get("price_per_unit") or 0),
-                    "rate": float(item.get("rate") or 0),
-                    "item_total_amount": float(item.get("total_amount") or 0),
-                    "item_discount": float(item.get("discount") or 0),
-                    "item_discount_type": item.get("discount_type", ""),
-                    "gst_percentage": float(item.get("gst_percentage") or 0),
-                    "is_tax_included": "Yes" if item.get("is_tax_included") else "No",
-                    "is_tax_applicable": "Yes" if item.get("is_tax_applicable") else "No",
-                    "is_tax_exempted": "Yes" if item.get("is_tax_exempted") else "No",
-                    "itc_type": item.get("itc_type", ""),
-                    "item_type": item.get("item_type", ""),
-                    "identification_code": item.get("identification_code", ""),
-                    "notes": notes,
-                    "source": source,
-                }
-                all_line_items.append(line_item)
-        else:
-            print("-- No items")
-            expenses_without_items += 1
-
-        # Small delay to be nice to API
-        if idx % 10 == 0:
-            time.sleep(0.5)
-
-    print()
-    print(f"Summary:")
-    print(f"  Expenses with items: {expenses_with_items}")
-    print(f"  Expenses without items: {expenses_without_items}")
-    print(f"  Total line items found: {total_items_found}")
-    print()
-
-    if not all_line_items:
-        print("[INFO] No line items found.")
-        return True
-
-    # Prepare data for Google Sheets
+    # Columns for Google Sheets
     headers = [
         "Expense Number",
         "Expense Date",
@@ -242,95 +142,210 @@ def sync_expense_line_items_to_sheets(
         "Source",
     ]
 
-    rows = []
-    for item in all_line_items:
-        row = [
-            item["expense_number"],
-            item["expense_date"],
-            item["expense_category"],
-            item["expense_category_id"],
-            item["expense_total"],
-            item["payment_mode"],
-            item["payment_type"],
-            item["expense_discount"],
-            item["expense_discount_type"],
-            item["round_off"],
-            item["place_of_supply"],
-            item["contact_name"],
-            item["contact_id"],
-            item["item_name"],
-            item["item_id"],
-            item["ledger_id"],
-            item["quantity"],
-            item["unit"],
-            item["unit_long"],
-            item["price_per_unit"],
-            item["rate"],
-            item["item_total_amount"],
-            item["item_discount"],
-            item["item_discount_type"],
-            item["gst_percentage"],
-            item["is_tax_included"],
-            item["is_tax_applicable"],
-            item["is_tax_exempted"],
-            item["itc_type"],
-            item["item_type"],
-            item["identification_code"],
-            item["notes"],
-            item["source"],
-        ]
-        rows.append(row)
-
-    output = [headers] + rows
-
-    # Create SAFETY BACKUP before clearing (automatic, no prompt)
-    create_safety_backup(sheets_manager, LINE_ITEMS_SHEET, "expense_line_items_BACKUP")
+    # Initialize API client (async httpx client if MYBILLBOOK_ASYNC=1)
+    api = create_api()
+    # However fetching ends, the client is closed (releasing its connection pool
+    # and the async client's event loop thread) and the detail cache is saved,
+    # so details fetched before an error or an open circuit are kept for the
+    # next run
+    cache = None
+    try:
+        # Test connection first
+        if not api.test_connection():
+            return False
+
+        # Only fetch what changed since the last sync, unless a full run is due
+        sync = IncrementalSync(sheets_manager, LINE_ITEMS_SHEET, "expense_line_items", headers,
+                               key_column="Expense Number", date_column="Expense Date")
+        fetch_start, fetch_end = sync.plan(start_date, end_date, full=full)
+
+        # Step 1: Get all expenses (summary)
+        print("Step 1: Fetching all expenses...")
+        print("-" * 60)
+        expenses = api.iter_expenses(
+            start_date=fetch_start,
+            end_date=fetch_end,
+        )
+
+        # Step 2: Fetch detailed expense for each to get line items (starts with the first page of expenses)
+        print("Step 2: Fetching line items from each expense...")
+        print("-" * 60)
+
+        rows = []
+        expenses_with_items = 0
+        expenses_without_items = 0
+        total_items_found = 0
+
+        # Details are fetched in parallel but handed back in expense order;
+        # unchanged expenses come from the local detail cache instead
+        cache = DetailCache() if DETAIL_CACHE_ENABLED else None
+        fetcher = DetailFetcher(api, "/expense/{id}", cache=cache)
+        for idx, (expense, details) in enumerate(fetcher.iter_details(expenses), 1):
+            expense_number = expense.get("invoice_number")
+            # A failed detail fetch keeps the expense's rows already in the sheet
+            sync.track(expense, key=expense_number, fetched=details is not None)
+            expense_date = expense.get("invoice_date")
+            total_amount = expense.get("total_amount")
+            payment_mode = expense.get("payment_mode")
+
+            print(f"  [{idx}/{expenses.total_count or '?'}] Expense #{expense_number}...", end=" ")
+
+            if details and "txn_ledgers" in details and details["txn_ledgers"]:
+                items = details["txn_ledgers"]
+                print(f"OK {len(items)} items")
+                expenses_with_items += 1
+                total_items_found += len(items)
+
+                # Get expense-level fields
+                expense_category = details.get("ledger_category_name", "")
+                expense_category_id = details.get("ledger_category_id", "")
+                payment_type = details.get("payment_type", "")
+                notes = details.get("notes", "")
+                source = details.get("source", "")
+                discount = float(details.get("discount") or 0)
+                discount_type = details.get("discount_type", "")
+                round_off = float(details.get("round_off") or 0)
+                place_of_supply = details.get("place_of_supply", "")
+
+                # Get contact info if available
+                contact_info = details.get("contact", {}) or {}
+                contact_name = contact_info.get("name", "") if contact_info else ""
+                contact_id = contact_info.get("id", "") if contact_info else ""
+
+                # Extract each line item
+                for item in items:
+                    line_item = {
+                        "expense_number": expense_number,
+                        "expense_date": expense_date,
+                        "expense_category": expense_category,
+                        "expense_category_id": expense_category_id,
+                        "expense_total": float(total_amount) if total_amount else 0,
+                        "payment_mode": payment_mode,
+                        "payment_type": payment_type,
+                        "expense_discount": discount,
+                        "expense_discount_type": discount_type,
+                        "round_off": round_off,
+                        "place_of_supply": place_of_supply,
+                        "contact_name": contact_name,
+                        "contact_id": contact_id,
+                        "item_name": item.get("name", ""),
+                        "item_id": item.get("id", ""),
+                        "ledger_id": item.get("ledger_id", ""),
+                        "quantity": float(item.get("quantity") or 0),
+                        "unit": item.get("unit", ""),
+                        "unit_long": item.get("unit_long", ""),
+                        "price_per_unit": float(item.get("price_per_unit") or 0),
+                        "rate": float(item.get("rate") or 0),
+                        "item_total_amount": float(item.get("total_amount") or 0),
+                        "item_discount": float(item.get("discount") or 0),
+                        "item_discount_type": item.get("discount_type", ""),
+                        "gst_percentage": float(item.get("gst_percentage") or 0),
+                        "is_tax_included": "Yes" if item.get("is_tax_included") else "No",
+                        "is_tax_applicable": "Yes" if item.get("is_tax_applicable") else "No",
+                        "is_tax_exempted": "Yes" if item.get("is_tax_exempted") else "No",
+                        "itc_type": item.get("itc_type", ""),
+                        "item_type": item.get("item_type", ""),
+                        "identification_code": item.get("identification_code", ""),
+                        "notes": notes,
+                        "source": source,
+                    }
+                    rows.append(line_item_row(line_item))
+            elif details is None:
+                print("!! Failed to fetch details")
+            else:
+                print("-- No items")
+                expenses_without_items += 1
+    finally:
+        if cache:
+            cache.close()
+        api.close()
 
-    # Write to Google Sheets
-    print(f"Writing {len(rows)} expense line items to Google Sheets...")
-    sheets_manager.clear_sheet(LINE_ITEMS_SHEET)
-    sheets_manager.write_sheet(LINE_ITEMS_SHEET, output)
+    print()
+    print(f"Summary:")
+    print(f"  Expenses with items: {expenses_with_items}")
+    print(f"  Expenses without items: {expenses_without_items}")
+    print(f"  Expenses whose details failed: {fetcher.stats['failed']}")
+    if cache:
+        print(f"  Detail cache: {cache.summary()}, {fetcher.stats['fetched']} fetched from MyBillBook")
+    print(f"  Total line items found: {total_items_found}")
+    print()
 
-    # Apply formatting
-    if len(rows) > 0:
-        last_row = len(rows) + 1
+    # Stopped because MyBillBook went down: resume from the detail cache next run
+    if fetcher.stopped:
+        print("[ERROR] MyBillBook stopped responding, so the sync stopped early; the sheet was left unchanged.")
+        if cache:
+            print(f"[INFO] {fetcher.stats['fetched']} expense details fetched before it stopped are saved in the "
+                  f"detail cache. Run the sync again later to resume from there.")
+        else:
+            print("[WARN] The detail cache is off (DETAIL_CACHE_ENABLED), so the next run starts over.")
+        return False
+
+    # A partial list would drop the missing expenses from the sheet, so don't sync it
+    if not expenses.complete:
+        print("[ERROR] Some expense pages could not be fetched. Sync aborted; the sheet was left unchanged.")
+        return False
 
+    if not expenses.fetched and sync.full:
+        print("[INFO] No expenses found for the specified date range.")
+        return True
+
+    if not rows and sync.full:
+        print("[INFO] No line items found.")
+        return True
+
+    # Keep the rows of earlier vouchers that weren't re-fetched
+    output = sync.merge(rows)
+
+    # Create SAFETY BACKUP before writing (automatic, no prompt)
+    create_safety_backup(sheets_manager, LINE_ITEMS_SHEET, "expense_line_items_BACKUP")
+
+    # Write only the rows that changed since the last sync
+    # Ledger lines have no Item ID, so the ledger and name complete the key
+    key_columns = ["Expense Number", "Item ID", "Ledger ID", "Item Name"]
+    print(f"Writing {len(rows)} expense line items to Google Sheets...")
+    result = sheets_manager.upsert_rows(LINE_ITEMS_SHEET, output, key_columns=key_columns, formats={
         # Text columns
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"A2:A{last_row}")  # Expense Number
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"B2:B{last_row}")  # Expense Date
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"C2:C{last_row}")  # Expense Category
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"D2:D{last_row}")  # Expense Category ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"F2:F{last_row}")  # Payment Mode
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"G2:G{last_row}")  # Payment Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"I2:I{last_row}")  # Expense Discount Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"K2:K{last_row}")  # Place of Supply
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"L2:L{last_row}")  # Contact Name
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"M2:M{last_row}")  # Contact ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"N2:N{last_row}")  # Item Name
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"O2:O{last_row}")  # Item ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"P2:P{last_row}")  # Ledger ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"R2:R{last_row}")  # Unit
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"S2:S{last_row}")  # Unit Long
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"X2:X{last_row}")  # Item Discount Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"Z2:Z{last_row}")  # Tax Included
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AA2:AA{last_row}")  # Tax Applicable
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AB2:AB{last_row}")  # Tax Exempted
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AC2:AC{last_row}")  # ITC Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AD2:AD{last_row}")  # Item Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AE2:AE{last_row}")  # Identification Code
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AF2:AF{last_row}")  # Notes
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AG2:AG{last_row}")  # Source
+        "A": "text",  # Expense Number
+        "B": "text",  # Expense Date
+        "C": "text",  # Expense Category
+        "D": "text",  # Expense Category ID
+        "F": "text",  # Payment Mode
+        "G": "text",  # Payment Type
+        "I": "text",  # Expense Discount Type
+        "K": "text",  # Place of Supply
+        "L": "text",  # Contact Name
+        "M": "text",  # Contact ID
+        "N": "text",  # Item Name
+        "O": "text",  # Item ID
+        "P": "text",  # Ledger ID
+        "R": "text",  # Unit
+        "S": "text",  # Unit Long
+        "X": "text",  # Item Discount Type
+        "Z": "text",  # Tax Included
+        "AA": "text",  # Tax Applicable
+        "AB": "text",  # Tax Exempted
+        "AC": "text",  # ITC Type
+        "AD": "text",  # Item Type
+        "AE": "text",  # Identification Code
+        "AF": "text",  # Notes
+        "AG": "text",  # Source
 
         # Numeric columns with 2 decimals
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"E2:E{last_row}", decimal_places=2)  # Expense Total
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"H2:H{last_row}", decimal_places=2)  # Expense Discount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"J2:J{last_row}", decimal_places=2)  # Round Off
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"Q2:Q{last_row}", decimal_places=2)  # Quantity
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"T2:T{last_row}", decimal_places=2)  # Price Per Unit
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"U2:U{last_row}", decimal_places=2)  # Rate
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"V2:V{last_row}", decimal_places=2)  # Item Total Amount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"W2:W{last_row}", decimal_places=2)  # Item Discount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"Y2:Y{last_row}", decimal_places=2)  # GST %
+        "E": ("number", 2),  # Expense Total
+        "H": ("number", 2),  # Expense Discount
+        "J": ("number", 2),  # Round Off
+        "Q": ("number", 2),  # Quantity
+        "T": ("number", 2),  # Price Per Unit
+        "U": ("number", 2),  # Rate
+        "V": ("number", 2),  # Item Total Amount
+        "W": ("number", 2),  # Item Discount
+        "Y": ("number", 2),  # GST %
+    })
+    if result is None:
+        # Nothing was written, so the watermark must not move past these rows
+        print(f"[ERROR] Writing to '{LINE_ITEMS_SHEET}' failed; the sync watermark was not updated. Run the sync again.")
+        return False
+    sync.commit(output)
 
     print(f"\n[OK] Successfully synced {len(rows)} expense line items from {expenses_with_items} expenses!")
     print(f"     Sheet: '{LINE_ITEMS_SHEET}'")
@@ -362,10 +377,12 @@ def main():
         print("2. Last 90 days")
         print("3. Last 1 year (default)")
         print("4. Custom date range")
-        choice = input("\nEnter your choice (1-4, default=3): ").strip() or "3"
+        print("5. Full reconciliation (last 1 year, re-checks every expense)")
+        choice = input("\nEnter your choice (1-5, default=3): ").strip() or "3"
 
         start_date = None
         end_date = None
+        full = False
 
         if choice == "1":
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -387,13 +404,17 @@ def main():
                 print("[ERROR] Invalid date format. Using default (last 1 year).")
                 start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
                 end_date = datetime.now().strftime("%Y-%m-%d")
+        elif choice == "5":
+            start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+            end_date = datetime.now().strftime("%Y-%m-%d")
+            full = True
         else:
             print("[INFO] Invalid choice. Using default (last 1 year).")
             start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
             end_date = datetime.now().strftime("%Y-%m-%d")
 
         # Run sync
-        success = sync_expense_line_items_to_sheets(sheets, start_date, end_date)
+        success = sync_expense_line_items_to_sheets(sheets, start_date, end_date, full=full)
 
         if success:
             print("\n" + "="*60)
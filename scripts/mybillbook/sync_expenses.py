@@ -12,8 +12,9 @@ from datetime import datetime, timedelta
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from utils.sheets import SheetsManager
-from mybillbook.api_client import MyBillBookAPI
+from mybillbook.async_client import create_api
 from mybillbook.config import has_credentials
+from mybillbook.incremental import IncrementalSync
 from utils.csv_exporter import export_sheet_data, create_safety_backup
 
 
@@ -25,6 +26,7 @@ def sync_expenses_to_sheets(
     sheets_manager,
     start_date: str = None,
     end_date: str = None,
+    full: bool = False,
 ):
     """
     Sync MyBillBook expenses to Google Sheets
@@ -33,6 +35,8 @@ def sync_expenses_to_sheets(
         sheets_manager: SheetsManager instance
         start_date: Start date filter (YYYY-MM-DD), default is 1 year ago
         end_date: End date filter (YYYY-MM-DD), default is today
+        full: Re-fetch the whole date range instead of only the expenses
+              changed since the last sync
 
     Returns:
         True if successful, False otherwise
@@ -59,32 +63,7 @@ def sync_expenses_to_sheets(
 
     print(f"Date range: {start_date} to {end_date}\n")
 
-    # Initialize API client
-    api = MyBillBookAPI()
-
-    # Test connection first
-    if not api.test_connection():
-        return False
-
-    # Fetch expenses
-    result = api.get_expenses(
-        per_page=15,
-        start_date=start_date,
-        end_date=end_date,
-    )
-
-    if not result or "vouchers" not in result:
-        print("[ERROR] No expenses fetched. Sync failed.")
-        return False
-
-    vouchers = result.get("vouchers", [])
-    total_count = result.get("total_count", 0)
-
-    if not vouchers:
-        print("[INFO] No expenses found for the specified date range.")
-        return True
-
-    # Prepare data for Google Sheets
+    # Columns for Google Sheets
     headers = [
         "Expense Number",
         "Expense Date",
@@ -107,75 +86,108 @@ def sync_expenses_to_sheets(
         "Share Link",
     ]
 
-    rows = []
-    for voucher in vouchers:
-        # Extract first transaction ledger item name
-        txn_ledgers = voucher.get("txn_ledgers", [])
-        expense_item = ""
-        line_items_count = len(txn_ledgers)
-
-        if txn_ledgers and len(txn_ledgers) > 0:
-            expense_item = txn_ledgers[0].get("name", "")
-
-        row = [
-            voucher.get("invoice_number", ""),
-            voucher.get("invoice_date", ""),
-            voucher.get("serial_number", ""),
-            voucher.get("ledger_category_name", ""),
-            expense_item,
-            line_items_count,
-            float(voucher.get("total_amount") or 0),
-            float(voucher.get("initial_payment_amount") or 0),
-            voucher.get("payment_mode", ""),
-            voucher.get("payment_type", ""),
-            voucher.get("created_at", ""),
-            voucher.get("id", ""),
-            voucher.get("mbb_id", ""),
-            voucher.get("notes", ""),
-            voucher.get("source", ""),
-            voucher.get("bank_account_id", ""),
-            voucher.get("contact_name", ""),
-            voucher.get("contact_id", ""),
-            voucher.get("share_link", ""),
-        ]
-        rows.append(row)
-
-    output = [headers] + rows
-
-    # Create SAFETY BACKUP before clearing (automatic, no prompt)
-    create_safety_backup(sheets_manager, EXPENSES_SHEET, "expenses_BACKUP")
+    # Initialize API client (async httpx client if MYBILLBOOK_ASYNC=1)
+    api = create_api()
+    # The client is closed however fetching ends, which releases its connection
+    # pool (and the async client's event loop thread)
+    try:
+        # Test connection first
+        if not api.test_connection():
+            return False
+
+        # Only fetch what changed since the last sync, unless a full run is due
+        sync = IncrementalSync(sheets_manager, EXPENSES_SHEET, "expenses", headers,
+                               key_column="ID", date_column="Expense Date")
+        fetch_start, fetch_end = sync.plan(start_date, end_date, full=full)
+
+        # Fetch expenses page by page, building rows as they arrive
+        vouchers = api.iter_expenses(
+            start_date=fetch_start,
+            end_date=fetch_end,
+        )
+
+        rows = []
+        for voucher in vouchers:
+            sync.track(voucher)
+            # Extract first transaction ledger item name
+            txn_ledgers = voucher.get("txn_ledgers", [])
+            expense_item = ""
+            line_items_count = len(txn_ledgers)
+
+            if txn_ledgers and len(txn_ledgers) > 0:
+                expense_item = txn_ledgers[0].get("name", "")
+
+            row = [
+                voucher.get("invoice_number", ""),
+                voucher.get("invoice_date", ""),
+                voucher.get("serial_number", ""),
+                voucher.get("ledger_category_name", ""),
+                expense_item,
+                line_items_count,
+                float(voucher.get("total_amount") or 0),
+                float(voucher.get("initial_payment_amount") or 0),
+                voucher.get("payment_mode", ""),
+                voucher.get("payment_type", ""),
+                voucher.get("created_at", ""),
+                voucher.get("id", ""),
+                voucher.get("mbb_id", ""),
+                voucher.get("notes", ""),
+                voucher.get("source", ""),
+                voucher.get("bank_account_id", ""),
+                voucher.get("contact_name", ""),
+                voucher.get("contact_id", ""),
+                voucher.get("share_link", ""),
+            ]
+            rows.append(row)
+    finally:
+        api.close()
+
+    # A partial list would drop the missing expenses from the sheet, so don't sync it
+    if not vouchers.complete:
+        print("[ERROR] Some expense pages could not be fetched. Sync aborted; the sheet was left unchanged.")
+        return False
 
-    # Write to Google Sheets
-    print(f"\nWriting {len(rows)} expenses to Google Sheets...")
-    sheets_manager.clear_sheet(EXPENSES_SHEET)
-    sheets_manager.write_sheet(EXPENSES_SHEET, output)
+    if not rows and sync.full:
+        print("[INFO] No expenses found for the specified date range.")
+        return True
 
-    # Apply formatting
-    if len(rows) > 0:
-        last_row = len(rows) + 1
+    # Keep the rows of earlier vouchers that weren't re-fetched
+    output = sync.merge(rows)
 
+    # Create SAFETY BACKUP before writing (automatic, no prompt)
+    create_safety_backup(sheets_manager, EXPENSES_SHEET, "expenses_BACKUP")
+
+    # Write only the rows that changed since the last sync
+    print(f"\nWriting {len(rows)} expenses to Google Sheets...")
+    result = sheets_manager.upsert_rows(EXPENSES_SHEET, output, key_columns=["ID"], formats={
         # Text columns
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"A2:A{last_row}")  # Expense Number
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"B2:B{last_row}")  # Expense Date
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"C2:C{last_row}")  # Serial Number
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"D2:D{last_row}")  # Expense Category
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"E2:E{last_row}")  # Expense Item
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"I2:I{last_row}")  # Payment Mode
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"J2:J{last_row}")  # Payment Type
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"K2:K{last_row}")  # Created At
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"L2:L{last_row}")  # ID
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"M2:M{last_row}")  # MBB ID
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"N2:N{last_row}")  # Notes
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"O2:O{last_row}")  # Source
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"P2:P{last_row}")  # Bank Account ID
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"Q2:Q{last_row}")  # Contact Name
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"R2:R{last_row}")  # Contact ID
-        sheets_manager.format_as_text(EXPENSES_SHEET, f"S2:S{last_row}")  # Share Link
+        "A": "text",  # Expense Number
+        "B": "text",  # Expense Date
+        "C": "text",  # Serial Number
+        "D": "text",  # Expense Category
+        "E": "text",  # Expense Item
+        "I": "text",  # Payment Mode
+        "J": "text",  # Payment Type
+        "K": "text",  # Created At
+        "L": "text",  # ID
+        "M": "text",  # MBB ID
+        "N": "text",  # Notes
+        "O": "text",  # Source
+        "P": "text",  # Bank Account ID
+        "Q": "text",  # Contact Name
+        "R": "text",  # Contact ID
+        "S": "text",  # Share Link
 
         # Numeric columns
-        sheets_manager.format_as_number(EXPENSES_SHEET, f"F2:F{last_row}", decimal_places=0)  # Line Items Count
-        sheets_manager.format_as_number(EXPENSES_SHEET, f"G2:G{last_row}", decimal_places=2)  # Total Amount
-        sheets_manager.format_as_number(EXPENSES_SHEET, f"H2:H{last_row}", decimal_places=2)  # Paid Amount
+        "F": "number",  # Line Items Count
+        "G": ("number", 2),  # Total Amount
+        "H": ("number", 2),  # Paid Amount
+    })
+    if result is None:
+        # Nothing was written, so the watermark must not move past these rows
+        print(f"[ERROR] Writing to '{EXPENSES_SHEET}' failed; the sync watermark was not updated. Run the sync again.")
+        return False
+    sync.commit(output)
 
     print(f"\n[OK] Successfully synced {len(rows)} expenses to '{EXPENSES_SHEET}' sheet!")
     print(f"     Date range: {start_date} to {end_date}")
@@ -206,10 +218,12 @@ def main():
         print("2. Last 90 days")
         print("3. Last 1 year (default)")
         print("4. Custom date range")
-        choice = input("\nEnter your choice (1-4, default=3): ").strip() or "3"
+        print("5. Full reconciliation (last 1 year, re-checks every expense)")
+        choice = input("\nEnter your choice (1-5, default=3): ").strip() or "3"
 
         start_date = None
         end_date = None
+        full = False
 
         if choice == "1":
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -231,13 +245,17 @@ def main():
                 print("[ERROR] Invalid date format. Using default (last 1 year).")
                 start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
                 end_date = datetime.now().strftime("%Y-%m-%d")
+        elif choice == "5":
+            start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+            end_date = datetime.now().strftime("%Y-%m-%d")
+            full = True
         else:
             print("[INFO] Invalid choice. Using default (last 1 year).")
             start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
             end_date = datetime.now().strftime("%Y-%m-%d")
 
         # Run sync
-        success = sync_expenses_to_sheets(sheets, start_date, end_date)
+        success = sync_expenses_to_sheets(sheets, start_date, end_date, full=full)
 
         if success:
             print("\n" + "="*60)
@@ -8,14 +8,16 @@ Creates a denormalized table with one row per product sold
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
-import time
 
 # Add project root to path (two levels up: scripts/mybillbook -> scripts -> root)
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from utils.sheets import SheetsManager
-from mybillbook.api_client import MyBillBookAPI
-from mybillbook.config import has_credentials
+from mybillbook.async_client import create_api
+from mybillbook.config import has_credentials, DETAIL_CACHE_ENABLED
+from mybillbook.detail_cache import DetailCache
+from mybillbook.details import DetailFetcher
+from mybillbook.incremental import IncrementalSync
 from utils.csv_exporter import export_sheet_data, create_safety_backup
 
 
@@ -23,25 +25,50 @@ from utils.csv_exporter import export_sheet_data, create_safety_backup
 LINE_ITEMS_SHEET = "Invoice Line Items"  # Sheet name in Google Sheets
 
 
-def fetch_invoice_details(api, invoice_id):
-    """
-    Fetch detailed invoice including line items
-
-    Args:
-        api: MyBillBookAPI instance
-        invoice_id: Invoice ID
-
-    Returns:
-        Invoice details dict with 'items' array, or None if failed
-    """
-    result = api._make_request(f'/invoices/{invoice_id}')
-    return result
+def line_item_row(item):
+    """Sheet row for one flattened line item, in header order"""
+    return [
+        item["invoice_number"],
+        item["invoice_date"],
+        item["contact_name"],
+        item["contact_id"],
+        item["invoice_total"],
+        item["payment_mode"],
+        item["invoice_discount"],
+        item["invoice_discount_type"],
+        item["round_off"],
+        item["tcs_amount"],
+        item["tds_amount"],
+        item["cess_amount"],
+        item["additional_charges"],
+        item["billing_address_id"],
+        item["shipping_address_id"],
+        item["item_name"],
+        item["sku_code"],
+        item["quantity"],
+        item["unit"],
+        item["selling_price"],
+        item["cost_price"],
+        item["profit"],
+        item["profit_margin_percent"],
+        item["item_discount"],
+        item["item_discount_type"],
+        item["item_discount_amount"],
+        item["gst_percentage"],
+        item["is_tax_included"],
+        item["item_final_amount"],
+        item["item_type"],
+        item["mrp"],
+        item["description"],
+        item["notes"],
+    ]
 
 
 def sync_invoice_line_items_to_sheets(
     sheets_manager,
     start_date: str = None,
     end_date: str = None,
+    full: bool = False,
 ):
     """
     Sync invoice line items to Google Sheets
@@ -50,6 +77,8 @@ def sync_invoice_line_items_to_sheets(
         sheets_manager: SheetsManager instance
         start_date: Start date filter (YYYY-MM-DD), default is 1 year ago
         end_date: End date filter (YYYY-MM-DD), default is today
+        full: Re-fetch the whole date range instead of only the invoices
+              changed since the last sync
 
     Returns:
         True if successful, False otherwise
@@ -76,157 +105,7 @@ def sync_invoice_line_items_to_sheets(
 
     print(f"Date range: {start_date} to {end_date}\n")
 
-    # Initialize API client
-    api = MyBillBookAPI()
-
-    # Test connection first
-    if not api.test_connection():
-        return False
-
-    # Step 1: Get all sales invoices (summary)
-    print("Step 1: Fetching all sales invoices...")
-    print("-" * 60)
-    result = api.get_sales_invoices(
-        per_page=15,
-        start_date=start_date,
-        end_date=end_date,
-        status="final",
-    )
-
-    if not result or "vouchers" not in result:
-        print("[ERROR] No invoices fetched. Sync failed.")
-        return False
-
-    invoices = result.get("vouchers", [])
-    total_invoices = result.get("total_count", 0)
-
-    if not invoices:
-        print("[INFO] No invoices found for the specified date range.")
-        return True
-
-    print(f"Found {len(invoices)} invoices to process\n")
-
-    # Step 2: Fetch detailed invoice for each to get line items
-    print("Step 2: Fetching line items from each invoice...")
-    print("-" * 60)
-
-    all_line_items = []
-    invoices_with_items = 0
-    invoices_without_items = 0
-    total_items_found = 0
-
-    for idx, invoice in enumerate(invoices, 1):
-        invoice_id = invoice.get("id")
-        invoice_number = invoice.get("invoice_number")
-        invoice_date = invoice.get("invoice_date")
-        contact_name = invoice.get("contact_name")
-        total_amount = invoice.get("total_amount")
-        payment_mode = invoice.get("payment_mode")
-
-        # Fetch detailed invoice
-        print(f"  [{idx}/{len(invoices)}] Invoice #{invoice_number}...", end=" ")
-
-        details = fetch_invoice_details(api, invoice_id)
-
-        if details and "items" in details and details["items"]:
-            items = details["items"]
-            print(f"OK {len(items)} items")
-            invoices_with_items += 1
-            total_items_found += len(items)
-
-            # Get invoice-level discount (applied to whole invoice, not per item)
-            invoice_discount = float(details.get("discount") or 0)
-            invoice_discount_type = details.get("discount_type", "")
-
-            # Get invoice-level tax and charges
-            round_off = float(details.get("round_off") or 0)
-            tcs_amount = float(details.get("tcs_amount") or 0)
-            tds_amount = float(details.get("tds_amount") or 0)
-            cess_amount = float(details.get("cess_amount") or 0)
-
-            # Get contact and address IDs
-            contact_id = details.get("contact_id", "")
-            billing_address_id = details.get("billing_address_id", "")
-            shipping_address_id = details.get("shipping_address_id", "")
-
-            # Get additional charges (array of charges)
-            additional_charges = details.get("additional_charges", [])
-            # Sum up all additional charges
-            total_additional_charges = sum(float(charge.get("amount", 0)) for charge in additional_charges)
-
-            # Extract each line item
-            for item in items:
-                # Get cost price from purchase_info for profit analysis
-                purchase_info = item.get("purchase_info", {})
-                cost_price = float(purchase_info.get("price_per_unit", 0)) if purchase_info else 0
-
-                quantity = float(item.get("quantity") or 0)
-                selling_price = float(item.get("price_per_unit") or 0)
-                item_final_amount = float(item.get("item_final_amount") or 0)
-
-                # Calculate profit (item final amount - total cost)
-                total_cost = cost_price * quantity
-                profit = item_final_amount - total_cost
-
-                # Calculate profit margin percentage
-                profit_margin_percent = (profit / item_final_amount * 100) if item_final_amount > 0 else 0
-
-                line_item = {
-                    "invoice_number": invoice_number,
-                    "invoice_date": invoice_date,
-                    "contact_name": contact_name,
-                    "contact_id": contact_id,
-                    "invoice_total": total_amount,
-                    "payment_mode": payment_mode,
-                    "invoice_discount": invoice_discount,
-                    "invoice_discount_type": invoice_discount_type,
-                    "round_off": round_off,
-                    "tcs_amount": tcs_amount,
-                    "tds_amount": tds_amount,
-                    "cess_amount": cess_amount,
-                    "additional_charges": total_additional_charges,
-                    "billing_address_id": billing_address_id,
-                    "shipping_address_id": shipping_address_id,
-                    "item_name": item.get("name", ""),
-                    "sku_code": item.get("sku_code", ""),
-                    "quantity": quantity,
-                    "unit": item.get("unit", ""),
-                    "selling_price": selling_price,
-                    "cost_price": cost_price,
-                    "profit": profit,
-                    "profit_margin_percent": profit_margin_percent,
-                    "item_discount": float(item.get("discount") or 0),
-                    "item_discount_type": item.get("discount_type", ""),
-                    "item_discount_amount": float(item.get("discount_amount") or 0),
-                    "gst_percentage": float(item.get("gst_percentage") or 0),
-                    "is_tax_included": "Yes" if item.get("is_tax_included") else "No",
-                    "item_final_amount": item_final_amount,
-                    "item_type": item.get("item_type", ""),
-                    "mrp": float(item.get("mrp") or 0),
-                    "description": item.get("description", ""),
-                    "notes": item.get("notes", ""),
-                }
-                all_line_items.append(line_item)
-        else:
-            print("-- No items")
-            invoices_without_items += 1
-
-        # Small delay to be nice to API
-        if idx % 10 == 0:
-            time.sleep(0.5)
-
-    print()
-    print(f"Summary:")
-    print(f"  Invoices with items: {invoices_with_items}")
-    print(f"  Invoices without items: {invoices_without_items}")
-    print(f"  Total line items found: {total_items_found}")
-    print()
-
-    if not all_line_items:
-        print("[INFO] No line items found.")
-        return True
-
-    # Prepare data for Google Sheets
+    # Columns for Google Sheets
     headers = [
         "Invoice Number",
         "Invoice Date",
@@ -263,95 +142,231 @@ def sync_invoice_line_items_to_sheets(
         "Notes",
     ]
 
-    rows = []
-    for item in all_line_items:
-        row = [
-            item["invoice_number"],
-            item["invoice_date"],
-            item["contact_name"],
-            item["contact_id"],
-            item["invoice_total"],
-            item["payment_mode"],
-            item["invoice_discount"],
-            item["invoice_discount_type"],
-            item["round_off"],
-            item["tcs_amount"],
-            item["tds_amount"],
-            item["cess_amount"],
-            item["additional_charges"],
-            item["billing_address_id"],
-            item["shipping_address_id"],
-            item["item_name"],
-            item["sku_code"],
-            item["quantity"],
-            item["unit"],
-            item["selling_price"],
-            item["cost_price"],
-            item["profit"],
-            item["profit_margin_percent"],
-            item["item_discount"],
-            item["item_discount_type"],
-            item["item_discount_amount"],
-            item["gst_percentage"],
-            item["is_tax_included"],
-            item["item_final_amount"],
-            item["item_type"],
-            item["mrp"],
-            item["description"],
-            item["notes"],
-        ]
-        rows.append(row)
-
-    output = [headers] + rows
-
-    # Create SAFETY BACKUP before clearing (automatic, no prompt)
-    create_safety_backup(sheets_manager, LINE_ITEMS_SHEET, "invoice_line_items_BACKUP")
+    # Initialize API client (async httpx client if MYBILLBOOK_ASYNC=1)
+    api = create_api()
+    # However fetching ends, the client is closed (releasing its connection pool
+    # and the async client's event loop thread) and the detail cache is saved,
+    # so details fetched before an error or an open circuit are kept for the
+    # next run
+    cache = None
+    try:
+        # Test connection first
+        if not api.test_connection():
+            return False
+
+        # Only fetch what changed since the last sync, unless a full run is due
+        sync = IncrementalSync(sheets_manager, LINE_ITEMS_SHEET, "invoice_line_items", headers,
+                               key_column="Invoice Number", date_column="Invoice Date")
+        fetch_start, fetch_end = sync.plan(start_date, end_date, full=full)
+
+        # Step 1: Get all sales invoices (summary)
+        print("Step 1: Fetching all sales invoices...")
+        print("-" * 60)
+        invoices = api.iter_sales_invoices(
+            start_date=fetch_start,
+            end_date=fetch_end,
+            status="final",
+        )
+
+        # Step 2: Fetch detailed invoice for each to get line items (starts with the first page of invoices)
+        print("Step 2: Fetching line items from each invoice...")
+        print("-" * 60)
+
+        rows = []
+        invoices_with_items = 0
+        invoices_without_items = 0
+        total_items_found = 0
+
+        # Details are fetched in parallel but handed back in invoice order;
+        # unchanged invoices come from the local detail cache instead
+        cache = DetailCache() if DETAIL_CACHE_ENABLED else None
+        fetcher = DetailFetcher(api, "/invoices/{id}", cache=cache)
+        for idx, (invoice, details) in enumerate(fetcher.iter_details(invoices), 1):
+            invoice_number = invoice.get("invoice_number")
+            # A failed detail fetch keeps the invoice's rows already in the sheet
+            sync.track(invoice, key=invoice_number, fetched=details is not None)
+            invoice_date = invoice.get("invoice_date")
+            contact_name = invoice.get("contact_name")
+            total_amount = invoice.get("total_amount")
+            payment_mode = invoice.get("payment_mode")
+
+            print(f"  [{idx}/{invoices.total_count or '?'}] Invoice #{invoice_number}...", end=" ")
+
+            if details and "items" in details and details["items"]:
+                items = details["items"]
+                print(f"OK {len(items)} items")
+                invoices_with_items += 1
+                total_items_found += len(items)
+
+                # Get invoice-level discount (applied to whole invoice, not per item)
+                invoice_discount = float(details.get("discount") or 0)
+                invoice_discount_type = details.get("discount_type", "")
+
+                # Get invoice-level tax and charges
+                round_off = float(details.get("round_off") or 0)
+                tcs_amount = float(details.get("tcs_amount") or 0)
+                tds_amount = float(details.get("tds_amount") or 0)
+                cess_amount = float(details.get("cess_amount") or 0)
+
+                # Get contact and address IDs
+                contact_id = details.get("contact_id", "")
+                billing_address_id = details.get("billing_address_id", "")
+                shipping_address_id = details.get("shipping_address_id", "")
+
+                # Get additional charges (array of charges)
+                additional_charges = details.get("additional_charges", [])
+                # Sum up all additional charges
+                total_additional_charges = sum(float(charge.get("amount", 0)) for charge in additional_charges)
+
+                # Extract each line item
+                for item in items:
+                    # Get cost price from purchase_info for profit analysis
+                    purchase_info = item.get("purchase_info", {})
+                    cost_price = float(purchase_info.get("price_per_unit", 0)) if purchase_info else 0
+
+                    quantity = float(item.get("quantity") or 0)
+                    selling_price = float(item.get("price_per_unit") or 0)
+                    item_final_amount = float(item.get("item_final_amount") or 0)
+
+                    # Calculate profit (item final amount - total cost)
+                    total_cost = cost_price * quantity
+                    profit = item_final_amount - total_cost
+
+                    # Calculate profit margin percentage
+                    profit_margin_percent = (profit / item_final_amount * 100) if item_final_amount > 0 else 0
+
+                    line_item = {
+                        "invoice_number": invoice_number,
+                        "invoice_date": invoice_date,
+                        "contact_name": contact_name,
+                        "contact_id": contact_id,
+                        "invoice_total": total_amount,
+                        "payment_mode": payment_mode,
+                        "invoice_discount": invoice_discount,
+                        "invoice_discount_type": invoice_discount_type,
+                        "round_off": round_off,
+                        "tcs_amount": tcs_amount,
+                        "tds_amount": tds_amount,
+                        "cess_amount": cess_amount,
+                        "additional_charges": total_additional_charges,
+                        "billing_address_id": billing_address_id,
+                        "shipping_address_id": shipping_address_id,
+                        "item_name": item.get("name", ""),
+                        "sku_code": item.get("sku_code", ""),
+                        "quantity": quantity,
+                        "unit": item.get("unit", ""),
+                        "selling_price": selling_price,
+                        "cost_price": cost_price,
+                        "profit": profit,
+                        "profit_margin_percent": profit_margin_percent,
+                        "item_discount": float(item.get("discount") or 0),
+                        "item_discount_type": item.get("discount_type", ""),
+                        "item_discount_amount": float(item.get("discount_amount") or 0),
+                        "gst_percentage": float(item.get("gst_percentage") or 0),
+                        "is_tax_included": "Yes" if item.get("is_tax_included") else "No",
+                        "item_final_amount": item_final_amount,
+                        "item_type": item.get("item_type", ""),
+                        "mrp": float(item.get("mrp") or 0),
+                        "description": item.get("description", ""),
+                        "notes": item.get("notes", ""),
+                    }
+                    rows.append(line_item_row(line_item))
+            elif details is None:
+                print("!! Failed to fetch details")
+            else:
+                print("-- No items")
+                invoices_without_items += 1
+    finally:
+        if cache:
+            cache.close()
+        api.close()
 
-    # Write to Google Sheets
-    print(f"Writing {len(rows)} line items to Google Sheets...")
-    sheets_manager.clear_sheet(LINE_ITEMS_SHEET)
-    sheets_manager.write_sheet(LINE_ITEMS_SHEET, output)
+    print()
+    print(f"Summary:")
+    print(f"  Invoices with items: {invoices_with_items}")
+    print(f"  Invoices without items: {invoices_without_items}")
+    print(f"  Invoices whose details failed: {fetcher.stats['failed']}")
+    if cache:
+        print(f"  Detail cache: {cache.summary()}, {fetcher.stats['fetched']} fetched from MyBillBook")
+    print(f"  Total line items found: {total_items_found}")
+    print()
 
-    # Apply formatting
-    if len(rows) > 0:
-        last_row = len(rows) + 1
+    # Stopped because MyBillBook went down: resume from the detail cache next run
+    if fetcher.stopped:
+        print("[ERROR] MyBillBook stopped responding, so the sync stopped early; the sheet was left unchanged.")
+        if cache:
+            print(f"[INFO] {fetcher.stats['fetched']} invoice details fetched before it stopped are saved in the "
+                  f"detail cache. Run the sync again later to resume from there.")
+        else:
+            print("[WARN] The detail cache is off (DETAIL_CACHE_ENABLED), so the next run starts over.")
+        return False
+
+    # A partial list would drop the missing invoices from the sheet, so don't sync it
+    if not invoices.complete:
+        print("[ERROR] Some invoice pages could not be fetched. Sync aborted; the sheet was left unchanged.")
+        return False
 
+    if not invoices.fetched and sync.full:
+        print("[INFO] No invoices found for the specified date range.")
+        return True
+
+    if not rows and sync.full:
+        print("[INFO] No line items found.")
+        return True
+
+    # Keep the rows of earlier vouchers that weren't re-fetched
+    output = sync.merge(rows)
+
+    # Create SAFETY BACKUP before writing (automatic, no prompt)
+    create_safety_backup(sheets_manager, LINE_ITEMS_SHEET, "invoice_line_items_BACKUP")
+
+    # Write only the rows that changed since the last sync
+    # An invoice can list the same item twice; upsert_rows pairs duplicates in order
+    key_columns = ["Invoice Number", "Item Name", "SKU Code"]
+    print(f"Writing {len(rows)} line items to Google Sheets...")
+    result = sheets_manager.upsert_rows(LINE_ITEMS_SHEET, output, key_columns=key_columns, formats={
         # Text columns
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"A2:A{last_row}")  # Invoice Number
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"B2:B{last_row}")  # Invoice Date
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"C2:C{last_row}")  # Customer Name
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"D2:D{last_row}")  # Contact ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"F2:F{last_row}")  # Payment Mode
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"H2:H{last_row}")  # Invoice Discount Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"N2:N{last_row}")  # Billing Address ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"O2:O{last_row}")  # Shipping Address ID
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"P2:P{last_row}")  # Item Name
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"Q2:Q{last_row}")  # SKU Code
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"S2:S{last_row}")  # Unit
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"Y2:Y{last_row}")  # Item Discount Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AB2:AB{last_row}")  # Tax Included
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AD2:AD{last_row}")  # Item Type
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AF2:AF{last_row}")  # Description
-        sheets_manager.format_as_text(LINE_ITEMS_SHEET, f"AG2:AG{last_row}")  # Notes
+        "A": "text",  # Invoice Number
+        "B": "text",  # Invoice Date
+        "C": "text",  # Customer Name
+        "D": "text",  # Contact ID
+        "F": "text",  # Payment Mode
+        "H": "text",  # Invoice Discount Type
+        "N": "text",  # Billing Address ID
+        "O": "text",  # Shipping Address ID
+        "P": "text",  # Item Name
+        "Q": "text",  # SKU Code
+        "S": "text",  # Unit
+        "Y": "text",  # Item Discount Type
+        "AB": "text",  # Tax Included
+        "AD": "text",  # Item Type
+        "AF": "text",  # Description
+        "AG": "text",  # Notes
 
         # Numeric columns with 2 decimals
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"E2:E{last_row}", decimal_places=2)  # Invoice Total
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"G2:G{last_row}", decimal_places=2)  # Invoice Discount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"I2:I{last_row}", decimal_places=2)  # Round Off
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"J2:J{last_row}", decimal_places=2)  # TCS Amount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"K2:K{last_row}", decimal_places=2)  # TDS Amount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"L2:L{last_row}", decimal_places=2)  # Cess Amount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"M2:M{last_row}", decimal_places=2)  # Additional Charges
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"R2:R{last_row}", decimal_places=2)  # Quantity
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"T2:T{last_row}", decimal_places=2)  # Selling Price
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"U2:U{last_row}", decimal_places=2)  # Cost Price
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"V2:V{last_row}", decimal_places=2)  # Profit
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"W2:W{last_row}", decimal_places=2)  # Profit Margin %
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"X2:X{last_row}", decimal_places=2)  # Item Discount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"Z2:Z{last_row}", decimal_places=2)  # Item Discount Amount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"AA2:AA{last_row}", decimal_places=2)  # GST %
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"AC2:AC{last_row}", decimal_places=2)  # Item Final Amount
-        sheets_manager.format_as_number(LINE_ITEMS_SHEET, f"AE2:AE{last_row}", decimal_places=2)  # MRP
+        "E": ("number", 2),  # Invoice Total
+        "G": ("number", 2),  # Invoice Discount
+        "I": ("number", 2),  # Round Off
+        "J": ("number", 2),  # TCS Amount
+        "K": ("number", 2),  # TDS Amount
+        "L": ("number", 2),  # Cess Amount
+        "M": ("number", 2),  # Additional Charges
+        "R": ("number", 2),  # Quantity
+        "T": ("number", 2),  # Selling Price
+        "U": ("number", 2),  # Cost Price
+        "V": ("number", 2),  # Profit
+        "W": ("number", 2),  # Profit Margin %
+        "X": ("number", 2),  # Item Discount
+        "Z": ("number", 2),  # Item Discount Amount
+        "AA": ("number", 2),  # GST %
+        "AC": ("number", 2),  # Item Final Amount
+        "AE": ("number", 2),  # MRP
+    })
+    if result is None:
+        # Nothing was written, so the watermark must not move past these rows
+        print(f"[ERROR] Writing to '{LINE_ITEMS_SHEET}' failed; the sync watermark was not updated. Run the sync again.")
+        return False
+    sync.commit(output)
 
     print(f"\n[OK] Successfully synced {len(rows)} line items from {invoices_with_items} invoices!")
     print(f"     Sheet: '{LINE_ITEMS_SHEET}'")
@@ -383,10 +398,12 @@ def main():
         print("2. Last 90 days")
         print("3. Last 1 year (default)")
         print("4. Custom date range")
-        choice = input("\nEnter your choice (1-4, default=3): ").strip() or "3"
+        print("5. Full reconciliation (last 1 year, re-checks every invoice)")
+        choice = input("\nEnter your choice (1-5, default=3): ").strip() or "3"
 
         start_date = None
         end_date = None
+        full = False
 
         if choice == "1":
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -408,13 +425,17 @@ def main():
                 print("[ERROR] Invalid date format. Using default (last 1 year).")
                 start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
                 end_date = datetime.now().strftime("%Y-%m-%d")
+        elif choice == "5":
+            start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+            end_date = datetime.now().strftime("%Y-%m-%d")
+            full = True
         else:
             print("[INFO] Invalid choice. Using default (last 1 year).")
             start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
             end_date = datetime.now().strftime("%Y-%m-%d")
 
         # Run sync
-        success = sync_invoice_line_items_to_sheets(sheets, start_date, end_date)
+        success = sync_invoice_line_items_to_sheets(sheets, start_date, end_date, full=full)
 
         if success:
             print("\n" + "="*60)
@@ -12,8 +12,9 @@ from datetime import datetime, timedelta
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from utils.sheets import SheetsManager
-from mybillbook.api_client import MyBillBookAPI
+from mybillbook.async_client import create_api
 from mybillbook.config import has_credentials
+from mybillbook.incremental import IncrementalSync
 from utils.csv_exporter import export_sheet_data, create_safety_backup
 
 
@@ -25,6 +26,7 @@ def sync_sales_invoices_to_sheets(
     sheets_manager,
     start_date: str = None,
     end_date: str = None,
+    full: bool = False,
 ):
     """
     Sync MyBillBook sales invoices to Google Sheets
@@ -33,6 +35,8 @@ def sync_sales_invoices_to_sheets(
         sheets_manager: SheetsManager instance
         start_date: Start date filter (YYYY-MM-DD), default is 1 year ago
         end_date: End date filter (YYYY-MM-DD), default is today
+        full: Re-fetch the whole date range instead of only the invoices
+              changed since the last sync
 
     Returns:
         True if successful, False otherwise
@@ -59,33 +63,7 @@ def sync_sales_invoices_to_sheets(
 
     print(f"Date range: {start_date} to {end_date}\n")
 
-    # Initialize API client
-    api = MyBillBookAPI()
-
-    # Test connection first
-    if not api.test_connection():
-        return False
-
-    # Fetch sales invoices
-    result = api.get_sales_invoices(
-        per_page=15,
-        start_date=start_date,
-        end_date=end_date,
-        status="final",
-    )
-
-    if not result or "vouchers" not in result:
-        print("[ERROR] No invoices fetched. Sync failed.")
-        return False
-
-    vouchers = result.get("vouchers", [])
-    total_count = result.get("total_count", 0)
-
-    if not vouchers:
-        print("[INFO] No invoices found for the specified date range.")
-        return True
-
-    # Prepare data for Google Sheets
+    # Columns for Google Sheets
     headers = [
         "Invoice Number",
         "Invoice Date",
@@ -113,77 +91,111 @@ def sync_sales_invoices_to_sheets(
         "E-Invoice Status",
     ]
 
-    rows = []
-    for voucher in vouchers:
-        row = [
-            voucher.get("invoice_number", ""),
-            voucher.get("invoice_date", ""),
-            voucher.get("serial_number", ""),
-            voucher.get("contact_name", ""),
-            voucher.get("contact_type", ""),
-            voucher.get("contact_id", ""),
-            float(voucher.get("total_amount") or 0),
-            float(voucher.get("initial_payment_amount") or 0),
-            float(voucher.get("remaining_amount") or 0),
-            voucher.get("payment_mode", ""),
-            voucher.get("payment_type", ""),
-            voucher.get("due_date", ""),
-            voucher.get("status", ""),
-            voucher.get("created_at", ""),
-            voucher.get("id", ""),
-            voucher.get("mbb_id", ""),
-            voucher.get("share_link", ""),
-            voucher.get("notes", ""),
-            voucher.get("source", ""),
-            voucher.get("ledger_category_name", ""),
-            voucher.get("bank_account_id", ""),
-            voucher.get("convertable_id", ""),
-            voucher.get("recurring_id", ""),
-            voucher.get("einvoice_status", ""),
-        ]
-        rows.append(row)
-
-    output = [headers] + rows
-
-    # Create SAFETY BACKUP before clearing (automatic, no prompt)
-    create_safety_backup(sheets_manager, SALES_INVOICES_SHEET, "sales_invoices_BACKUP")
+    # Initialize API client (async httpx client if MYBILLBOOK_ASYNC=1)
+    api = create_api()
+    # The client is closed however fetching ends, which releases its connection
+    # pool (and the async client's event loop thread)
+    try:
+        # Test connection first
+        if not api.test_connection():
+            return False
+
+        # Only fetch what changed since the last sync, unless a full run is due
+        sync = IncrementalSync(sheets_manager, SALES_INVOICES_SHEET, "sales_invoices", headers,
+                               key_column="ID", date_column="Invoice Date")
+        fetch_start, fetch_end = sync.plan(start_date, end_date, full=full)
+
+        # Fetch sales invoices page by page, building rows as they arrive
+        vouchers = api.iter_sales_invoices(
+            start_date=fetch_start,
+            end_date=fetch_end,
+            status="final",
+        )
+
+        rows = []
+        for voucher in vouchers:
+            sync.track(voucher)
+            row = [
+                voucher.get("invoice_number", ""),
+                voucher.get("invoice_date", ""),
+                voucher.get("serial_number", ""),
+                voucher.get("contact_name", ""),
+                voucher.get("contact_type", ""),
+                voucher.get("contact_id", ""),
+                float(voucher.get("total_amount") or 0),
+                float(voucher.get("initial_payment_amount") or 0),
+                float(voucher.get("remaining_amount") or 0),
+                voucher.get("payment_mode", ""),
+                voucher.get("payment_type", ""),
+                voucher.get("due_date", ""),
+                voucher.get("status", ""),
+                voucher.get("created_at", ""),
+                voucher.get("id", ""),
+                voucher.get("mbb_id", ""),
+                voucher.get("share_link", ""),
+                voucher.get("notes", ""),
+                voucher.get("source", ""),
+                voucher.get("ledger_category_name", ""),
+                voucher.get("bank_account_id", ""),
+                voucher.get("convertable_id", ""),
+                voucher.get("recurring_id", ""),
+                voucher.get("einvoice_status", ""),
+            ]
+            rows.append(row)
+    finally:
+        api.close()
+
+    # A partial list would drop the missing invoices from the sheet, so don't sync it
+    if not vouchers.complete:
+        print("[ERROR] Some invoice pages could not be fetched. Sync aborted; the sheet was left unchanged.")
+        return False
 
-    # Write to Google Sheets
-    print(f"\nWriting {len(rows)} invoices to Google Sheets...")
-    sheets_manager.clear_sheet(SALES_INVOICES_SHEET)
-    sheets_manager.write_sheet(SALES_INVOICES_SHEET, output)
+    if not rows and sync.full:
+        print("[INFO] No invoices found for the specified date range.")
+        return True
 
-    # Apply formatting
-    if len(rows) > 0:
-        last_row = len(rows) + 1
+    # Keep the rows of earlier vouchers that weren't re-fetched
+    output = sync.merge(rows)
 
+    # Create SAFETY BACKUP before writing (automatic, no prompt)
+    create_safety_backup(sheets_manager, SALES_INVOICES_SHEET, "sales_invoices_BACKUP")
+
+    # Write only the rows that changed since the last sync
+    print(f"\nWriting {len(rows)} invoices to Google Sheets...")
+    result = sheets_manager.upsert_rows(SALES_INVOICES_SHEET, output, key_columns=["ID"], formats={
         # Text columns
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"A2:A{last_row}")  # Invoice Number
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"B2:B{last_row}")  # Invoice Date
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"C2:C{last_row}")  # Serial Number
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"D2:D{last_row}")  # Contact Name
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"E2:E{last_row}")  # Contact Type
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"F2:F{last_row}")  # Contact ID
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"J2:J{last_row}")  # Payment Mode
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"K2:K{last_row}")  # Payment Type
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"L2:L{last_row}")  # Due Date
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"M2:M{last_row}")  # Status
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"N2:N{last_row}")  # Created At
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"O2:O{last_row}")  # ID
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"P2:P{last_row}")  # MBB ID
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"Q2:Q{last_row}")  # Share Link
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"R2:R{last_row}")  # Notes
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"S2:S{last_row}")  # Source
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"T2:T{last_row}")  # Ledger Category
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"U2:U{last_row}")  # Bank Account ID
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"V2:V{last_row}")  # Convertable ID
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"W2:W{last_row}")  # Recurring ID
-        sheets_manager.format_as_text(SALES_INVOICES_SHEET, f"X2:X{last_row}")  # E-Invoice Status
+        "A": "text",  # Invoice Number
+        "B": "text",  # Invoice Date
+        "C": "text",  # Serial Number
+        "D": "text",  # Contact Name
+        "E": "text",  # Contact Type
+        "F": "text",  # Contact ID
+        "J": "text",  # Payment Mode
+        "K": "text",  # Payment Type
+        "L": "text",  # Due Date
+        "M": "text",  # Status
+        "N": "text",  # Created At
+        "O": "text",  # ID
+        "P": "text",  # MBB ID
+        "Q": "text",  # Share Link
+        "R": "text",  # Notes
+        "S": "text",  # Source
+        "T": "text",  # Ledger Category
+        "U": "text",  # Bank Account ID
+        "V": "text",  # Convertable ID
+        "W": "text",  # Recurring ID
+        "X": "text",  # E-Invoice Status
 
         # Numeric columns with 2 decimals
-        sheets_manager.format_as_number(SALES_INVOICES_SHEET, f"G2:G{last_row}", decimal_places=2)  # Total Amount
-        sheets_manager.format_as_number(SALES_INVOICES_SHEET, f"H2:H{last_row}", decimal_places=2)  # Paid Amount
-        sheets_manager.format_as_number(SALES_INVOICES_SHEET, f"I2:I{last_row}", decimal_places=2)  # Remaining Amount
+        "G": ("number", 2),  # Total Amount
+        "H": ("number", 2),  # Paid Amount
+        "I": ("number", 2),  # Remaining Amount
+    })
+    if result is None:
+        # Nothing was written, so the watermark must not move past these rows
+        print(f"[ERROR] Writing to '{SALES_INVOICES_SHEET}' failed; the sync watermark was not updated. Run the sync again.")
+        return False
+    sync.commit(output)
 
     print(f"\n[OK] Successfully synced {len(rows)} sales invoices to '{SALES_INVOICES_SHEET}' sheet!")
     print(f"     Date range: {start_date} to {end_date}")
@@ -214,10 +226,12 @@ def main():
         print("2. Last 90 days")
         print("3. Last 1 year (default)")
         print("4. Custom date range")
-        choice = input("\nEnter your choice (1-4, default=3): ").strip() or "3"
+        print("5. Full reconciliation (last 1 year, re-checks every invoice)")
+        choice = input("\nEnter your choice (1-5, default=3): ").strip() or "3"
 
         start_date = None
         end_date = None
+        full = False
 
         if choice == "1":
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -239,13 +253,17 @@ def main():
                 print("[ERROR] Invalid date format. Using default (last 1 year).")
                 start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
                 end_date = datetime.now().strftime("%Y-%m-%d")
+        elif choice == "5":
+            start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
+            end_date = datetime.now().strftime("%Y-%m-%d")
+            full = True
         else:
             print("[INFO] Invalid choice. Using default (last 1 year).")
             start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
             end_date = datetime.now().strftime("%Y-%m-%d")
 
         # Run sync
-        success = sync_sales_invoices_to_sheets(sheets, start_date, end_date)
+        success = sync_sales_invoices_to_sheets(sheets, start_date, end_date, full=full)
 
         if success:
             print("\n" + "="*60)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Pipeline Runner
+Runs Transform 1 → Transform 2 → WePrint in one pass (see transforms/pipeline.py)
+
+Reads the RAW and MyBillBook inventory tabs once, builds every output in
+memory and writes Inventory, ADD, UPDATE and WePrint to Sheets together.
+With --no-sheets the outputs are only saved as files.
+
+Usage:
+    python scripts/run_pipeline.py                              # write tabs, prompt for CSVs
+    python scripts/run_pipeline.py --auto-save                  # write tabs and save CSVs
+    python scripts/run_pipeline.py --no-sheets                  # CSVs only, Sheets left untouched
+    python scripts/run_pipeline.py --no-sheets --format parquet # Parquet only (needs pyarrow)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.sheets import SheetsManager
+from transforms.pipeline import run_pipeline, EXPORT_FORMATS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Transform 1 → Transform 2 → WePrint in one pass")
+    parser.add_argument("--no-sheets", action="store_true",
+                        help="Don't write any tab; save the outputs as files only")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="File format (default csv)")
+    parser.add_argument("--auto-save", action="store_true", help="Save files without prompting")
+    args = parser.parse_args()
+
+    print("Connecting to Google Sheets...")
+    try:
+        sheets = SheetsManager()
+    except FileNotFoundError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    tables = run_pipeline(
+        sheets,
+        write_sheets=not args.no_sheets,
+        export_format=args.format,
+        auto_save=args.auto_save,
+    )
+    sys.exit(0 if tables is not None else 1)
+
+
+if __name__ == "__main__":
+    main()
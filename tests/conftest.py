@@ -0,0 +1,154 @@
+"""
+Shared fixtures: a SheetsManager wired to an in-memory stand-in for the
+Sheets API, so writes and reads can be checked without credentials
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.rate_limit import TokenBucket  # noqa: E402
+from utils.sheets import SheetsManager  # noqa: E402
+
+
+class FakeRequest:
+    def __init__(self, service, kind, handler):
+        self.service = service
+        self.kind = kind
+        self.handler = handler
+
+    def execute(self, http=None):
+        self.service.calls.append(self.kind)
+        return self.handler()
+
+
+def cell_value(cell):
+    """Python value of a CellData dict, as a read would return it"""
+    value = cell.get('userEnteredValue', {})
+    return next(iter(value.values()), '')
+
+
+class FakeSheetsService:
+    """
+    Just enough of spreadsheets() / values() for SheetsManager
+
+    Tabs are kept as lists of rows; every API call is recorded in `calls`
+    and every batchUpdate body in `batches`.
+    """
+
+    def __init__(self, tabs=None):
+        self.tabs = {}
+        self.calls = []
+        self.batches = []
+        for name, rows in (tabs or {}).items():
+            self.add_tab(name, rows)
+
+    def add_tab(self, name, rows=()):
+        sheet_id = len(self.tabs) + 1
+        self.tabs[name] = {'id': sheet_id, 'rows': [list(row) for row in rows], 'rowCount': 1000, 'columnCount': 26}
+        return sheet_id
+
+    def tab_by_id(self, sheet_id):
+        return next(tab for tab in self.tabs.values() if tab['id'] == sheet_id)
+
+    def values_of(self, name):
+        rows = [list(row) for row in self.tabs[name]['rows']]
+        for row in rows:
+            while row and row[-1] == '':
+                row.pop()
+        return rows
+
+    # spreadsheets()
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return FakeValues(self)
+
+    def get(self, spreadsheetId, fields=None, **kwargs):
+        return FakeRequest(self, 'get', lambda: {'sheets': [
+            {'properties': {'title': name, 'sheetId': tab['id'], 'gridProperties': {
+                'rowCount': tab['rowCount'], 'columnCount': tab['columnCount']}}}
+            for name, tab in self.tabs.items()
+        ]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.batches.append(body)
+        return FakeRequest(self, 'batchUpdate', lambda: self._apply(body['requests']))
+
+    def _apply(self, requests):
+        for request in requests:
+            if 'addSheet' in request:
+                properties = request['addSheet']['properties']
+                self.tabs[properties['title']] = {'id': properties['sheetId'], 'rows': [], 'rowCount': 1000,
+                                                  'columnCount': 26}
+            elif 'updateSheetProperties' in request:
+                properties = request['updateSheetProperties']['properties']
+                tab = self.tab_by_id(properties['sheetId'])
+                grid = properties.get('gridProperties', {})
+                tab['rowCount'] = grid.get('rowCount', tab['rowCount'])
+                tab['columnCount'] = grid.get('columnCount', tab['columnCount'])
+                del tab['rows'][tab['rowCount']:]
+            elif 'updateCells' in request:
+                update = request['updateCells']
+                if 'rows' not in update:
+                    self.tab_by_id(update['range']['sheetId'])['rows'] = []
+                    continue
+                tab = self.tab_by_id(update['start']['sheetId'])
+                start = update['start'].get('rowIndex', 0)
+                for index, row in enumerate(update['rows']):
+                    while len(tab['rows']) <= start + index:
+                        tab['rows'].append([])
+                    tab['rows'][start + index] = [cell_value(cell) for cell in row.get('values', [])]
+            elif 'appendCells' in request:
+                append = request['appendCells']
+                tab = self.tab_by_id(append['sheetId'])
+                for row in append['rows']:
+                    tab['rows'].append([cell_value(cell) for cell in row.get('values', [])])
+            elif 'deleteDimension' in request:
+                span = request['deleteDimension']['range']
+                tab = self.tab_by_id(span['sheetId'])
+                del tab['rows'][span['startIndex']:span['endIndex']]
+        return {'replies': [{} for _ in requests]}
+
+
+class FakeValues:
+    def __init__(self, service):
+        self.service = service
+
+    @staticmethod
+    def _tab_name(range_name):
+        return range_name.split('!')[0].strip("'")
+
+    def get(self, spreadsheetId, range, valueRenderOption=None, **kwargs):
+        return FakeRequest(self.service, 'values.get',
+                           lambda: {'range': range, 'values': self.service.values_of(self._tab_name(range))})
+
+    def batchGet(self, spreadsheetId, ranges, valueRenderOption=None, **kwargs):
+        return FakeRequest(self.service, 'values.batchGet', lambda: {'valueRanges': [
+            {'range': range_name, 'values': self.service.values_of(self._tab_name(range_name))}
+            for range_name in ranges
+        ]})
+
+
+@pytest.fixture
+def fake_service():
+    return FakeSheetsService()
+
+
+@pytest.fixture
+def sheets(monkeypatch, tmp_path, fake_service):
+    """SheetsManager on the fake service, with no quota waits and no disk cache"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(SheetsManager, '_authenticate', lambda self: None)
+    monkeypatch.setattr(SheetsManager, '_quota_buckets', {
+        'read': TokenBucket(10000, per=1, capacity=10000),
+        'write': TokenBucket(10000, per=1, capacity=10000),
+    })
+    manager = SheetsManager()
+    manager._read_cache = None
+    manager.service = fake_service
+    return manager
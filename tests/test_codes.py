@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from transforms.transform1_consolidate import BARCODE_PREFIXES, BarcodeAllocator, barcode_key
+
+
+def test_barcodes_never_repeat_existing_or_each_other():
+    existing = [f"{prefix} 0110" for prefix in range(13, 60)]
+    allocator = BarcodeAllocator(existing_barcodes=existing, rng=random.Random(1))
+
+    barcodes = [allocator.barcode("110") for _ in range(300)]
+
+    keys = [barcode_key(barcode) for barcode in barcodes]
+    assert len(set(keys)) == len(keys)
+    assert not set(keys) & {barcode_key(barcode) for barcode in existing}
+    assert all(barcode.split(" ")[1].startswith("011") for barcode in barcodes)
+
+
+def test_barcode_falls_back_to_the_last_free_value():
+    # A 4-digit price leaves no suffix, so there is one barcode per prefix
+    taken = [f"{prefix} 4321" for prefix in BARCODE_PREFIXES if prefix != 57]
+    allocator = BarcodeAllocator(existing_barcodes=taken, rng=random.Random(1))
+
+    assert allocator.barcode("1234") == "57 4321"
+    with pytest.raises(RuntimeError, match="No barcodes left for cost price 1234"):
+        allocator.barcode("1234")
+
+
+def test_barcodes_compare_without_spaces():
+    allocator = BarcodeAllocator(existing_barcodes=["574321"])
+    allocator.reserve_barcode("58 4321")
+    assert barcode_key("57 4321") in allocator.barcodes
+    assert barcode_key("584321") in allocator.barcodes
+
+
+def test_names_are_unique_ignoring_case():
+    allocator = BarcodeAllocator(existing_names=["rings gold abcd"], rng=random.Random(3))
+
+    names = [allocator.name("Rings", "Gold") for _ in range(200)]
+
+    assert len({name.lower() for name in names}) == 200
+    assert "rings gold abcd" not in {name.lower() for name in names}
+    assert all(name.startswith("Rings Gold ") for name in names)
+
+
+def test_seeded_codes_depend_only_on_the_key():
+    first = BarcodeAllocator(seed=42)
+    second = BarcodeAllocator(seed=42)
+
+    # Different order and an extra item in between don't change the codes
+    a = (first.barcode("110", "Rings|Gold|11000|25000"), first.name("Rings", "Gold", "Rings|Gold|11000|25000"))
+    second.barcode("45", "Charms||4500|5000")
+    b = (second.barcode("110", "Rings|Gold|11000|25000"), second.name("Rings", "Gold", "Rings|Gold|11000|25000"))
+
+    assert a == b
+    other = BarcodeAllocator(seed=43)
+    assert (other.barcode("110", "Rings|Gold|11000|25000"), other.name("Rings", "Gold", "Rings|Gold|11000|25000")) != a
+
+
+def test_seeded_collision_redraws_are_deterministic():
+    key = "Rings|Gold|11000|25000"
+    taken = BarcodeAllocator(seed=42).barcode("110", key)
+
+    first = BarcodeAllocator(existing_barcodes=[taken], seed=42).barcode("110", key)
+    second = BarcodeAllocator(existing_barcodes=[taken], seed=42).barcode("110", key)
+
+    assert first == second != taken
+
+
+def test_build_inventory_codes_are_stable(monkeypatch):
+    import transforms.transform1_consolidate as transform1
+    from config import SHEET_MYBILLBOOK_CURRENT, SHEET_RAW
+
+    monkeypatch.setattr(transform1, "DETERMINISTIC_CODES", True)
+    raw = [["Type", "Name", "Cost Price", "Quantity", "Selling Price"],
+           ["Rings", "Gold", "110", "1", "250"],
+           ["Charms", "", "45", "2", "50"]]
+    runs = [
+        transform1.build_inventory({SHEET_MYBILLBOOK_CURRENT: [], SHEET_RAW: rows})
+        for rows in (raw, [raw[0], raw[2], raw[1]])
+    ]
+
+    codes = [{row[0]: (row[1], row[7]) for row in inventory[1:]} for inventory in runs]
+    assert codes[0] == codes[1]
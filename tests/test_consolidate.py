@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from config import SHEET_MYBILLBOOK_CURRENT, SHEET_RAW
+from transforms.transform1_consolidate import build_inventory, consolidate_rows, plain_number
+
+
+def baseline_consolidate(rows):
+    """The dict loop consolidate_rows replaced: raw text keys, quantities summed as floats"""
+    consolidated = {}
+    for row in rows:
+        row = (list(row) + [""] * 5)[:5]
+        key = f"{row[0]}|{row[1]}|{row[2]}|{row[4]}"
+        if key in consolidated:
+            consolidated[key][3] = float(consolidated[key][3] or 0) + float(row[3] or 0)
+        else:
+            consolidated[key] = list(row)
+    return list(consolidated.values())
+
+
+def as_rows(frame):
+    return [[row[0], row[1], row[2], float(row[3] or 0), row[4]] for row in frame.values.tolist()]
+
+
+def test_matches_baseline_on_consistently_formatted_rows():
+    rng = random.Random(7)
+    rows = [
+        [rng.choice(["Rings", "Bracelets", "Charms 40"]),
+         rng.choice(["", "Gold", "Silver"]),
+         rng.choice(["110", "45.5", "1200"]),
+         str(rng.randint(1, 9)),
+         rng.choice(["250", "99.99"])]
+        for _ in range(500)
+    ]
+    expected = baseline_consolidate(rows)
+    for row in expected:
+        row[3] = float(row[3])
+
+    assert as_rows(consolidate_rows(rows)) == expected
+
+
+def test_groups_prices_as_numbers_and_text_as_text():
+    rows = [
+        ["Rings", "Gold", "1,250", "2", "N/A"],
+        ["Rings ", "Gold", "1250.00", "3", "N/A"],
+        ["Rings", "Gold", "1250", "1", "TBD"],
+        ["Rings", "Gold", "", "1", "N/A"],
+        ["Rings", "Gold", "N/A", "1", "N/A"],
+        ["Rings", "Gold", "N/A ", "4", "N/A"],
+    ]
+    consolidated = consolidate_rows(rows)
+
+    assert consolidated.values.tolist() == [
+        ["Rings", "Gold", "1,250", 5, "N/A"],
+        ["Rings", "Gold", "1250", 1, "TBD"],
+        ["Rings", "Gold", "", 1, "N/A"],
+        ["Rings", "Gold", "N/A", 5, "N/A"],
+    ]
+
+
+def test_short_rows_and_input_left_unchanged():
+    rows = [["Rings", "Gold", "10"], ["Rings", "Gold", "10", "2"]]
+    consolidated = consolidate_rows(rows)
+
+    assert consolidated.values.tolist() == [["Rings", "Gold", "10", 2, ""]]
+    assert rows == [["Rings", "Gold", "10"], ["Rings", "Gold", "10", "2"]]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1,250", 1250),
+    ("12.5", 12.5),
+    (110.0, 110),
+    ("N/A", "N/A"),
+    ("", ""),
+])
+def test_plain_number(value, expected):
+    assert plain_number(value) == expected
+    assert type(plain_number(value)) is type(expected)
+
+
+def test_build_inventory_keeps_text_prices():
+    sheet_data = {
+        SHEET_MYBILLBOOK_CURRENT: [],
+        SHEET_RAW: [
+            ["Type", "Name", "Cost Price", "Quantity", "Selling Price"],
+            ["Rings", "Gold", "1,250", "2", "TBD"],
+        ],
+    }
+    inventory = build_inventory(sheet_data)
+
+    assert inventory[1][:7] == ["Rings", inventory[1][1], 1250, 2, "TBD", 2500, ""]
@@ -0,0 +1,58 @@
+import sqlite3
+
+import mybillbook.detail_cache as detail_cache
+from mybillbook.detail_cache import DetailCache
+
+
+ENDPOINT = "/invoices/{id}"
+
+
+def voucher(voucher_id, amount=100):
+    return {"id": voucher_id, "updated_at": "2025-01-31T10:00:00Z", "total_amount": amount}
+
+
+def stored_ids(path):
+    with sqlite3.connect(path) as conn:
+        return sorted(row[0] for row in conn.execute("SELECT voucher_id FROM details"))
+
+
+def test_round_trip_and_change_stamp(tmp_path):
+    path = str(tmp_path / "details.sqlite3")
+    cache = DetailCache(path)
+    cache.put(ENDPOINT, voucher(1), {"items": [1, 2]})
+    cache.close()
+
+    cache = DetailCache(path)
+    assert cache.get(ENDPOINT, voucher(1)) == {"items": [1, 2]}
+    assert cache.get(ENDPOINT, voucher(1, amount=150)) is None  # edited voucher
+    assert cache.get("/expense/{id}", voucher(1)) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.close()
+
+
+def test_puts_survive_without_close(tmp_path, monkeypatch):
+    monkeypatch.setattr(detail_cache, "DETAIL_CACHE_COMMIT_EVERY", 2)
+    monkeypatch.setattr(detail_cache, "DETAIL_CACHE_COMMIT_SECONDS", 3600)
+    path = str(tmp_path / "details.sqlite3")
+    cache = DetailCache(path)
+
+    for voucher_id in range(5):
+        cache.put(ENDPOINT, voucher(voucher_id), {"id": voucher_id})
+
+    # The run dies here: no close(). Everything up to the last commit is on disk.
+    assert stored_ids(path) == ["0", "1", "2", "3"]
+    cache.flush()
+    assert stored_ids(path) == ["0", "1", "2", "3", "4"]
+
+
+def test_close_evicts_least_recently_used_over_size(tmp_path, monkeypatch):
+    clock = iter(range(1_000_000_000, 2_000_000_000))
+    monkeypatch.setattr(detail_cache.time, "time", lambda: next(clock))
+    path = str(tmp_path / "details.sqlite3")
+    cache = DetailCache(path, max_mb=0)
+    cache.max_bytes = 60
+    for voucher_id in range(4):
+        cache.put(ENDPOINT, voucher(voucher_id), {"padding": "x" * 10})
+    cache.close()
+
+    assert stored_ids(path) == ["2", "3"]
@@ -0,0 +1,127 @@
+import pytest
+
+import utils.circuit_breaker as circuit_breaker
+import utils.rate_limit as rate_limit
+from utils.circuit_breaker import CircuitBreaker, RetryBudget
+from utils.rate_limit import TokenBucket
+
+
+class FakeClock:
+    """Stands in for the time module: monotonic() returns `now`, sleep() advances it"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold_and_probes_once(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    assert [breaker.record_failure() for _ in range(3)] == [False, False, True]
+    assert breaker.state == CircuitBreaker.OPEN and breaker.is_open
+    assert not breaker.allow()
+
+    clock.now += 60
+    assert breaker.allow()  # the probe
+    assert not breaker.allow()  # everyone else waits for it
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    assert breaker.times_opened == 1
+
+
+def test_breaker_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.times_opened == 2
+
+
+def test_breaker_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_rejects_zero_threshold():
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_threshold=0)
+
+
+def test_retry_budget_grows_with_requests():
+    budget = RetryBudget(ratio=0.1, minimum=2)
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+    for _ in range(10):
+        budget.record_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    assert (budget.retries, budget.denied) == (3, 2)
+
+
+def test_token_bucket_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, per=1.0)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1000.5)
+
+
+def test_token_bucket_drain_and_capacity(clock):
+    bucket = TokenBucket(rate=60, per=60.0, capacity=3)
+    bucket.drain()
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    clock.now += 100  # refill stops at capacity
+    assert [bucket.try_acquire() for _ in range(4)][:3] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+
+def test_start_run_resets_shared_state():
+    from mybillbook.api_client import MyBillBookAPI
+
+    MyBillBookAPI.start_run()
+    breaker = MyBillBookAPI._breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    MyBillBookAPI._retry_budget.denied = 5
+    assert breaker.is_open
+
+    MyBillBookAPI.start_run()
+    assert MyBillBookAPI._breaker.state == CircuitBreaker.CLOSED
+    assert MyBillBookAPI._breaker.times_opened == 0
+    assert MyBillBookAPI._retry_budget.denied == 0
+
+
+def test_clients_close_as_context_managers():
+    from mybillbook.api_client import MyBillBookAPI
+    from mybillbook.async_client import SyncMyBillBookAPI
+
+    with MyBillBookAPI() as api:
+        worker = api._get_session()
+    assert api._sessions == []
+    assert worker is api.session  # the calling thread reuses the main session
+
+    with SyncMyBillBookAPI(http2=False) as client:
+        thread = client._thread
+        assert thread.is_alive()
+    assert not thread.is_alive()
+    assert client._loop.is_closed()
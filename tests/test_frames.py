@@ -0,0 +1,97 @@
+import datetime
+import math
+
+import pandas as pd
+import pytest
+
+from utils.frames import frame_records, parse_number, to_bool, to_date, to_frame, to_int, to_numeric
+
+
+def series(*values):
+    return pd.Series(list(values), dtype=object)
+
+
+def test_to_numeric_strips_commas_and_blanks():
+    result = to_numeric(series("1,199", " 12.5 ", "", "N/A", 7, "inf"))
+    assert result.tolist()[:2] == [1199.0, 12.5]
+    assert result.iloc[4] == 7.0
+    assert result.iloc[[2, 3, 5]].isna().all()
+
+
+@pytest.mark.parametrize("text", ["-1.5", "-1.9", "1.9", "6,000", "0"])
+def test_to_int_truncates_like_int_float(text):
+    assert to_int(series(text)).iloc[0] == int(float(text.replace(",", "")))
+
+
+def test_to_int_keeps_blanks_missing():
+    result = to_int(series("", "x", "3"))
+    assert result.isna().tolist() == [True, True, False]
+    assert str(result.dtype) == "Int64"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1,199", 1199.0), (" 12 ", 12.0), (12, 12.0), (-1.5, -1.5),
+    ("", 0.0), ("N/A", 0.0), (None, 0.0), ("nan", 0.0), ("inf", 0.0), (math.nan, 0.0), ("1_000", 0.0),
+])
+def test_parse_number_matches_to_numeric(value, expected):
+    assert parse_number(value) == expected
+    column = to_numeric(series(value)).fillna(0.0)
+    assert column.iloc[0] == expected
+
+
+def test_parse_number_default():
+    assert parse_number("TBD", default=None) is None
+
+
+def test_to_frame_pads_short_rows_and_applies_schema():
+    rows = [["Name", "Qty", "Date", "Active"], ["A", "1,000", "2025-01-31"], ["B", "2", 45658, "Yes"]]
+
+    df = to_frame(rows, {"Qty": "int", "Date": "date", "Active": "bool"})
+
+    assert df["Name"].tolist() == ["A", "B"]
+    assert df["Qty"].tolist() == [1000, 2]
+    assert df["Date"].tolist() == [pd.Timestamp("2025-01-31"), pd.Timestamp("2025-01-01")]
+    assert df["Active"].tolist() == [False, True]
+
+
+def test_to_frame_empty():
+    assert to_frame([]).empty
+    assert list(to_frame([["A", "B"]]).columns) == ["A", "B"]
+
+
+def test_to_frame_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        to_frame([["A"], ["1"]], {"A": "decimal"})
+
+
+def test_to_date_formats():
+    result = to_date(series("31-01-2025", "31/01/2025", "2025/01/31", "junk"))
+    assert result.iloc[:3].tolist() == [pd.Timestamp("2025-01-31")] * 3
+    assert pd.isna(result.iloc[3])
+
+
+def test_to_bool():
+    assert to_bool(series("Yes", "no", "TRUE", "1", "")).tolist() == [True, False, True, True, False]
+
+
+def test_frame_records_blanks_to_none_and_dates():
+    df = to_frame([["A", "D"], ["x", "2025-01-31"], ["", ""]], {"D": "date"})
+
+    assert frame_records(df, ["A", "D"]) == [("x", datetime.date(2025, 1, 31)), (None, None)]
+
+
+def test_read_frames_types_unformatted_values(sheets, fake_service):
+    # UNFORMATTED_VALUE reads: raw numbers, and serial numbers for date cells
+    fake_service.add_tab("Sales", [["ID", "Invoice Date", "Total Amount", "Tax Included"],
+                                   ["7", 45688, 1199.5, "Yes"],
+                                   ["8", "2025-02-01", "", "No"]])
+
+    frames = sheets.read_frames({"Sales": {"Invoice Date": "date", "Total Amount": "float",
+                                           "Tax Included": "bool"}})
+
+    assert frame_records(frames["Sales"], ["ID", "Invoice Date", "Total Amount", "Tax Included"]) == [
+        ("7", datetime.date(2025, 1, 31), 1199.5, True),
+        ("8", datetime.date(2025, 2, 1), None, False),
+    ]
+    assert fake_service.calls.count('values.batchGet') == 1
+    assert sheets.read_frame("Sales").shape == (2, 4)
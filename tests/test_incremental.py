@@ -0,0 +1,119 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import mybillbook.incremental as incremental
+from mybillbook.incremental import IncrementalSync, WatermarkStore, parse_day
+
+
+HEADERS = ["ID", "Invoice Date", "Amount"]
+
+
+def serial(day):
+    """Sheets serial number for a date"""
+    return (day - date(1899, 12, 30)).days
+
+
+class FakeSheets:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def read_sheet(self, sheet_name, value_render_option='FORMATTED_VALUE', **kwargs):
+        return self.rows
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-01-31", date(2025, 1, 31)),
+    ("31-01-2025", date(2025, 1, 31)),
+    ("2025-01-31T10:15:00Z", date(2025, 1, 31)),
+    (45688, date(2025, 1, 31)),
+    (45688.75, date(2025, 1, 31)),
+    (datetime(2025, 1, 31, 9), date(2025, 1, 31)),
+    ("", None), (None, None), ("soon", None), (True, None),
+])
+def test_parse_day(value, expected):
+    assert parse_day(value) == expected
+
+
+def planned_sync(tmp_path, monkeypatch, existing, days_ago=1):
+    monkeypatch.setattr(incremental, "INCREMENTAL_SYNC", True)
+    today = date.today()
+    store = WatermarkStore(str(tmp_path / "watermarks.json"))
+    store.save("sales", {
+        "last_date": (today - timedelta(days=days_ago)).isoformat(),
+        "range_start": (today - timedelta(days=60)).isoformat(),
+        "last_full_sync": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+        "ids": [],
+    })
+    sync = IncrementalSync(FakeSheets([HEADERS] + existing), "Sales", "sales", HEADERS,
+                           key_column="ID", date_column="Invoice Date", store=store)
+    sync.plan((today - timedelta(days=30)).isoformat(), today.isoformat())
+    assert not sync.full
+    return sync, today
+
+
+@pytest.mark.parametrize("as_serial", [False, True])
+def test_merge_replaces_window_and_ages_out_old_rows(tmp_path, monkeypatch, as_serial):
+    def cell(day):
+        return serial(day) if as_serial else day.isoformat()
+
+    today = date.today()
+    existing = [
+        ["old", cell(today - timedelta(days=45)), 1],      # before the range: aged out
+        ["kept", cell(today - timedelta(days=20)), 2],     # before the window: kept
+        ["refetched", cell(today - timedelta(days=20)), 3],
+        ["deleted", cell(today - timedelta(days=1)), 4],   # in the window, not returned again
+    ]
+    sync, today = planned_sync(tmp_path, monkeypatch, existing)
+
+    fetched = [["refetched", today.isoformat(), 30], ["new", today.isoformat(), 5]]
+    output = sync.merge(fetched)
+
+    assert output[0] == HEADERS
+    assert [row[0] for row in output[1:]] == ["refetched", "new", "kept"]
+
+
+def test_commit_saves_latest_tracked_date(tmp_path, monkeypatch):
+    sync, today = planned_sync(tmp_path, monkeypatch, [], days_ago=3)
+    sync.track({"invoice_date": (today - timedelta(days=1)).isoformat()})
+
+    sync.commit(sync.merge([["a", (today - timedelta(days=1)).isoformat(), 1]]))
+
+    saved = sync.store.get("sales")
+    assert saved["last_date"] == (today - timedelta(days=1)).isoformat()
+    assert saved["ids"] == ["a"]
+    assert "last_created_at" not in saved
+
+
+def test_merge_keeps_rows_of_vouchers_whose_details_failed(tmp_path, monkeypatch):
+    today = date.today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    existing = [
+        ["failed", yesterday, 1],       # in the window, listed but its details failed
+        ["emptied", yesterday, 2],      # re-fetched, now has no rows
+        ["deleted", yesterday, 3],      # not listed again
+    ]
+    sync, today = planned_sync(tmp_path, monkeypatch, existing, days_ago=1)
+    sync.track({"invoice_date": yesterday}, key="failed", fetched=False)
+    sync.track({"invoice_date": yesterday}, key="emptied")
+    sync.track({"invoice_date": today.isoformat()}, key="new")
+
+    output = sync.merge([["new", today.isoformat(), 5]])
+    sync.commit(output)
+
+    assert [row[0] for row in output[1:]] == ["new", "failed"]
+    # The watermark stays at the failed voucher, so the next run fetches it again
+    assert sync.store.get("sales")["last_date"] == yesterday
+
+
+def test_full_merge_keeps_rows_of_vouchers_whose_details_failed(tmp_path):
+    existing = [["failed", "2025-01-30", 1], ["gone", "2025-01-30", 2]]
+    sync = IncrementalSync(FakeSheets([HEADERS] + existing), "Sales", "sales", HEADERS,
+                           key_column="ID", date_column="Invoice Date",
+                           store=WatermarkStore(str(tmp_path / "watermarks.json")))
+    sync.plan("2025-01-01", "2025-01-31", full=True)
+    sync.track({"invoice_date": "2025-01-30"}, key="failed", fetched=False)
+
+    output = sync.merge([["new", "2025-01-31", 5]])
+
+    assert [row[0] for row in output[1:]] == ["new", "failed"]
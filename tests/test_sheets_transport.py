@@ -0,0 +1,64 @@
+import httplib2
+from googleapiclient.errors import HttpError
+
+import utils.sheets as sheets_module
+from utils.sheet_cache import SheetCache
+
+
+def test_thread_transport_has_socket_timeout(sheets):
+    assert sheets._thread_http().http.timeout
+
+
+def test_shared_transport_has_socket_timeout(sheets):
+    sheets.creds = type("Creds", (), {"valid": True})()
+    assert sheets._authorized_http().http.timeout
+
+
+class FakeDrive:
+    """Drive files().get() that answers with each of `responses` in turn (HttpErrors are raised)"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields):
+        return self
+
+    def execute(self, http=None):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({'status': status}), b'')
+
+
+def test_version_probe_is_retried_within_the_read_quota(sheets, tmp_path, monkeypatch):
+    monkeypatch.setattr(sheets_module.time, "sleep", lambda seconds: None)
+    sheets._read_cache = SheetCache(tmp_path / "cache", sheets.spreadsheet_id)
+    sheets._drive_service = FakeDrive(http_error(429), {'version': '12'})
+
+    assert sheets._get_spreadsheet_version() == '12'
+    assert sheets.get_request_stats()['read']['retried'] == 1
+    assert sheets._read_cache is not None
+
+
+def test_version_probe_keeps_cache_after_transient_failure(sheets, tmp_path, monkeypatch):
+    monkeypatch.setattr(sheets_module.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(sheets_module, "SHEETS_MAX_RETRIES", 1)
+    sheets._read_cache = SheetCache(tmp_path / "cache", sheets.spreadsheet_id)
+    sheets._drive_service = FakeDrive(http_error(503), http_error(503))
+
+    assert sheets._get_spreadsheet_version() is None
+    assert sheets._read_cache is not None
+
+    # A permission error turns the cache off for good
+    sheets._drive_service = FakeDrive(http_error(403))
+    assert sheets._get_spreadsheet_version() is None
+    assert sheets._read_cache is None
@@ -0,0 +1,31 @@
+from utils.sheet_cache import SheetCache
+
+
+HEADER = ["ID", "Name", "Qty"]
+
+
+def test_upsert_rows_sends_only_differences(sheets, fake_service):
+    fake_service.add_tab("Items", [HEADER, [1, "A", 1], [2, "B", 2], [3, "C", 3], [4, "D", 4]])
+
+    result = sheets.upsert_rows("Items", [HEADER, [1, "A", 1], [2, "B", 5], [3, "C", 3], [4, "D", 4],
+                                          [5, "E", 6]], ["ID"])
+
+    assert result == {'updated': 1, 'appended': 1, 'deleted': 0}
+    assert fake_service.values_of("Items") == [
+        HEADER, [1, "A", 1], [2, "B", 5], [3, "C", 3], [4, "D", 4], [5, "E", 6]]
+
+
+def test_upsert_rows_ignores_stale_cached_copy(sheets, fake_service, tmp_path):
+    fake_service.add_tab("Items", [HEADER, [1, "A", 1], [2, "B", 2], [3, "C", 3]])
+
+    # The cache holds an older copy (row 2 was added in the browser) and the
+    # Drive revision hasn't moved yet
+    sheets._read_cache = SheetCache(tmp_path / "cache", sheets.spreadsheet_id)
+    sheets._get_spreadsheet_version = lambda: "v1"
+    sheets._read_cache.put("Items", "v1", [HEADER, [1, "A", 1], [3, "C", 3]], "FORMULA")
+
+    result = sheets.upsert_rows("Items", [HEADER, [1, "A", 1], [2, "B", 2], [3, "C", 3], [4, "D", 4]],
+                                ["ID"])
+
+    assert result == {'updated': 0, 'appended': 1, 'deleted': 0}
+    assert fake_service.values_of("Items") == [HEADER, [1, "A", 1], [2, "B", 2], [3, "C", 3], [4, "D", 4]]
@@ -0,0 +1,133 @@
+import json
+import math
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+import utils.sheets as sheets_module
+from utils.sheets import SheetsManager
+
+
+def value_of(cell):
+    return cell.get('userEnteredValue', {})
+
+
+@pytest.mark.parametrize("text, number", [
+    ("1199", 1199.0),
+    ("1,199", 1199.0),
+    ("-12.50", -12.5),
+    ("+3", 3.0),
+    (".5", 0.5),
+    ("1,234,567.89", 1234567.89),
+])
+def test_cell_data_numeric_text_becomes_number(text, number):
+    assert value_of(SheetsManager._cell_data(text)) == {'numberValue': number}
+
+
+@pytest.mark.parametrize("text", [
+    "nan", "NaN", "inf", "-Infinity", "1_000", " 12", "12 ", "1,19", "12,34,567",
+    "2025-01-31", "50%", "1e5", "84 0110", "",
+])
+def test_cell_data_other_text_stays_string(text):
+    cell = SheetsManager._cell_data(text)
+    if text == "":
+        assert cell == {}
+    else:
+        assert value_of(cell) == {'stringValue': text}
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+def test_cell_data_non_finite_float_is_valid_json(value):
+    cell = SheetsManager._cell_data(value)
+    assert 'stringValue' in value_of(cell)
+    json.dumps(cell, allow_nan=False)
+
+
+def test_cell_data_types():
+    assert value_of(SheetsManager._cell_data(5)) == {'numberValue': 5}
+    assert value_of(SheetsManager._cell_data(True)) == {'boolValue': True}
+    assert value_of(SheetsManager._cell_data("=C2*D2")) == {'formulaValue': "=C2*D2"}
+    assert value_of(SheetsManager._cell_data("1,199", as_text=True)) == {'stringValue': "1,199"}
+    assert SheetsManager._cell_data(None) == {}
+
+
+def test_replace_sheet_converts_every_chunk_the_same_way(sheets, fake_service, monkeypatch):
+    monkeypatch.setattr(sheets_module, 'WRITE_CHUNK_ROWS', 3)
+    rows = [["Name", "Price", "Code"]] + [[f"Item {i}", "1,199", "0110"] for i in range(10)]
+
+    assert sheets.replace_sheet("Items", rows, formats={"C": "text"}) is not None
+
+    written = fake_service.values_of("Items")
+    assert written[0] == ["Name", "Price", "Code"]
+    assert written[1:] == [[f"Item {i}", 1199.0, "0110"] for i in range(10)]
+    # Every chunk went out as RowData, none as a values() write
+    assert 'values.update' not in fake_service.calls
+    for body in fake_service.batches:
+        json.dumps(body, allow_nan=False)
+
+
+def test_replace_sheet_shrinks_stale_rows(sheets, fake_service):
+    fake_service.add_tab("Items", [["Name"]] + [[f"old {i}"] for i in range(20)])
+
+    sheets.replace_sheet("Items", [["Name"], ["new"]])
+
+    assert fake_service.values_of("Items") == [["Name"], ["new"]]
+
+
+def test_replace_sheet_writes_nan_as_text(sheets, fake_service):
+    sheets.replace_sheet("Items", [["Name", "Price"], ["A", math.nan], ["B", "inf"]])
+
+    assert fake_service.values_of("Items")[1:] == [["A", "nan"], ["B", "inf"]]
+
+
+def test_replace_sheets_sizes_requests_on_row_data(sheets, fake_service, monkeypatch):
+    limit = 4000
+    monkeypatch.setattr(sheets_module, 'WRITE_CHUNK_BYTES', limit)
+    tables = {
+        name: ([["Name", "Price"]] + [[f"{name} item {i}", "1,199"] for i in range(60)], {"A": "text"})
+        for name in ("Inventory", "ADD", "UPDATE", "WePrint")
+    }
+
+    assert sheets.replace_sheets(tables) is not None
+
+    for name, (rows, _) in tables.items():
+        assert fake_service.values_of(name)[1:] == [[row[0], 1199.0] for row in rows[1:]]
+    # Several requests, none carrying more row data than one chunk allows
+    assert len(fake_service.batches) > len(tables)
+    for body in fake_service.batches:
+        row_bytes = sum(len(json.dumps(request['updateCells'].get('rows', [])))
+                        for request in body['requests'] if 'updateCells' in request)
+        assert row_bytes <= limit
+
+
+def test_replace_sheets_shares_one_request_when_small(sheets, fake_service):
+    tables = {name: ([["Name"], [name]], None) for name in ("Inventory", "ADD", "UPDATE", "WePrint")}
+
+    sheets.replace_sheets(tables)
+
+    assert len(fake_service.batches) == 1
+    assert {name: fake_service.values_of(name) for name in tables} == \
+        {name: [["Name"], [name]] for name in tables}
+
+
+def test_replace_sheets_picks_new_ids_from_a_fresh_sheet_list(sheets, fake_service):
+    fake_service.add_tab("Inventory", [["Name"]])
+    sheets._load_sheet_metadata()
+    fake_service.add_tab("Added elsewhere", [["Name"]])  # not in the cached list
+
+    sheets.replace_sheets({"WePrint": ([["Product"], ["Ring"]], None)})
+
+    ids = [tab['id'] for tab in fake_service.tabs.values()]
+    assert len(set(ids)) == len(ids) == 3
+    assert fake_service.values_of("WePrint") == [["Product"], ["Ring"]]
+
+
+def test_replace_sheets_aborts_when_the_sheet_list_is_unavailable(sheets, fake_service, monkeypatch):
+    def unavailable(*args, **kwargs):
+        raise HttpError(httplib2.Response({'status': 403}), b'')
+
+    monkeypatch.setattr(fake_service, "get", unavailable)
+
+    assert sheets.replace_sheets({"WePrint": ([["Product"], ["Ring"]], None)}) is None
+    assert fake_service.batches == []
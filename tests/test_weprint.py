@@ -0,0 +1,32 @@
+import pytest
+
+from transforms.transform3_weprint import WEPRINT_HEADERS, build_weprint, label_price
+
+
+@pytest.mark.parametrize("value, expected", [
+    (1199, "1,199.00"),
+    (250.5, "250.50"),
+    ("1,199.00", "1,199.00"),
+    ("250", "250.00"),
+    ("TBD", "TBD"),
+    ("", ""),
+])
+def test_label_price(value, expected):
+    assert label_price(value) == expected
+
+
+def test_prices_match_whether_read_from_the_sheet_or_built_in_memory():
+    in_memory = [["Rings", "Rings Gold ABCD", 1100, 2, 1199, 2200, 2398, "57 0011", "No", "57 0011"]]
+    from_sheet = [["Rings", "Rings Gold ABCD", "1,100.00", "2", "1,199.00", "2,200.00", "2,398.00",
+                   "57 0011", "No", "57 0011"]]
+
+    rows, skipped = build_weprint(in_memory)
+
+    assert rows == build_weprint(from_sheet)[0]
+    assert rows == [WEPRINT_HEADERS] + [["Rings Gold ABCD", "57 0011", "1,199.00"]] * 2
+    assert skipped == 0
+
+
+def test_skips_charms_40():
+    rows, skipped = build_weprint([["Charms", "Charms 40 ABCD", 20, 500, 50, "", "", "", "", "11 0611"]])
+    assert (rows, skipped) == ([WEPRINT_HEADERS], 1)
@@ -0,0 +1,149 @@
+"""
+Pipeline Runner
+Runs Transform 1 → Transform 2 → WePrint in memory and writes every output
+tab at the end
+
+The stages pass their tables to each other directly instead of writing a
+tab and reading it back, so a run reads Sheets once (RAW + MyBillBook
+inventory) and writes Inventory, ADD, UPDATE and WePrint together (one
+batchUpdate unless the tables are too large for one request, see
+SheetsManager.replace_sheets). With write_sheets=False nothing is written
+to Sheets and the tables are saved as CSV or Parquet files only.
+"""
+
+from config import (
+    SHEET_RAW,
+    SHEET_INVENTORY,
+    SHEET_MYBILLBOOK_CURRENT,
+    SHEET_MYBILLBOOK_ADD,
+    SHEET_MYBILLBOOK_UPDATE,
+    SHEET_WEPRINT,
+)
+from transforms.transform1_consolidate import build_inventory, with_total_formulas, INVENTORY_FORMATS
+from transforms.transform2_mybillbook import build_mybillbook_tables, ADD_FORMATS, UPDATE_FORMATS
+from transforms.transform3_weprint import build_weprint, WEPRINT_FORMATS
+from utils.csv_exporter import save_to_csv, save_to_parquet
+
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Export type (see EXPORT_FOLDERS) for each table the pipeline produces
+EXPORT_TYPES = {
+    SHEET_RAW: "inventory_raw",
+    SHEET_INVENTORY: "inventory",
+    SHEET_MYBILLBOOK_ADD: "mybillbook_add",
+    SHEET_MYBILLBOOK_UPDATE: "mybillbook_update",
+    SHEET_WEPRINT: "weprint",
+}
+
+
+def build_tables(sheet_data):
+    """
+    Run every transform stage on the tabs read from Sheets
+
+    Args:
+        sheet_data: Dict with the SHEET_MYBILLBOOK_CURRENT and SHEET_RAW rows
+
+    Returns:
+        Dict of sheet name -> rows (header row first) for Inventory, ADD,
+        UPDATE and WePrint, or None if the RAW sheet is empty
+    """
+    print("\nStep 1: Consolidating Inventory...")
+    inventory = build_inventory(sheet_data)
+    if inventory is None:
+        return None
+    print(f"[OK] Inventory consolidated: {len(inventory) - 1} items")
+
+    print("\nStep 2: Generating MyBillBook Import Data...")
+    output_add, output_update = build_mybillbook_tables(inventory[1:])
+    print(f"[OK] ADD: {len(output_add) - 1} items, UPDATE: {len(output_update) - 1} items")
+
+    print("\nStep 3: Generating WePrint Labels...")
+    weprint, skipped_items = build_weprint(inventory[1:])
+    print(f"[OK] WePrint: {len(weprint) - 1} labels")
+    if skipped_items > 0:
+        print(f"     {skipped_items} items skipped (Charms 40 bulk items)")
+
+    return {
+        SHEET_INVENTORY: inventory,
+        SHEET_MYBILLBOOK_ADD: output_add,
+        SHEET_MYBILLBOOK_UPDATE: output_update,
+        SHEET_WEPRINT: weprint,
+    }
+
+
+def save_tables(tables, export_format="csv", prompt_user=True):
+    """
+    Save each table to its export folder
+
+    Args:
+        tables: Dict of sheet name -> rows, for sheet names in EXPORT_TYPES
+        export_format: "csv" or "parquet" (Parquet files are saved without prompting)
+        prompt_user: Ask before saving each CSV
+
+    Returns:
+        Dict of sheet name -> saved file path (None if skipped or failed)
+    """
+    saved = {}
+    for sheet_name, rows in tables.items():
+        export_type = EXPORT_TYPES[sheet_name]
+        if export_format == "parquet":
+            saved[sheet_name] = save_to_parquet(rows, export_type)
+        else:
+            saved[sheet_name] = save_to_csv(rows, export_type, prompt_user=prompt_user)
+    return saved
+
+
+def run_pipeline(sheets_manager, write_sheets=True, export_format="csv", auto_save=False):
+    """
+    Consolidate inventory and build the MyBillBook and WePrint outputs in one pass
+
+    Args:
+        sheets_manager: GoogleSheetsManager instance (used to read the input tabs)
+        write_sheets: Write Inventory, ADD, UPDATE and WePrint to Sheets together
+            (see SheetsManager.replace_sheets). If False, Sheets is only read and
+            every table is saved to a file instead.
+        export_format: "csv" or "parquet" for the saved files
+        auto_save: Save files without prompting (always the case when write_sheets is False)
+
+    Returns:
+        Dict of sheet name -> rows that were produced, or None if nothing was
+        produced or the Sheets write failed
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid export format: {export_format}. Must be one of {list(EXPORT_FORMATS)}")
+
+    print("Starting pipeline (Transform 1 → Transform 2 → WePrint)...")
+
+    # The only read of the run: MyBillBook inventory and RAW in one round trip
+    sheet_data = sheets_manager.read_sheets([SHEET_MYBILLBOOK_CURRENT, SHEET_RAW])
+
+    tables = build_tables(sheet_data)
+    if tables is None:
+        return None
+
+    if write_sheets:
+        print("\nWriting all output tabs...")
+        response = sheets_manager.replace_sheets({
+            SHEET_INVENTORY: (with_total_formulas(tables[SHEET_INVENTORY]), INVENTORY_FORMATS),
+            SHEET_MYBILLBOOK_ADD: (tables[SHEET_MYBILLBOOK_ADD], ADD_FORMATS),
+            SHEET_MYBILLBOOK_UPDATE: (tables[SHEET_MYBILLBOOK_UPDATE], UPDATE_FORMATS),
+            SHEET_WEPRINT: (tables[SHEET_WEPRINT], WEPRINT_FORMATS),
+        })
+        if response is None:
+            print("[ERROR] Writing the output tabs failed; no files were saved")
+            return None
+        print(f"[OK] {len(tables)} tabs written to Google Sheets")
+    else:
+        print("\n[INFO] Sheets output skipped; saving files only")
+
+    # Files come from the in-memory tables, so nothing is read back from Sheets
+    print("\n" + "="*60)
+    save_tables(
+        {SHEET_RAW: sheet_data[SHEET_RAW], **tables},
+        export_format,
+        prompt_user=write_sheets and not auto_save,
+    )
+    print("="*60)
+
+    return tables
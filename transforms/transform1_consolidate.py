@@ -1,29 +1,66 @@
+import hashlib
+import itertools
 import random
 import string
 import re
-from config import SHEET_RAW, SHEET_INVENTORY, SHEET_MYBILLBOOK_CURRENT
+import numpy as np
+import pandas as pd
+from config import SHEET_RAW, SHEET_INVENTORY, SHEET_MYBILLBOOK_CURRENT, DETERMINISTIC_CODES, CODE_SEED
 from utils.csv_exporter import export_sheet_data
+from utils.frames import parse_number, to_numeric, to_text
 
 
-def generate_name(category):
+# Columns A-E of the RAW sheet
+RAW_COLUMNS = ["Type", "Name", "Cost Price", "Quantity", "Selling Price"]
+MATCH_KEY_COLUMNS = ["category", "cost_paise", "selling_paise", "variant"]
+
+# Columns F-J added by consolidation
+INVENTORY_EXTRA_HEADERS = ["Total Cost Price", "Total Selling Price", "Barcode", "Already Present", "Inventory Item Barcode"]
+
+INVENTORY_FORMATS = {
+    # Text columns
+    "A": "text",  # Type
+    "B": "text",  # Name
+    "H": "text",  # Barcode (generated)
+    "I": "text",  # Already Present
+    "J": "text",  # Inventory Item Barcode
+
+    # Numeric columns
+    "C": ("number", 2),  # Per Item CP
+    "D": "number",  # Quantity
+    "E": ("number", 2),  # Per Item SP
+    "F": ("number", 2),  # Total CP
+    "G": ("number", 2),  # Total SP
+}
+
+
+# Barcode prefixes run 13-99; names end in 4 uppercase letters
+BARCODE_PREFIXES = range(13, 100)
+NAME_CODE_LENGTH = 4
+
+# Random draws before falling back to searching for a free value
+ALLOCATION_ATTEMPTS = 50
+
+
+def generate_name(category, rng=random):
     """Generate name with category and 4 random uppercase letters"""
-    random_chars = ''.join(random.choices(string.ascii_uppercase, k=4))
+    random_chars = ''.join(rng.choices(string.ascii_uppercase, k=NAME_CODE_LENGTH))
     return f"{category} {random_chars}"
 
 
-def generate_name_with_existing(category, existing_name):
+def generate_name_with_existing(category, existing_name, rng=random):
     """Generate name with category, existing name, and 4 random uppercase letters"""
-    random_chars = ''.join(random.choices(string.ascii_uppercase, k=4))
+    random_chars = ''.join(rng.choices(string.ascii_uppercase, k=NAME_CODE_LENGTH))
     return f"{category} {existing_name} {random_chars}"
 
 
-def generate_barcode(cost_price):
+def generate_barcode(cost_price, rng=random):
     """
     Generate barcode with format: [2-digit prefix 13-99] [reversed price + random suffix]
     Total length after prefix: 4 digits
     """
     # First 2 digits should be between 13-99
-    prefix = random.randint(13, 99)
+    prefix = rng.randint(13, 99)
 
     # Convert cost price to string and reverse it
     price_str = str(cost_price)
@@ -34,11 +71,101 @@ def generate_barcode(cost_price):
     suffix_len = 4 - price_len
 
     # Generate random suffix
-    suffix = ''.join(random.choices(string.digits, k=suffix_len))
+    suffix = ''.join(rng.choices(string.digits, k=suffix_len))
 
     return f"{prefix} {reversed_price}{suffix}"
 
 
+def barcode_key(barcode):
+    """Barcode as compared for collisions ("84 0110" and "840110" are the same)"""
+    return str(barcode).replace(" ", "").strip()
+
+
+class BarcodeAllocator:
+    """
+    Hands out barcodes and names that are not already taken
+
+    Every SKU code and name in myBillBook Inventory, plus everything handed
+    out in this run, is kept in a set, so each candidate is checked in
+    O(1). A taken candidate is redrawn; after ALLOCATION_ATTEMPTS draws the
+    free values are searched in order, and if there are none a RuntimeError
+    says which price (or name) ran out.
+
+    With a seed, a call given a key draws from a generator seeded by a hash
+    of the seed and key, so the same key gets the same value (and the same
+    redraws after a collision) every run.
+    """
+
+    def __init__(self, existing_barcodes=(), existing_names=(), rng=random, seed=None):
+        self.rng = rng
+        self.seed = seed
+        self.barcodes = {barcode_key(barcode) for barcode in existing_barcodes if barcode}
+        self.names = {str(name).strip().lower() for name in existing_names if name}
+        self.collisions = 0
+
+    def reserve_barcode(self, barcode):
+        """Mark a barcode as taken (e.g. a MyBillBook SKU used for a matched item)"""
+        self.barcodes.add(barcode_key(barcode))
+
+    def _rng_for(self, key, purpose):
+        """Generator for one allocation: seeded from the key in deterministic mode"""
+        if self.seed is None or key is None:
+            return self.rng
+        digest = hashlib.sha256(f"{self.seed}|{purpose}|{key}".encode("utf-8")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def barcode(self, cost_price, key=None):
+        """Barcode for a cost price, distinct from every barcode seen so far"""
+        rng = self._rng_for(key, "barcode")
+        for _ in range(ALLOCATION_ATTEMPTS):
+            candidate = generate_barcode(cost_price, rng)
+            if barcode_key(candidate) not in self.barcodes:
+                return self._take_barcode(candidate)
+            self.collisions += 1
+
+        # Nearly full: look for a free barcode in order instead of guessing
+        reversed_price = str(cost_price)[::-1]
+        suffix_len = max(0, 4 - len(reversed_price))
+        for prefix in BARCODE_PREFIXES:
+            for number in range(10 ** suffix_len):
+                suffix = str(number).zfill(suffix_len) if suffix_len else ""
+                candidate = f"{prefix} {reversed_price}{suffix}"
+                if barcode_key(candidate) not in self.barcodes:
+                    return self._take_barcode(candidate)
+
+        raise RuntimeError(
+            f"No barcodes left for cost price {cost_price}: all "
+            f"{len(BARCODE_PREFIXES) * 10 ** suffix_len} barcodes for this price are already in use")
+
+    def name(self, category, existing_name="", key=None):
+        """Generated name for a new item, distinct from every name seen so far"""
+        rng = self._rng_for(key, "name")
+        for _ in range(ALLOCATION_ATTEMPTS):
+            if existing_name:
+                candidate = generate_name_with_existing(category, existing_name, rng)
+            else:
+                candidate = generate_name(category, rng)
+            if candidate.lower() not in self.names:
+                return self._take_name(candidate)
+            self.collisions += 1
+
+        prefix = f"{category} {existing_name} " if existing_name else f"{category} "
+        for letters in itertools.product(string.ascii_uppercase, repeat=NAME_CODE_LENGTH):
+            candidate = prefix + "".join(letters)
+            if candidate.lower() not in self.names:
+                return self._take_name(candidate)
+
+        raise RuntimeError(f"No names left for '{prefix.strip()}': all 4-letter codes are already in use")
+
+    def _take_barcode(self, barcode):
+        self.barcodes.add(barcode_key(barcode))
+        return barcode
+
+    def _take_name(self, name):
+        self.names.add(name.lower())
+        return name
+
+
 def extract_variant_from_mybillbook_name(mybillbook_name, category):
     """
     Extract variant from MyBillBook name by removing category and last 4 characters
@@ -68,74 +195,216 @@ def extract_variant_from_mybillbook_name(mybillbook_name, category):
     return ""
 
 
-def safe_float(value):
-    """Safely convert to float, handling commas and empty values"""
-    if not value:
-        return 0.0
-    try:
-        return float(str(value).replace(',', ''))
-    except (ValueError, AttributeError):
-        return 0.0
+def plain_number(value):
+    """
+    Number from a sheet cell, as an int when whole ("1,250" -> 1250, "12.5" -> 12.5)
+
+    Cells that aren't numbers ("", "N/A", "TBD") are returned unchanged.
+    """
+    number = parse_number(value, default=None)
+    if number is None:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def to_paise(value):
+    """Price as whole paise, so prices can be compared exactly and used in keys"""
+    return round(parse_number(value) * 100)
 
 
-def find_matching_mybillbook_item(category, raw_name, cost_price, selling_price, mybillbook_items):
+def match_key(category, name, cost_price, selling_price):
     """
-    Find matching item in MyBillBook inventory
+    Key a RAW item and the MyBillBook item it matches have in common:
+    (lowercased category, cost price in paise, selling price in paise, lowercased name variant)
+    """
+    return (
+        str(category).lower(),
+        to_paise(cost_price),
+        to_paise(selling_price),
+        str(name).strip().lower() if name else "",
+    )
 
-    Matching criteria:
-    1. Category matches
-    2. Cost Price matches (purchase price)
-    3. Selling Price matches
-    4. Name matches: RAW name == variant extracted from MyBillBook name
 
-    Returns: MyBillBook item dict if found, None otherwise
+def price_key(value):
+    """Price as text for keys: whole paise when it's a number, else the stripped cell text"""
+    number = parse_number(value, default=None)
+    return str(round(number * 100)) if number is not None else str(value).strip()
+
+
+def code_key(category, name, cost_price, selling_price):
+    """Stable text key of a consolidated item, for deterministic names and barcodes"""
+    return "|".join([
+        str(category).strip(),
+        str(name).strip() if name else "",
+        price_key(cost_price),
+        price_key(selling_price),
+    ])
+
+
+def build_match_index(mybillbook_items):
     """
-    raw_name_clean = str(raw_name).strip() if raw_name else ""
+    Index MyBillBook items by match_key, extracting each name variant once
 
+    Returns: dict of key -> list of items with that key, in inventory order
+    """
+    match_index = {}
     for mb_item in mybillbook_items:
-        # Check category
-        if mb_item['category'].lower() != category.lower():
-            continue
+        category = str(mb_item['category'])
+        variant = extract_variant_from_mybillbook_name(str(mb_item['name']), category)
+        key = match_key(category, variant, mb_item['purchase_price'], mb_item['selling_price'])
+        match_index.setdefault(key, []).append(mb_item)
+    return match_index
 
-        # Check cost price (within small tolerance for float comparison)
-        if abs(safe_float(mb_item['purchase_price']) - safe_float(cost_price)) > 0.01:
-            continue
 
-        # Check selling price
-        if abs(safe_float(mb_item['selling_price']) - safe_float(selling_price)) > 0.01:
-            continue
+def report_ambiguous_matches(match_index, limit=10):
+    """Warn about keys shared by several MyBillBook items (the first one listed is used)"""
+    ambiguous = [items for items in match_index.values() if len(items) > 1]
+    if not ambiguous:
+        return
 
-        # Check name: extract variant from MyBillBook name and compare with RAW name
-        variant = extract_variant_from_mybillbook_name(mb_item['name'], category)
+    print(f"[WARN] {len(ambiguous)} MyBillBook item groups share the same category, prices and name variant; "
+          f"rows matching them use the first item listed:")
+    for items in ambiguous[:limit]:
+        names = ", ".join(f"{item['name']} (SKU: {item['sku_code']})" for item in items[:3])
+        more = f" and {len(items) - 3} more" if len(items) > 3 else ""
+        print(f"  {names}{more}")
+    if len(ambiguous) > limit:
+        print(f"  ... and {len(ambiguous) - limit} more")
 
-        if variant.lower() == raw_name_clean.lower():
-            # Match found!
-            return mb_item
 
-    return None
+def normalized_codes(column, normalize):
+    """
+    Integer code per cell of a column, equal for cells that normalize to the same value
+
+    RAW columns repeat a few distinct values many times, so each distinct
+    value is normalized once instead of once per cell.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    normalized, _ = pd.factorize(normalize(pd.Series(uniques, dtype=object)), use_na_sentinel=False)
+    return normalized[codes]
 
 
+def price_codes(values):
+    """
+    Prices as group values: the number rounded to paise, or the stripped
+    text for cells that aren't numbers, so "N/A" and "TBD" stay apart
+    """
+    numbers = to_numeric(values).round(2).astype(object)
+    return numbers.where(numbers.notna(), to_text(values).str.strip().astype(object))
 
 
-def consolidate_inventory(sheets_manager):
+def consolidate_rows(rows):
     """
-    Main function to consolidate inventory from RAW sheet
+    Group RAW rows by Type|Name|Cost Price|Selling Price and sum their quantities
+
+    Type and Name are compared with surrounding spaces removed and prices as
+    numbers, so "1,250" and "1250" are the same price. Prices that aren't
+    numbers are compared as text instead. Each group keeps the
+    cells of its first row and groups stay in first-appearance order. The
+    input rows are not modified.
+
+    Args:
+        rows: RAW data rows (no header), columns A-E
+
+    Returns:
+        DataFrame with RAW_COLUMNS, one row per unique item
+    """
+    # Short rows are padded with None, extra columns dropped
+    raw = pd.DataFrame(list(rows), dtype=object).reindex(columns=range(len(RAW_COLUMNS)))
+    raw.columns = RAW_COLUMNS
+    if raw.empty:
+        return raw
+
+    keys = [
+        normalized_codes(raw["Type"], lambda values: to_text(values).str.strip()),
+        normalized_codes(raw["Name"], lambda values: to_text(values).str.strip()),
+        normalized_codes(raw["Cost Price"], price_codes),
+        normalized_codes(raw["Selling Price"], price_codes),
+    ]
+    # Fold the key codes into one group number per row, in order of first
+    # appearance (re-factorizing after each column keeps the numbers small)
+    groups = keys[0]
+    for codes in keys[1:]:
+        groups, _ = pd.factorize(groups * (int(codes.max()) + 1) + codes)
+
+    quantity_codes, quantity_values = pd.factorize(raw["Quantity"], use_na_sentinel=False)
+    quantities = to_numeric(pd.Series(quantity_values, dtype=object)).fillna(0).to_numpy()[quantity_codes]
+
+    # Each group keeps its first row's cells, with the summed quantity
+    _, first_rows = np.unique(groups, return_index=True)
+    consolidated = raw.iloc[first_rows].fillna("").reset_index(drop=True)
+    consolidated["Quantity"] = np.bincount(groups, weights=quantities)
+
+    # Whole quantities as ints, so the sheet shows 4 rather than 4.0
+    consolidated["Quantity"] = [int(q) if float(q).is_integer() else q for q in consolidated["Quantity"]]
+    return consolidated
+
+
+def match_consolidated(consolidated, match_index):
+    """
+    Look up every consolidated item in the match index with one join
 
-    NEW Process:
-    1. Read MyBillBook inventory (synced data)
-    2. Read Inventory RAW sheet
-    3. Consolidate rows by Type|Name|Cost Price|Selling Price (sum quantities)
-    4. For each item, check if it exists in MyBillBook:
+    Matching criteria (see match_key):
+    1. Category matches
+    2. Cost Price matches (purchase price)
+    3. Selling Price matches
+    4. Name matches: RAW name == variant extracted from MyBillBook name
+
+    When several MyBillBook items share a key, the first one listed is used.
+
+    Args:
+        consolidated: DataFrame from consolidate_rows
+        match_index: Index from build_match_index
+
+    Returns:
+        List with the matched MyBillBook item (or None) for each consolidated row
+    """
+    if consolidated.empty:
+        return []
+
+    keys = pd.DataFrame({
+        "category": to_text(consolidated["Type"]).str.lower(),
+        "cost_paise": (to_numeric(consolidated["Cost Price"]).fillna(0) * 100).round().astype("int64"),
+        "selling_paise": (to_numeric(consolidated["Selling Price"]).fillna(0) * 100).round().astype("int64"),
+        "variant": to_text(consolidated["Name"]).str.strip().str.lower(),
+    })
+
+    first_items = [items[0] for items in match_index.values()]
+    index_frame = pd.DataFrame(list(match_index.keys()), columns=MATCH_KEY_COLUMNS).astype(
+        {"category": "string", "cost_paise": "int64", "selling_paise": "int64", "variant": "string"})
+    index_frame["position"] = range(len(first_items))
+
+    joined = keys.merge(index_frame, how="left", on=MATCH_KEY_COLUMNS)
+    return [None if pd.isna(position) else first_items[int(position)] for position in joined["position"]]
+
+
+def build_inventory(sheet_data):
+    """
+    Build the Inventory table from the RAW and MyBillBook inventory tabs
+
+    1. Parse MyBillBook inventory (synced data)
+    2. Consolidate RAW rows by Type|Name|Cost Price|Selling Price (sum quantities)
+    3. For each item, check if it exists in MyBillBook:
        - Match by: Category + Cost Price + Selling Price + Name variant
        - If FOUND: Use existing MyBillBook name & barcode, mark "Already Present" = Yes
        - If NOT found: Generate new name & barcode, mark "Already Present" = No
-    5. Write to Inventory sheet with 2 new columns (I, J)
-    """
-    print("Starting inventory consolidation...")
 
-    # Step 1: Read MyBillBook inventory
-    mybillbook_data = sheets_manager.read_sheet(SHEET_MYBILLBOOK_CURRENT)
+    Prices, quantities and the totals in columns F-G are numbers, so the
+    table can go straight to Transform 2 and WePrint without a round trip
+    through the sheet. Prices that aren't numbers ("N/A", "TBD") keep their
+    RAW text and leave their total blank. Use with_total_formulas() before
+    writing it to Sheets.
+
+    Args:
+        sheet_data: Dict with the SHEET_MYBILLBOOK_CURRENT and SHEET_RAW rows (as from read_sheets)
+
+    Returns:
+        List of rows (header row first, columns A-J), or None if the RAW sheet is empty
+    """
+    # Step 1: Parse MyBillBook inventory
+    mybillbook_data = sheet_data[SHEET_MYBILLBOOK_CURRENT]
     mybillbook_items = []
+    mybillbook_rows = []
 
     if mybillbook_data and len(mybillbook_data) > 1:
         mybillbook_rows = mybillbook_data[1:]
@@ -155,62 +424,50 @@ def consolidate_inventory(sheets_manager):
     else:
         print("Warning: No MyBillBook inventory found. All items will be treated as new.")
 
-    # Step 2: Read raw data
-    data = sheets_manager.read_sheet(SHEET_RAW)
+    match_index = build_match_index(mybillbook_items)
+    report_ambiguous_matches(match_index)
+
+    # New names and barcodes must not clash with MyBillBook or with each other
+    allocator = BarcodeAllocator(
+        existing_barcodes=[mb_row[2] for mb_row in mybillbook_rows if len(mb_row) > 2],
+        existing_names=[mb_row[1] for mb_row in mybillbook_rows if len(mb_row) > 1],
+        seed=CODE_SEED if DETERMINISTIC_CODES else None,
+    )
+
+    # Raw data
+    data = sheet_data[SHEET_RAW]
     if not data:
         print("No data found in Inventory RAW sheet")
-        return
+        return None
 
     headers = data[0]
     rows = data[1:]
 
     print(f"Processing {len(rows)} rows from RAW sheet...")
 
-    # Step 3: Consolidate by key: Type|Name|Cost Price|Selling Price
-    consolidated = {}
-
-    for row in rows:
-        # Ensure row has exactly 5 columns (A-E)
-        while len(row) < 5:
-            row.append("")
-        # Keep only first 5 columns
-        row = row[:5]
-
-        # Create key from columns A, B, C, E (indices 0, 1, 2, 4)
-        # Type | Name | Cost Price | Selling Price
-        key = f"{row[0]}|{row[1]}|{row[2]}|{row[4]}"
-
-        if key in consolidated:
-            # Sum quantity (column D, index 3)
-            consolidated[key][3] = float(consolidated[key][3] or 0) + float(row[3] or 0)
-        else:
-            consolidated[key] = list(row)
-
+    # Step 2: Consolidate by key: Type|Name|Cost Price|Selling Price
+    consolidated = consolidate_rows(rows)
     print(f"Consolidated into {len(consolidated)} unique items")
 
-    # Step 4: Process each consolidated item
-    output_headers = headers + ["Total Cost Price", "Total Selling Price", "Barcode", "Already Present", "Inventory Item Barcode"]
-    output_rows = []
-    barcodes = []
-    already_present_flags = []
-    inventory_item_barcodes = []
+    # Look up every item in MyBillBook at once
+    matches = match_consolidated(consolidated, match_index)
+
+    # Step 3: Process each consolidated item
+    output = [list(headers[:5]) + INVENTORY_EXTRA_HEADERS]
 
     matched_count = 0
     new_count = 0
 
-    for row in consolidated.values():
+    for row, mb_match in zip(consolidated[RAW_COLUMNS].values.tolist(), matches):
         category = row[0]
         raw_name = row[1] if row[1] else ""
         cost_price = row[2]
-        selling_price = row[4]
-
-        # Try to find matching item in MyBillBook
-        mb_match = find_matching_mybillbook_item(category, raw_name, cost_price, selling_price, mybillbook_items)
+        key = code_key(category, raw_name, cost_price, row[4])
 
         if mb_match:
             # MATCH FOUND - Use existing MyBillBook item
-            row[1] = mb_match['name']  # Use existing MyBillBook name
-            barcode = generate_barcode(cost_price)  # Generate barcode for column H (for reference)
+            name = mb_match['name']  # Use existing MyBillBook name
+            barcode = allocator.barcode(cost_price, key)  # Generate barcode for column H (for reference)
             already_present = "Yes"
             inventory_barcode = mb_match['sku_code']  # Use MyBillBook SKU as actual barcode
             matched_count += 1
@@ -218,80 +475,77 @@ def consolidate_inventory(sheets_manager):
         else:
             # NO MATCH - Generate new name and barcode
             original_name = raw_name.strip() if raw_name else ""
-            if original_name:
-                row[1] = generate_name_with_existing(category, original_name)
-            else:
-                row[1] = generate_name(category)
+            name = allocator.name(category, original_name, key)
 
-            barcode = generate_barcode(cost_price)
+            barcode = allocator.barcode(cost_price, key)
             already_present = "No"
             inventory_barcode = barcode  # Use generated barcode
             new_count += 1
 
-        barcodes.append(barcode)
-        already_present_flags.append(already_present)
-        inventory_item_barcodes.append(inventory_barcode)
-
-        # Keep only 5 columns: Type, Name, Cost, Qty, Sell
-        output_rows.append(row[:5])
+        cost = plain_number(cost_price)
+        quantity = row[3]
+        selling = plain_number(row[4])
+        # Totals are left blank for prices that aren't numbers
+        total_cost = round(cost * quantity, 2) if isinstance(cost, (int, float)) else ""
+        total_selling = round(quantity * selling, 2) if isinstance(selling, (int, float)) else ""
+        output.append([
+            category,                                # Column A: Type
+            name,                                    # Column B: Name
+            cost,                                    # Column C: Per Item CP
+            quantity,                                # Column D: Quantity
+            selling,                                 # Column E: Per Item SP
+            total_cost,                              # Column F: Cost Price * Quantity
+            total_selling,                           # Column G: Quantity * Selling Price
+            barcode,                                 # Column H: Barcode (generated)
+            already_present,                         # Column I: Already Present (Yes/No)
+            inventory_barcode,                       # Column J: Inventory Item Barcode (actual barcode to use)
+        ])
 
     print(f"  Matched with MyBillBook: {matched_count} items")
     print(f"  New items: {new_count} items")
+    if allocator.collisions:
+        print(f"  Redrew {allocator.collisions} generated names/barcodes that were already taken")
+
+    return output
+
+
+def with_total_formulas(inventory):
+    """
+    Inventory table as written to the sheet: columns F-G become formulas
+
+    Keeps the totals live when quantities or prices are edited in the sheet.
+    The input rows are not modified.
+    """
+    output = [list(inventory[0])]
+    for sheet_row, row in enumerate(inventory[1:], start=2):
+        output.append(row[:5] + [
+            f"=C{sheet_row}*D{sheet_row}",  # Column F: Cost Price * Quantity
+            f"=D{sheet_row}*E{sheet_row}",  # Column G: Quantity * Selling Price
+        ] + row[7:])
+    return output
+
+
+def consolidate_inventory(sheets_manager):
+    """
+    Main function to consolidate inventory from RAW sheet
+
+    Reads the MyBillBook inventory and Inventory RAW tabs, builds the
+    consolidated table (see build_inventory) and writes it to the
+    Inventory sheet with 2 new columns (I, J)
+    """
+    print("Starting inventory consolidation...")
+
+    # Read MyBillBook inventory and RAW sheet in one round trip
+    sheet_data = sheets_manager.read_sheets([SHEET_MYBILLBOOK_CURRENT, SHEET_RAW])
+
+    inventory = build_inventory(sheet_data)
+    if inventory is None:
+        return
+
+    # Replace Inventory sheet contents and formatting in one call
+    sheets_manager.replace_sheet(SHEET_INVENTORY, with_total_formulas(inventory), formats=INVENTORY_FORMATS)
 
-    # Combine headers and rows
-    output = [output_headers] + output_rows
-
-    # Clear and write to Inventory sheet
-    sheets_manager.clear_sheet(SHEET_INVENTORY)
-    sheets_manager.write_sheet(SHEET_INVENTORY, output)
-
-    # Add formulas and data columns
-    if len(output_rows) > 0:
-        num_rows = len(output_rows)
-
-        # Column F: =C*D (Cost Price * Quantity)
-        formulas_f = []
-        for i in range(2, num_rows + 2):
-            formulas_f.append([f"=C{i}*D{i}"])
-        sheets_manager.write_formulas(SHEET_INVENTORY, formulas_f, 'F2')
-
-        # Column G: =D*E (Quantity * Selling Price)
-        formulas_g = []
-        for i in range(2, num_rows + 2):
-            formulas_g.append([f"=D{i}*E{i}"])
-        sheets_manager.write_formulas(SHEET_INVENTORY, formulas_g, 'G2')
-
-        # Column H: Barcodes (generated)
-        barcode_data = [[barcode] for barcode in barcodes]
-        sheets_manager.write_sheet(SHEET_INVENTORY, barcode_data, 'H2')
-
-        # Column I: Already Present (Yes/No)
-        already_present_data = [[flag] for flag in already_present_flags]
-        sheets_manager.write_sheet(SHEET_INVENTORY, already_present_data, 'I2')
-
-        # Column J: Inventory Item Barcode (actual barcode to use)
-        inventory_barcode_data = [[barcode] for barcode in inventory_item_barcodes]
-        sheets_manager.write_sheet(SHEET_INVENTORY, inventory_barcode_data, 'J2')
-
-    # Apply column formatting
-    if len(output_rows) > 0:
-        last_row = len(output_rows) + 1
-
-        # Text columns
-        sheets_manager.format_as_text(SHEET_INVENTORY, f"A2:A{last_row}")  # Type
-        sheets_manager.format_as_text(SHEET_INVENTORY, f"B2:B{last_row}")  # Name
-        sheets_manager.format_as_text(SHEET_INVENTORY, f"H2:H{last_row}")  # Barcode (generated)
-        sheets_manager.format_as_text(SHEET_INVENTORY, f"I2:I{last_row}")  # Already Present
-        sheets_manager.format_as_text(SHEET_INVENTORY, f"J2:J{last_row}")  # Inventory Item Barcode
-
-        # Numeric columns
-        sheets_manager.format_as_number(SHEET_INVENTORY, f"C2:C{last_row}", decimal_places=2)  # Per Item CP
-        sheets_manager.format_as_number(SHEET_INVENTORY, f"D2:D{last_row}", decimal_places=0)  # Quantity
-        sheets_manager.format_as_number(SHEET_INVENTORY, f"E2:E{last_row}", decimal_places=2)  # Per Item SP
-        sheets_manager.format_as_number(SHEET_INVENTORY, f"F2:F{last_row}", decimal_places=2)  # Total CP
-        sheets_manager.format_as_number(SHEET_INVENTORY, f"G2:G{last_row}", decimal_places=2)  # Total SP
-
-    print(f"[OK] Inventory consolidated successfully! {len(output_rows)} items processed")
+    print(f"[OK] Inventory consolidated successfully! {len(inventory) - 1} items processed")
 
     # Export to CSV if user wants
     print("\n" + "="*60)
@@ -1,15 +1,66 @@
+import pandas as pd
 from config import SHEET_INVENTORY, SHEET_WEPRINT
 from utils.csv_exporter import export_sheet_data
+from utils.frames import parse_number, to_int
 
 
-def safe_float(value):
-    """Safely convert a value to float, handling commas and empty values"""
-    if not value:
-        return 0.0
-    if isinstance(value, (int, float)):
-        return float(value)
-    # Remove commas from string values like "6,000"
-    return float(str(value).replace(',', ''))
+WEPRINT_HEADERS = ["Product", "Barcode", "Price"]
+
+# Barcode column (B) is formatted as plain text, Price (C) with 2 decimals
+WEPRINT_FORMATS = {"B": "text", "C": ("number", 2)}
+
+
+def label_price(value):
+    """
+    Price as printed on a label: "1,199.00", as the Inventory tab shows it
+
+    Prices that aren't numbers are returned unchanged.
+    """
+    number = parse_number(value, default=None)
+    return f"{number:,.2f}" if number is not None else value
+
+
+def build_weprint(inventory_rows):
+    """
+    Build the WePrint label table from consolidated inventory rows
+
+    Creates rows: Product, Barcode, Price, with each row repeated by its
+    quantity (one per label). "Charms 40" bulk items are skipped. Prices are
+    formatted as on the Inventory tab ("1,199.00") whether the rows were
+    read from the sheet or passed in as numbers.
+
+    Args:
+        inventory_rows: Inventory rows without the header (read from the sheet
+            or straight from build_inventory)
+
+    Returns:
+        (rows, skipped_items): label rows with the header row first, and the
+        number of inventory items skipped
+    """
+    output = [list(WEPRINT_HEADERS)]
+
+    # Pad to 10 columns (A-J) without touching the caller's rows
+    inventory = pd.DataFrame(list(inventory_rows), dtype=object).reindex(columns=range(10)).fillna("")
+
+    # Column D - Quantity, parsed for the whole column (handles commas like "6,000")
+    quantities = to_int(inventory[3]).fillna(0).astype("int64").tolist()
+
+    skipped_items = 0
+    for row, quantity in zip(inventory.values.tolist(), quantities):
+        name = str(row[1])      # Column B - Name
+        barcode = row[9]        # Column J - Inventory Item Barcode (index 9) - ACTUAL barcode to use
+        price = label_price(row[4])  # Column E - Selling Price
+
+        # Skip items where name starts with "Charms 40" (bulk items, don't need individual labels)
+        if name.startswith("Charms 40"):
+            skipped_items += 1
+            print(f"  SKIPPED: {name} (Charms 40 - bulk item, quantity: {quantity})")
+            continue
+
+        # Add quantity number of rows (for label printing)
+        output.extend([name, barcode, price] for _ in range(quantity))
+
+    return output, skipped_items
 
 
 def export_to_weprint(sheets_manager):
@@ -34,43 +85,12 @@ def export_to_weprint(sheets_manager):
 
     print(f"Processing {len(rows)} inventory items...")
 
-    # Headers
-    headers = ["Product", "Barcode", "Price"]
-    output = [headers]
-
-    # Process each inventory row
-    total_labels = 0
-    skipped_items = 0
-    for row in rows:
-        # Ensure row has enough columns (now 10 columns: A-J)
-        while len(row) < 10:
-            row.append("")
-
-        name = row[1]           # Column B - Name
-        barcode = row[9]        # Column J - Inventory Item Barcode (index 9) - ACTUAL barcode to use
-        price = row[4]          # Column E - Selling Price
-        quantity = int(safe_float(row[3]))  # Column D - Quantity (handles commas like "6,000")
-
-        # Skip items where name starts with "Charms 40" (bulk items, don't need individual labels)
-        if name.startswith("Charms 40"):
-            skipped_items += 1
-            print(f"  SKIPPED: {name} (Charms 40 - bulk item, quantity: {quantity})")
-            continue
-
-        # Add quantity number of rows (for label printing)
-        for _ in range(quantity):
-            output.append([name, barcode, price])
-            total_labels += 1
+    output, skipped_items = build_weprint(rows)
 
     # Write to WePrint sheet
-    sheets_manager.clear_sheet(SHEET_WEPRINT)
-    sheets_manager.write_sheet(SHEET_WEPRINT, output)
-
-    # Format Barcode column (B) as plain text
-    if len(output) > 1:
-        sheets_manager.format_as_text(SHEET_WEPRINT, f"B2:B{len(output)}")
+    sheets_manager.replace_sheet(SHEET_WEPRINT, output, formats=WEPRINT_FORMATS)
 
-    print(f"[OK] WePrint data exported successfully! {total_labels} labels generated")
+    print(f"[OK] WePrint data exported successfully! {len(output) - 1} labels generated")
     if skipped_items > 0:
         print(f"     {skipped_items} items skipped (Charms 40 bulk items)")
 
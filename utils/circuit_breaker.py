@@ -0,0 +1,130 @@
+"""
+Failure Handling
+Thread-safe circuit breaker and retry budget, so a struggling API is given
+room to recover instead of being hit with every call and every retry
+"""
+
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a service after `failure_threshold` failures in a row
+
+    While open, allow() returns False so callers fail at once instead of
+    waiting out their timeouts. After `reset_seconds` the breaker goes
+    half-open and lets a single probe call through: success closes it
+    again, failure re-opens it for another `reset_seconds`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=5, reset_seconds=60.0):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.times_opened = 0
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state
+
+    @property
+    def is_open(self):
+        """True while calls are being failed fast (open, or half-open with a probe in flight)"""
+        with self._lock:
+            if self._state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.reset_seconds
+            return self._state == self.HALF_OPEN and self._probing
+
+    def allow(self):
+        """
+        Whether a call may go ahead now
+
+        Returns:
+            True if the call should be made (in half-open state, only the
+            one probe call gets True)
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        """The service answered; close the breaker if it was probing"""
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self):
+        """
+        The service failed to answer (timeout, connection error, 5xx)
+
+        Returns:
+            True if this failure opened the breaker
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self.times_opened += 1
+                return True
+            return False
+
+
+class RetryBudget:
+    """
+    Caps the retries for a whole run instead of per call
+
+    Retries are allowed up to `minimum` plus `ratio` of the requests made
+    so far, so a healthy run always has room for the odd retry, but a
+    failing one can't multiply its traffic by the per-call retry count.
+    """
+
+    def __init__(self, ratio=0.1, minimum=20):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self):
+        """
+        Take one retry from the budget
+
+        Returns:
+            True if the retry may go ahead, False if the budget is used up
+        """
+        with self._lock:
+            if self.retries < self.minimum + self.ratio * self.requests:
+                self.retries += 1
+                return True
+            self.denied += 1
+            return False
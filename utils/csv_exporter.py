@@ -36,12 +36,13 @@ def create_export_folders():
     print(f"[OK] Export folders created at: {base_path.absolute()}")
 
 
-def generate_filename(export_type):
+def generate_filename(export_type, extension="csv"):
     """
     Generate a timestamped filename for CSV export
 
     Args:
         export_type: One of the keys in EXPORT_FOLDERS
+        extension: File extension (default: csv)
 
     Returns:
         Full file path with timestamp
@@ -50,7 +51,7 @@ def generate_filename(export_type):
         raise ValueError(f"Invalid export type: {export_type}. Must be one of {list(EXPORT_FOLDERS.keys())}")
 
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{export_type}_{timestamp}.csv"
+    filename = f"{export_type}_{timestamp}.{extension}"
 
     folder = EXPORT_FOLDERS[export_type]
     filepath = Path(EXPORT_BASE_DIR) / folder / filename
@@ -107,6 +108,48 @@ def save_to_csv(data, export_type, prompt_user=True):
         return None
 
 
+def save_to_parquet(data, export_type):
+    """
+    Save data to a timestamped Parquet file (no prompt)
+
+    Numeric columns keep their types; every other column is stored as text.
+    Needs pyarrow (optional dependency, see requirements.txt).
+
+    Args:
+        data: List of lists (rows) to save, header row first
+        export_type: One of the keys in EXPORT_FOLDERS
+
+    Returns:
+        str: Path to saved file, or None if failed
+    """
+    if not data:
+        print(f"[WARN] No data to export for {export_type}")
+        return None
+
+    # pandas is only needed for Parquet exports
+    from utils.frames import to_frame
+
+    create_export_folders()
+    filepath = generate_filename(export_type, extension="parquet")
+
+    try:
+        df = to_frame(data).infer_objects()
+        for column in df.columns:
+            if df[column].dtype == object:
+                df[column] = df[column].astype("string")
+        df.to_parquet(filepath, index=False)
+
+        print(f"   [OK] Saved: {filepath}")
+        return str(filepath)
+
+    except ImportError:
+        print("   [ERROR] Parquet export needs pyarrow: pip install pyarrow")
+        return None
+    except Exception as e:
+        print(f"   [ERROR] Error saving Parquet: {e}")
+        return None
+
+
 def export_sheet_data(sheets_manager, sheet_name, export_type, prompt_user=True):
     """
     Export Google Sheets data directly to CSV
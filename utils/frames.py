@@ -0,0 +1,171 @@
+"""
+Typed DataFrames from Google Sheets rows
+Converts whole columns at once (comma stripping, numbers, dates, Yes/No
+booleans) instead of parsing cell by cell
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Date formats seen in our sheets, tried in order
+DATE_FORMATS = ["%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d"]
+
+# Google Sheets serial dates count days from this epoch
+SHEETS_EPOCH = "1899-12-30"
+
+TRUE_VALUES = ("yes", "true", "1")
+
+
+def to_numeric(series):
+    """
+    Column -> float64, stripping thousands separators ("1,199" -> 1199.0)
+
+    Blanks, text that isn't a number and infinities become NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = series.astype("float64")
+    else:
+        cleaned = series.astype("string").str.replace(",", "", regex=False).str.strip()
+        numbers = pd.to_numeric(cleaned, errors="coerce").astype("float64")
+    return numbers.replace([np.inf, -np.inf], np.nan)
+
+
+def to_int(series):
+    """Column -> nullable Int64 (fractional values are truncated toward zero, like int(float(x)))"""
+    numbers = to_numeric(series)
+    return np.trunc(numbers).astype("Int64")
+
+
+def parse_number(value, default=0.0):
+    """
+    One cell -> float, by the same rules as to_numeric
+
+    For the few places that handle a single value rather than a column.
+
+    Args:
+        value: Cell value ("1,199", 12.5, "", ...)
+        default: Returned for blanks, text that isn't a number and NaN/infinity
+
+    Returns:
+        float (or default)
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = float(value)
+    else:
+        text = str(value).replace(",", "").strip()
+        # float() also takes "1_000", which to_numeric doesn't
+        if not text or "_" in text:
+            return default
+        try:
+            number = float(text)
+        except ValueError:
+            return default
+    return number if math.isfinite(number) else default
+
+
+def to_date(series):
+    """
+    Column -> datetime64
+
+    Handles the text formats in DATE_FORMATS as well as Sheets serial
+    numbers (what UNFORMATTED_VALUE returns for date-formatted cells).
+    Unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+
+    result = pd.Series(pd.NaT, index=series.index, dtype="datetime64[ns]")
+
+    # Serial numbers only come through as real numbers, never as text
+    is_serial = series.map(type).isin((int, float))
+    if is_serial.any():
+        serials = pd.to_numeric(series.where(is_serial), errors="coerce")
+        result = result.fillna(pd.to_datetime(serials, unit="D", origin=SHEETS_EPOCH, errors="coerce"))
+
+    text = series.where(~is_serial).astype("string").str.strip()
+    for fmt in DATE_FORMATS:
+        if not result.isna().any():
+            break
+        result = result.fillna(pd.to_datetime(text, format=fmt, errors="coerce"))
+
+    return result
+
+
+def to_bool(series):
+    """Column -> bool ("Yes"/"true"/"1" are True, anything else False)"""
+    return series.astype("string").str.strip().str.lower().isin(TRUE_VALUES).astype(bool)
+
+
+def to_text(series):
+    """Column -> string with blanks as ""."""
+    return series.astype("string").fillna("")
+
+
+CONVERTERS = {
+    "float": to_numeric,
+    "int": to_int,
+    "date": to_date,
+    "bool": to_bool,
+    "str": to_text,
+}
+
+
+def to_frame(rows, schema=None):
+    """
+    Build a typed DataFrame from sheet rows
+
+    Args:
+        rows: List of lists with the header row first (as returned by read_sheet)
+        schema: Optional dict of column name -> 'float', 'int', 'date', 'bool' or 'str'.
+            Columns not in the schema are left as read.
+
+    Returns:
+        DataFrame (empty, with the header columns, if there are no data rows)
+    """
+    if not rows:
+        return pd.DataFrame()
+
+    headers = [str(h) for h in rows[0]]
+    width = len(headers)
+
+    # Sheets drops trailing blank cells, so pad short rows to the header width
+    data = [list(row[:width]) + [""] * (width - len(row)) for row in rows[1:]]
+    df = pd.DataFrame(data, columns=headers, dtype=object)
+
+    for column, column_type in (schema or {}).items():
+        if column not in df.columns:
+            continue
+        if column_type not in CONVERTERS:
+            raise ValueError(f"Unknown column type '{column_type}' for column '{column}'")
+        df[column] = CONVERTERS[column_type](df[column])
+
+    return df
+
+
+def frame_records(df, columns):
+    """
+    Rows of selected columns as tuples of plain Python values
+
+    Blank strings, NaN and NaT become None and dates become datetime.date,
+    which is what database drivers expect.
+
+    Args:
+        df: DataFrame from to_frame()
+        columns: Column names in the order wanted
+
+    Returns:
+        List of tuples
+    """
+    selected = df.reindex(columns=columns).copy()
+
+    for column in columns:
+        series = selected[column]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            selected[column] = series.dt.date
+
+    selected = selected.astype(object)
+    selected = selected.where(selected.notna(), None).replace({"": None})
+    return list(selected.itertuples(index=False, name=None))
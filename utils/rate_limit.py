@@ -0,0 +1,71 @@
+"""
+Rate Limiting
+Thread-safe token bucket used to keep API calls inside provider quotas
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Classic token bucket: holds up to `capacity` tokens, refilled at
+    `rate` tokens per `per` seconds. Each request takes one token and
+    waits when the bucket is empty.
+    """
+
+    def __init__(self, rate, per=60.0, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.fill_rate = rate / per  # tokens per second
+        self.capacity = capacity or rate
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.fill_rate)
+        self._updated = now
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens, sleeping until they're available
+
+        Returns:
+            Seconds spent waiting (0.0 if the request went straight through)
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.fill_rate
+
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens only if they're available now, without sleeping
+
+        For callers that can't block (e.g. asyncio code, which awaits the
+        returned delay and tries again).
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds until they will be
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.fill_rate
+
+    def drain(self):
+        """Empty the bucket, e.g. after the server says we're over quota"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
@@ -0,0 +1,101 @@
+"""
+Local Sheet Cache
+Persistent on-disk copy of Google Sheets tabs, tagged with the spreadsheet
+revision they were read at so unchanged tabs can be served without a
+network round trip
+"""
+
+import hashlib
+import os
+import pickle
+import zlib
+from pathlib import Path
+
+
+# File header, bumped if the on-disk layout ever changes
+CACHE_MAGIC = b"SWSC1"
+
+
+class SheetCache:
+    """Stores tab rows as compressed pickles under <cache_dir>/<spreadsheet_id>/"""
+
+    def __init__(self, cache_dir, spreadsheet_id):
+        self.base_path = Path(cache_dir) / spreadsheet_id
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(sheet_name):
+        return hashlib.sha1(sheet_name.encode("utf-8")).hexdigest()
+
+    def _path(self, sheet_name, render_option):
+        return self.base_path / f"{self._key(sheet_name)}_{render_option}.bin"
+
+    def get(self, sheet_name, version, render_option="FORMATTED_VALUE"):
+        """
+        Return cached rows for a tab if they were read at the given revision
+
+        Args:
+            sheet_name: Name of the sheet tab
+            version: Current spreadsheet revision (from the freshness probe)
+            render_option: Value render option the rows were read with
+
+        Returns:
+            List of lists, or None if there's no fresh copy
+        """
+        path = self._path(sheet_name, render_option)
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(CACHE_MAGIC)) != CACHE_MAGIC:
+                    raise ValueError("bad cache header")
+                cached_version, rows = pickle.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception:
+            # Corrupt or unreadable entry - drop it and re-fetch
+            self.misses += 1
+            self._remove(path)
+            return None
+
+        if cached_version != version:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return rows
+
+    def put(self, sheet_name, version, rows, render_option="FORMATTED_VALUE"):
+        """Store rows for a tab, tagged with the revision they were read at"""
+        path = self._path(sheet_name, render_option)
+        try:
+            self.base_path.mkdir(parents=True, exist_ok=True)
+            payload = zlib.compress(pickle.dumps((version, rows), protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+            # Write to a temp file and rename so readers never see half a file
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(CACHE_MAGIC)
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[WARN] Could not write sheet cache for '{sheet_name}': {e}")
+
+    def invalidate(self, sheet_name):
+        """Drop every cached copy of one tab (all render options)"""
+        if self.base_path.exists():
+            for path in self.base_path.glob(f"{self._key(sheet_name)}_*.bin"):
+                self._remove(path)
+
+    def clear(self):
+        """Delete every cached tab for this spreadsheet"""
+        if self.base_path.exists():
+            for path in self.base_path.glob("*.bin"):
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
@@ -1,51 +1,242 @@
 import os.path
-from google.auth.transport.requests import Request
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE, SPREADSHEET_ID
+from config import (
+    SCOPES,
+    CREDENTIALS_FILE,
+    TOKEN_FILE,
+    SPREADSHEET_ID,
+    WRITE_CHUNK_ROWS,
+    WRITE_CHUNK_BYTES,
+    WRITE_MAX_WORKERS,
+    SHEETS_CACHE_ENABLED,
+    SHEETS_CACHE_DIR,
+    SHEETS_CACHE_PROBE_SECONDS,
+    SHEETS_READ_REQUESTS_PER_MINUTE,
+    SHEETS_WRITE_REQUESTS_PER_MINUTE,
+    SHEETS_REQUEST_BURST,
+    SHEETS_MAX_RETRIES,
+    SHEETS_RETRY_MAX_DELAY,
+    UPSERT_MAX_CHANGE_RATIO,
+)
+from utils.sheet_cache import SheetCache
+from utils.rate_limit import TokenBucket
+
+# Status codes worth retrying: over quota, or a transient server-side failure
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Text written as a number by updateCells: optional sign, digits (optionally
+# in comma groups of three) and optional decimals, e.g. "1,199", "-12.50", ".5"
+NUMBER_PATTERN = re.compile(r'^[+-]?(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)$')
 
 
 class SheetsManager:
+    # Quota budgets are per user, so every manager in the process shares them
+    _quota_buckets = {
+        'read': TokenBucket(SHEETS_READ_REQUESTS_PER_MINUTE, per=60, capacity=SHEETS_REQUEST_BURST),
+        'write': TokenBucket(SHEETS_WRITE_REQUESTS_PER_MINUTE, per=60, capacity=SHEETS_REQUEST_BURST),
+    }
+
     def __init__(self):
         self.creds = None
-        self.service = None
         self.spreadsheet_id = SPREADSHEET_ID
+
+        # API clients and their shared transport are created on first use,
+        # so start-up only loads the saved token (see service / _authorized_http)
+        self._service = None
+        self._http = None
+
+        # Sheet metadata cache: title -> {'sheetId', 'rowCount', 'columnCount'}
+        # Filled once on first use, so existence checks and sheetId lookups
+        # don't each cost a full spreadsheets().get() round trip
+        self._sheet_metadata = None
+        self.metadata_cache_hits = 0
+        self.metadata_cache_misses = 0
+
+        # Chunked write progress: (sheet_name, start_cell) -> {'digest', 'done'}
+        # Lets a failed large write resume from the chunks that already landed
+        self._write_progress = {}
+        self._thread_local = threading.local()
+
+        # On-disk copy of whole tabs, reused while the spreadsheet revision
+        # (checked cheaply through Drive file metadata) hasn't changed
+        self._read_cache = SheetCache(SHEETS_CACHE_DIR, self.spreadsheet_id) if SHEETS_CACHE_ENABLED else None
+        self._drive_service = None
+        self._spreadsheet_version = None
+        self._version_checked_at = 0.0
+
+        # API call counters per quota ('read' / 'write'), see get_request_stats()
+        self._request_stats = {kind: {'sent': 0, 'throttled': 0, 'retried': 0} for kind in self._quota_buckets}
+        self._stats_lock = threading.Lock()
+
         self._authenticate()
 
     def _authenticate(self):
         """Authenticate with Google Sheets API using OAuth 2.0"""
         if os.path.exists(TOKEN_FILE):
-            self.creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+            self.creds = Credentials.from_authorized_user_file(TOKEN_FILE)
+
+            # Tokens issued before a scope was added need to be re-authorized
+            if not self.creds.has_scopes(SCOPES):
+                print("[INFO] Additional Google permissions needed. Please re-authorize in the browser.")
+                self.creds = None
+
+        # An expired token with a refresh token is refreshed on first use
+        # instead (see _authorized_http), so start-up needs no network call
+        if not self.creds or not (self.creds.valid or self.creds.refresh_token):
+            from google_auth_oauthlib.flow import InstalledAppFlow
+
+            flow = InstalledAppFlow.from_client_secrets_file(
+                CREDENTIALS_FILE, SCOPES)
+            self.creds = flow.run_local_server(port=0)
+            self._save_token()
+
+    def _save_token(self):
+        with open(TOKEN_FILE, 'w') as token:
+            token.write(self.creds.to_json())
+
+    def _authorized_http(self):
+        """
+        Authorized HTTP transport shared by the Sheets and Drive clients
+
+        One httplib2 connection pool keeps the HTTPS connection alive across
+        calls. The access token is refreshed here (and saved) if it has
+        expired, rather than on every start-up.
+        """
+        if self._http is None:
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.http import build_http
+
+            if not self.creds.valid and self.creds.refresh_token:
+                from google.auth.transport.requests import Request
 
-        if not self.creds or not self.creds.valid:
-            if self.creds and self.creds.expired and self.creds.refresh_token:
                 self.creds.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    CREDENTIALS_FILE, SCOPES)
-                self.creds = flow.run_local_server(port=0)
+                self._save_token()
+
+            # build_http() sets the client library's default socket timeout
+            self._http = AuthorizedHttp(self.creds, http=build_http())
+        return self._http
+
+    def _build_client(self, api, version):
+        """Build an API client from the discovery document bundled with googleapiclient"""
+        from googleapiclient.discovery import build
+
+        return build(api, version, http=self._authorized_http(),
+                     static_discovery=True, cache_discovery=False)
+
+    @property
+    def service(self):
+        """Sheets API client, built on first use"""
+        if self._service is None:
+            self._service = self._build_client('sheets', 'v4')
+        return self._service
+
+    @service.setter
+    def service(self, value):
+        self._service = value
+
+    def _execute(self, request, kind, http=None):
+        """
+        Execute a Sheets API request within the shared quota budget
+
+        Waits for a token from the read or write bucket before sending, and
+        retries 429 / 5xx responses with jittered exponential backoff
+        (honouring Retry-After when the server sends it). Other errors are
+        raised to the caller as before.
+
+        Args:
+            request: googleapiclient HttpRequest (not yet executed)
+            kind: 'read' or 'write' - which quota the call counts against
+            http: Optional transport to execute on (for worker threads)
+
+        Returns:
+            The API response
+        """
+        bucket = self._quota_buckets[kind]
+        stats = self._request_stats[kind]
+
+        for attempt in range(SHEETS_MAX_RETRIES + 1):
+            waited = bucket.acquire()
+            with self._stats_lock:
+                stats['sent'] += 1
+                if waited:
+                    stats['throttled'] += 1
+
+            try:
+                return request.execute(http=http) if http else request.execute()
+
+            except HttpError as error:
+                status = error.resp.status if error.resp is not None else None
+                if status not in RETRYABLE_STATUS_CODES or attempt == SHEETS_MAX_RETRIES:
+                    raise
+
+                if status == 429:
+                    # Over quota: stop everyone else from piling on too
+                    bucket.drain()
+
+                retry_after = error.resp.get('retry-after')
+                if retry_after and str(retry_after).isdigit():
+                    delay = int(retry_after)
+                else:
+                    # Full jitter: random wait up to the exponential cap
+                    delay = random.uniform(0, min(SHEETS_RETRY_MAX_DELAY, 2 ** attempt))
+
+                with self._stats_lock:
+                    stats['retried'] += 1
+                print(f"[WARN] Sheets API returned {status}, retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{SHEETS_MAX_RETRIES})")
+                time.sleep(delay)
 
-            with open(TOKEN_FILE, 'w') as token:
-                token.write(self.creds.to_json())
+    def get_request_stats(self):
+        """
+        Report API calls made by this manager
 
-        self.service = build('sheets', 'v4', credentials=self.creds)
+        Returns:
+            Dict of 'read' / 'write' -> {'sent', 'throttled', 'retried'} where
+            throttled counts calls that waited for quota and retried counts
+            429 / 5xx responses that were sent again
+        """
+        with self._stats_lock:
+            return {kind: dict(counts) for kind, counts in self._request_stats.items()}
 
-    def read_sheet(self, sheet_name, range_notation=None):
+    def read_sheet(self, sheet_name, range_notation=None, value_render_option='FORMATTED_VALUE', use_cache=True):
         """
         Read data from a Google Sheet with retry logic for transient errors
 
+        Whole-tab reads go through the local sheet cache (see SHEETS_CACHE_*
+        in config.py) and skip the download when nothing changed.
+
         Args:
             sheet_name: Name of the sheet tab
             range_notation: Optional range (e.g., 'A1:D10'). If None, reads all data.
+            value_render_option: 'FORMATTED_VALUE' (as displayed) or 'UNFORMATTED_VALUE'
+                (raw numbers, dates as serial numbers)
+            use_cache: Set to False to always fetch from the API (the Drive
+                revision can lag behind edits made in the browser)
 
         Returns:
             List of lists containing the sheet data
         """
-        import time
         import http.client
 
+        # Whole-tab reads are served from the local cache when the
+        # spreadsheet hasn't changed since they were stored
+        version = None
+        if not range_notation and use_cache:
+            version = self._get_spreadsheet_version()
+            if version is not None:
+                cached = self._read_cache.get(sheet_name, version, value_render_option)
+                if cached is not None:
+                    return cached
+
         max_retries = 3
         retry_delay = 1  # seconds
 
@@ -56,12 +247,16 @@ class SheetsManager:
                 else:
                     range_name = sheet_name
 
-                result = self.service.spreadsheets().values().get(
+                result = self._execute(self.service.spreadsheets().values().get(
                     spreadsheetId=self.spreadsheet_id,
-                    range=range_name
-                ).execute()
+                    range=range_name,
+                    valueRenderOption=value_render_option
+                ), 'read')
 
-                return result.get('values', [])
+                values = result.get('values', [])
+                if version is not None:
+                    self._read_cache.put(sheet_name, version, values, value_render_option)
+                return values
 
             except (http.client.IncompleteRead, ConnectionError, TimeoutError) as e:
                 # Transient network errors - retry
@@ -76,15 +271,199 @@ class SheetsManager:
                     return []
 
             except HttpError as error:
-                print(f"An error occurred: {error}")
+                self._handle_http_error(error)
                 return []
 
         return []
 
-    def write_sheet(self, sheet_name, data, start_cell='A1', value_input_option='USER_ENTERED'):
+    def read_sheets(self, sheet_names, value_render_option='FORMATTED_VALUE'):
+        """
+        Read several whole sheets in one round trip (values().batchGet)
+
+        Args:
+            sheet_names: List of sheet tab names
+            value_render_option: 'FORMATTED_VALUE' or 'UNFORMATTED_VALUE' (see read_sheet)
+
+        Returns:
+            Dict of sheet name -> list of lists (empty list for a sheet that couldn't be read)
+        """
+        import http.client
+
+        sheet_names = list(dict.fromkeys(sheet_names))  # Drop duplicates, keep order
+        if not sheet_names:
+            return {}
+
+        # Serve unchanged tabs from the local cache, fetch only the rest
+        cached_data = {}
+        version = self._get_spreadsheet_version()
+        if version is not None:
+            for name in sheet_names:
+                cached = self._read_cache.get(name, version, value_render_option)
+                if cached is not None:
+                    cached_data[name] = cached
+
+        to_fetch = [name for name in sheet_names if name not in cached_data]
+        if not to_fetch:
+            return cached_data
+
+        max_retries = 3
+        retry_delay = 1  # seconds
+
+        for attempt in range(max_retries):
+            try:
+                result = self._execute(self.service.spreadsheets().values().batchGet(
+                    spreadsheetId=self.spreadsheet_id,
+                    ranges=to_fetch,
+                    valueRenderOption=value_render_option
+                ), 'read')
+
+                # valueRanges come back in the same order as the requested ranges
+                fetched = {
+                    name: value_range.get('values', [])
+                    for name, value_range in zip(to_fetch, result.get('valueRanges', []))
+                }
+                if version is not None:
+                    for name, values in fetched.items():
+                        self._read_cache.put(name, version, values, value_render_option)
+
+                return {name: cached_data.get(name, fetched.get(name, [])) for name in sheet_names}
+
+            except (http.client.IncompleteRead, ConnectionError, TimeoutError) as e:
+                # Transient network errors - retry
+                if attempt < max_retries - 1:
+                    print(f"[WARN] Network error on attempt {attempt + 1}/{max_retries}: {type(e).__name__}")
+                    print(f"   Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # Exponential backoff
+                    continue
+                else:
+                    print(f"[ERROR] Failed to read sheets after {max_retries} attempts: {e}")
+                    return {name: cached_data.get(name, []) for name in sheet_names}
+
+            except HttpError as error:
+                # One bad range (e.g. a missing tab) fails the whole batch,
+                # so fall back to reading each sheet on its own
+                self._handle_http_error(error)
+                print("   Falling back to reading sheets one at a time...")
+                return {name: cached_data.get(name) or self.read_sheet(name, value_render_option=value_render_option)
+                        for name in sheet_names}
+
+        return {name: cached_data.get(name, []) for name in sheet_names}
+
+    def read_frame(self, sheet_name, schema=None, value_render_option='UNFORMATTED_VALUE'):
+        """
+        Read a whole sheet into a typed pandas DataFrame
+
+        Args:
+            sheet_name: Name of the sheet tab
+            schema: Optional dict of column name -> 'float', 'int', 'date', 'bool' or 'str'
+                (see utils/frames.py)
+            value_render_option: Defaults to UNFORMATTED_VALUE, so numbers arrive
+                as numbers and dates as serial numbers instead of display text
+
+        Returns:
+            DataFrame with the header row as columns (empty if the sheet is empty)
+        """
+        return self.read_frames({sheet_name: schema}, value_render_option)[sheet_name]
+
+    def read_frames(self, schemas, value_render_option='UNFORMATTED_VALUE'):
+        """
+        Read several sheets into typed DataFrames in one round trip (see read_sheets)
+
+        Args:
+            schemas: Dict of sheet name -> schema (as taken by read_frame, or None)
+            value_render_option: Defaults to UNFORMATTED_VALUE (see read_frame)
+
+        Returns:
+            Dict of sheet name -> DataFrame
+        """
+        # pandas is only needed by callers that want frames
+        from utils.frames import to_frame
+
+        data = self.read_sheets(list(schemas), value_render_option=value_render_option)
+        return {name: to_frame(data[name], schema) for name, schema in schemas.items()}
+
+    def _get_spreadsheet_version(self):
+        """
+        Cheap freshness probe for the sheet cache
+
+        Reads the spreadsheet's Drive revision (file metadata only, no
+        contents). One probe is reused for SHEETS_CACHE_PROBE_SECONDS unless
+        we write to the spreadsheet ourselves in the meantime.
+
+        Returns:
+            Revision string, or None if the cache can't be used right now
+        """
+        if self._read_cache is None:
+            return None
+
+        now = time.monotonic()
+        if self._spreadsheet_version is not None and now - self._version_checked_at < SHEETS_CACHE_PROBE_SECONDS:
+            return self._spreadsheet_version
+
+        try:
+            if self._drive_service is None:
+                self._drive_service = self._build_client('drive', 'v3')
+
+            # Counted and retried like any other read (quota, 429/5xx backoff)
+            metadata = self._execute(self._drive_service.files().get(
+                fileId=self.spreadsheet_id,
+                fields='version,modifiedTime'
+            ), 'read')
+
+        except HttpError as error:
+            status = error.resp.status if error.resp is not None else None
+            if status in RETRYABLE_STATUS_CODES:
+                # Still failing after the retries: skip the cache for this read only
+                print(f"[WARN] Revision check failed ({status}); reading from the API this time")
+                return None
+            # e.g. missing Drive permission - fall back to always reading from the API
+            print(f"[WARN] Sheet cache disabled, revision check failed: {error}")
+            self._read_cache = None
+            return None
+        except Exception:
+            return None
+
+        self._spreadsheet_version = metadata.get('version') or metadata.get('modifiedTime')
+        self._version_checked_at = now
+        return self._spreadsheet_version
+
+    def _mark_spreadsheet_changed(self, sheet_name=None):
+        """
+        Force a fresh revision check after we modify the spreadsheet
+
+        The written tab's cached copy is also dropped outright, since Drive
+        can take a moment to report the new revision after a Sheets write.
+        """
+        self._spreadsheet_version = None
+        if sheet_name and self._read_cache is not None:
+            self._read_cache.invalidate(sheet_name)
+
+    def get_read_cache_stats(self):
+        """
+        Report local sheet cache usage
+
+        Returns:
+            Dict with 'enabled', 'hits' and 'misses'
+        """
+        if self._read_cache is None:
+            return {'enabled': False, 'hits': 0, 'misses': 0}
+        return {
+            'enabled': True,
+            'hits': self._read_cache.hits,
+            'misses': self._read_cache.misses,
+        }
+
+    def write_sheet(self, sheet_name, data, start_cell='A1', value_input_option='USER_ENTERED',
+                    chunk_rows=None, chunk_bytes=None, max_workers=None):
         """
         Write data to a Google Sheet (creates sheet if it doesn't exist)
 
+        Large writes are split into chunks (by row count or JSON size) so no
+        single request exceeds the API payload limit. If a chunked write fails
+        partway, calling write_sheet again with the same data resumes from the
+        chunks that did not land instead of starting over.
+
         Args:
             sheet_name: Name of the sheet tab
             data: List of lists containing the data to write
@@ -92,32 +471,183 @@ class SheetsManager:
             value_input_option: How to interpret input values (default 'USER_ENTERED')
                 - 'USER_ENTERED': Parse values (numbers as numbers, formulas as formulas)
                 - 'RAW': Store exactly as provided (everything as strings)
+            chunk_rows: Max rows per request (default WRITE_CHUNK_ROWS)
+            chunk_bytes: Max JSON bytes per request (default WRITE_CHUNK_BYTES)
+            max_workers: Chunks uploaded in parallel (default WRITE_MAX_WORKERS)
         """
+        self._mark_spreadsheet_changed(sheet_name)
         try:
             # Create sheet if it doesn't exist
             if not self.sheet_exists(sheet_name):
                 self.create_sheet(sheet_name)
 
+            chunks, digest = self._split_chunks(
+                data, chunk_rows or WRITE_CHUNK_ROWS, chunk_bytes or WRITE_CHUNK_BYTES)
+
+            if len(chunks) > 1:
+                return self._write_chunks(
+                    sheet_name, chunks, digest, start_cell, value_input_option,
+                    max_workers or WRITE_MAX_WORKERS)
+
             range_name = f"{sheet_name}!{start_cell}"
 
             body = {
                 'values': data
             }
 
-            result = self.service.spreadsheets().values().update(
+            result = self._execute(self.service.spreadsheets().values().update(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name,
                 valueInputOption=value_input_option,
                 body=body
-            ).execute()
+            ), 'write')
+
+            self._note_written_range(sheet_name, result.get('updatedRange'))
 
             print(f"{result.get('updatedCells')} cells updated in {sheet_name}")
             return result
 
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            self._handle_http_error(error)
+            return None
+
+    @staticmethod
+    def _split_chunks(data, chunk_rows, chunk_bytes):
+        """
+        Split rows into chunks bounded by row count and approximate JSON size
+
+        Returns:
+            (chunks, digest) where chunks is a list of (row_offset, rows) and
+            digest identifies the data + chunk layout (used to resume writes)
+        """
+        chunks = []
+        digest = hashlib.sha1(f"{chunk_rows}|{chunk_bytes}".encode())
+        current, current_bytes, offset = [], 0, 0
+
+        for row in data:
+            encoded = json.dumps(row, default=str).encode()
+            digest.update(encoded)
+
+            if current and (len(current) >= chunk_rows or current_bytes + len(encoded) > chunk_bytes):
+                chunks.append((offset, current))
+                offset += len(current)
+                current, current_bytes = [], 0
+
+            current.append(row)
+            current_bytes += len(encoded)
+
+        if current:
+            chunks.append((offset, current))
+
+        return chunks, digest.hexdigest()
+
+    def _thread_http(self):
+        """
+        Authorized HTTP transport for the current thread
+
+        httplib2 connections are not thread-safe, so parallel chunk uploads
+        each execute on their own transport.
+        """
+        http = getattr(self._thread_local, 'http', None)
+        if http is None:
+            from google_auth_httplib2 import AuthorizedHttp
+            from googleapiclient.http import build_http
+
+            # build_http() sets the client library's default socket timeout
+            http = AuthorizedHttp(self.creds, http=build_http())
+            self._thread_local.http = http
+        return http
+
+    def _write_chunk(self, sheet_name, start_col, start_row, offset, rows, value_input_option, threaded):
+        """Upload one chunk with retries for transient network errors"""
+        import http.client
+
+        range_name = f"{sheet_name}!{start_col}{start_row + offset}"
+        max_retries = 3
+        retry_delay = 1  # seconds
+
+        for attempt in range(max_retries):
+            try:
+                request = self.service.spreadsheets().values().update(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=range_name,
+                    valueInputOption=value_input_option,
+                    body={'values': rows}
+                )
+                return self._execute(request, 'write', http=self._thread_http() if threaded else None)
+
+            except (http.client.IncompleteRead, ConnectionError, TimeoutError) as e:
+                if attempt == max_retries - 1:
+                    raise
+                print(f"[WARN] Network error writing {range_name} (attempt {attempt + 1}/{max_retries}): {type(e).__name__}")
+                time.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+
+    def _write_chunks(self, sheet_name, chunks, digest, start_cell, value_input_option, max_workers):
+        """
+        Write pre-split chunks, skipping any that landed in an earlier failed attempt
+
+        Returns:
+            Dict with total 'updatedCells' and 'chunks' written, or None if a chunk failed
+        """
+        match = re.match(r'([A-Z]+)(\d+)', start_cell)
+        start_col, start_row = match.group(1), int(match.group(2))
+
+        progress_key = (sheet_name, start_cell)
+        progress = self._write_progress.get(progress_key)
+        if not progress or progress['digest'] != digest:
+            progress = {'digest': digest, 'done': set()}
+            self._write_progress[progress_key] = progress
+        elif progress['done']:
+            print(f"Resuming write to {sheet_name}: {len(progress['done'])}/{len(chunks)} chunks already written")
+
+        pending = [(offset, rows) for offset, rows in chunks if offset not in progress['done']]
+        threaded = max_workers > 1
+        updated_cells = 0
+        failed = []
+
+        def write(chunk):
+            offset, rows = chunk
+            return offset, self._write_chunk(
+                sheet_name, start_col, start_row, offset, rows, value_input_option, threaded)
+
+        def record(offset, result):
+            nonlocal updated_cells
+            progress['done'].add(offset)
+            updated_cells += result.get('updatedCells') or 0
+            self._note_written_range(sheet_name, result.get('updatedRange'))
+
+        if threaded:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(write, chunk): chunk[0] for chunk in pending}
+                for future in as_completed(futures):
+                    try:
+                        record(*future.result())
+                    except Exception as error:
+                        failed.append((futures[future], error))
+        else:
+            for chunk in pending:
+                try:
+                    record(*write(chunk))
+                except Exception as error:
+                    failed.append((chunk[0], error))
+                    break  # Later chunks are retried on resume
+
+        if failed:
+            offset, error = failed[0]
+            if isinstance(error, HttpError):
+                self._handle_http_error(error)
+            else:
+                print(f"An error occurred: {error}")
+            print(f"[WARN] Write to {sheet_name} stopped at row {start_row + offset} "
+                  f"({len(progress['done'])}/{len(chunks)} chunks written). "
+                  f"Call write_sheet again with the same data to resume.")
             return None
 
+        del self._write_progress[progress_key]
+        print(f"{updated_cells} cells updated in {sheet_name} ({len(chunks)} chunks)")
+        return {'updatedCells': updated_cells, 'chunks': len(chunks)}
+
     def sheet_exists(self, sheet_name):
         """
         Check if a sheet exists in the spreadsheet
@@ -128,19 +658,96 @@ class SheetsManager:
         Returns:
             Boolean indicating if sheet exists
         """
+        return self._get_sheet_properties(sheet_name) is not None
+
+    def _load_sheet_metadata(self):
+        """Fetch sheet titles, IDs and grid sizes in one call and cache them"""
+        self.metadata_cache_misses += 1
+
+        sheet_metadata = self._execute(self.service.spreadsheets().get(
+            spreadsheetId=self.spreadsheet_id,
+            fields='sheets.properties(sheetId,title,gridProperties)'
+        ), 'read')
+
+        self._sheet_metadata = {}
+        for sheet in sheet_metadata.get('sheets', []):
+            self._cache_sheet_properties(sheet['properties'])
+
+    def _cache_sheet_properties(self, properties):
+        """Store one sheet's properties (as returned by the API) in the metadata cache"""
+        grid = properties.get('gridProperties', {})
+        self._sheet_metadata[properties['title']] = {
+            'sheetId': properties['sheetId'],
+            'rowCount': grid.get('rowCount', 0),
+            'columnCount': grid.get('columnCount', 0),
+        }
+
+    def _get_sheet_properties(self, sheet_name):
+        """
+        Look up cached properties for a sheet, loading metadata on first use
+
+        Args:
+            sheet_name: Name of the sheet tab
+
+        Returns:
+            Dict with 'sheetId', 'rowCount' and 'columnCount', or None if the sheet doesn't exist
+        """
         try:
-            sheet_metadata = self.service.spreadsheets().get(
-                spreadsheetId=self.spreadsheet_id
-            ).execute()
+            if self._sheet_metadata is None:
+                self._load_sheet_metadata()
+            else:
+                self.metadata_cache_hits += 1
 
-            for sheet in sheet_metadata.get('sheets', []):
-                if sheet['properties']['title'] == sheet_name:
-                    return True
-            return False
+            return self._sheet_metadata.get(sheet_name)
 
         except HttpError as error:
             print(f"An error occurred: {error}")
-            return False
+            return None
+
+    def _note_written_range(self, sheet_name, updated_range):
+        """
+        Grow the cached grid size after a write
+
+        values().update expands the grid automatically, so the cached
+        rowCount/columnCount is bumped to cover the range the API reports.
+        """
+        properties = (self._sheet_metadata or {}).get(sheet_name)
+        if not properties or not updated_range:
+            return
+
+        range_info = self._parse_range(updated_range.rsplit('!', 1)[-1])
+        if range_info:
+            properties['rowCount'] = max(properties['rowCount'], range_info['end_row'] + 1)
+            properties['columnCount'] = max(properties['columnCount'], range_info['end_col'] + 1)
+
+    def invalidate_metadata_cache(self):
+        """Drop cached sheet metadata so the next lookup re-fetches it"""
+        self._sheet_metadata = None
+
+    def get_metadata_cache_stats(self):
+        """
+        Report metadata cache usage (useful for watching API quota)
+
+        Returns:
+            Dict with 'hits' and 'misses' counts (each miss is one spreadsheets().get() call)
+        """
+        return {
+            'hits': self.metadata_cache_hits,
+            'misses': self.metadata_cache_misses,
+        }
+
+    def _handle_http_error(self, error):
+        """
+        Report an API error and drop stale metadata
+
+        A 404, or a 400 about an unknown range/grid, means the cached sheet
+        list no longer matches the spreadsheet (tab renamed, deleted or added
+        elsewhere), so the cache is invalidated and rebuilt on next use.
+        """
+        print(f"An error occurred: {error}")
+        status = getattr(getattr(error, 'resp', None), 'status', None)
+        if status in (400, 404):
+            self.invalidate_metadata_cache()
 
     def create_sheet(self, sheet_name):
         """
@@ -149,6 +756,7 @@ class SheetsManager:
         Args:
             sheet_name: Name of the sheet to create
         """
+        self._mark_spreadsheet_changed(sheet_name)
         try:
             if self.sheet_exists(sheet_name):
                 print(f"Sheet {sheet_name} already exists")
@@ -164,47 +772,43 @@ class SheetsManager:
 
             body = {'requests': requests}
 
-            self.service.spreadsheets().batchUpdate(
+            response = self._execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
                 body=body
-            ).execute()
+            ), 'write')
+
+            # Record the new tab in the metadata cache instead of re-fetching
+            replies = response.get('replies', [])
+            if self._sheet_metadata is not None and replies and 'addSheet' in replies[0]:
+                self._cache_sheet_properties(replies[0]['addSheet']['properties'])
 
             print(f"Created sheet: {sheet_name}")
 
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            self._handle_http_error(error)
 
     def clear_sheet(self, sheet_name):
         """Clear all data from a sheet (creates sheet if it doesn't exist)"""
+        self._mark_spreadsheet_changed(sheet_name)
         try:
             # Create sheet if it doesn't exist
             if not self.sheet_exists(sheet_name):
                 self.create_sheet(sheet_name)
                 return  # New sheet is already empty
 
-            self.service.spreadsheets().values().clear(
+            self._execute(self.service.spreadsheets().values().clear(
                 spreadsheetId=self.spreadsheet_id,
                 range=sheet_name
-            ).execute()
+            ), 'write')
             print(f"Sheet {sheet_name} cleared")
 
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            self._handle_http_error(error)
 
     def _get_sheet_id(self, sheet_name):
         """Helper method to get sheet ID from sheet name"""
-        try:
-            sheet_metadata = self.service.spreadsheets().get(
-                spreadsheetId=self.spreadsheet_id
-            ).execute()
-
-            for sheet in sheet_metadata.get('sheets', []):
-                if sheet['properties']['title'] == sheet_name:
-                    return sheet['properties']['sheetId']
-            return None
-        except HttpError as error:
-            print(f"An error occurred: {error}")
-            return None
+        properties = self._get_sheet_properties(sheet_name)
+        return properties['sheetId'] if properties else None
 
     def _parse_range(self, range_notation):
         """Helper method to parse range notation like 'A1:B10'"""
@@ -220,6 +824,108 @@ class SheetsManager:
             'end_row': int(match.group(4)) - 1
         }
 
+    @staticmethod
+    def _number_format(column_format):
+        """
+        Build a numberFormat dict from a column format spec
+
+        Args:
+            column_format: 'text', 'number' (whole numbers) or ('number', decimal_places)
+
+        Returns:
+            numberFormat dict for a repeatCell request
+        """
+        if column_format == 'text':
+            return {'type': 'TEXT'}
+
+        decimal_places = 0
+        if isinstance(column_format, tuple):
+            column_format, decimal_places = column_format
+        if column_format != 'number':
+            raise ValueError(f"Unknown column format: {column_format}")
+
+        # Create format pattern based on decimal places
+        if decimal_places == 0:
+            pattern = '#,##0'  # Whole number with thousands separator
+        else:
+            pattern = '#,##0.' + '0' * decimal_places  # Number with decimals
+
+        return {'type': 'NUMBER', 'pattern': pattern}
+
+    @staticmethod
+    def _repeat_cell_request(sheet_id, range_info, number_format):
+        """Build a repeatCell request applying number_format to a parsed range"""
+        grid_range = {
+            'sheetId': sheet_id,
+            'startRowIndex': range_info['start_row'],
+            'startColumnIndex': range_info['start_col'],
+            'endColumnIndex': range_info['end_col'] + 1
+        }
+        if range_info.get('end_row') is not None:
+            grid_range['endRowIndex'] = range_info['end_row'] + 1
+
+        return {
+            'repeatCell': {
+                'range': grid_range,
+                'cell': {
+                    'userEnteredFormat': {
+                        'numberFormat': number_format
+                    }
+                },
+                'fields': 'userEnteredFormat.numberFormat'
+            }
+        }
+
+    def _column_format_requests(self, sheet_id, formats, start_row=2, end_row=None):
+        """Build one repeatCell request per column in a {column: format} spec"""
+        requests = []
+        for column, column_format in formats.items():
+            col_index = self._column_letter_to_index(column)
+            range_info = {
+                'start_row': start_row - 1,
+                'end_row': end_row - 1 if end_row is not None else None,
+                'start_col': col_index,
+                'end_col': col_index
+            }
+            requests.append(self._repeat_cell_request(
+                sheet_id, range_info, self._number_format(column_format)))
+        return requests
+
+    def apply_formats(self, sheet_name, formats, end_row=None, start_row=2):
+        """
+        Apply number formats to several columns in a single batchUpdate
+
+        Args:
+            sheet_name: Name of the sheet tab
+            formats: Dict of column letter -> format, e.g.
+                {'A': 'text', 'E': ('number', 2), 'K': 'number'}
+                'number' alone means whole numbers (0 decimals)
+            end_row: Last row to format (1-based). If None, formats to the bottom of the sheet.
+            start_row: First row to format (1-based, default 2 to skip the header)
+        """
+        if not formats:
+            return
+
+        try:
+            sheet_id = self._get_sheet_id(sheet_name)
+            if sheet_id is None:
+                print(f"Sheet {sheet_name} not found")
+                return
+
+            requests = self._column_format_requests(sheet_id, formats, start_row, end_row)
+
+            body = {'requests': requests}
+
+            self._execute(self.service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body=body
+            ), 'write')
+
+            print(f"Formatted {len(requests)} columns in {sheet_name}")
+
+        except HttpError as error:
+            self._handle_http_error(error)
+
     def format_as_text(self, sheet_name, range_notation):
         """
         Format cells as plain text (to prevent scientific notation for barcodes)
@@ -239,37 +945,19 @@ class SheetsManager:
                 print("Invalid range notation")
                 return
 
-            requests = [{
-                'repeatCell': {
-                    'range': {
-                        'sheetId': sheet_id,
-                        'startRowIndex': range_info['start_row'],
-                        'endRowIndex': range_info['end_row'] + 1,
-                        'startColumnIndex': range_info['start_col'],
-                        'endColumnIndex': range_info['end_col'] + 1
-                    },
-                    'cell': {
-                        'userEnteredFormat': {
-                            'numberFormat': {
-                                'type': 'TEXT'
-                            }
-                        }
-                    },
-                    'fields': 'userEnteredFormat.numberFormat'
-                }
-            }]
+            requests = [self._repeat_cell_request(sheet_id, range_info, self._number_format('text'))]
 
             body = {'requests': requests}
 
-            self.service.spreadsheets().batchUpdate(
+            self._execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
                 body=body
-            ).execute()
+            ), 'write')
 
             print(f"Formatted {range_notation} in {sheet_name} as text")
 
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            self._handle_http_error(error)
 
     def format_as_number_2decimals(self, sheet_name, range_notation):
         """
@@ -301,44 +989,455 @@ class SheetsManager:
                 print("Invalid range notation")
                 return
 
-            # Create format pattern based on decimal places
-            if decimal_places == 0:
-                pattern = '#,##0'  # Whole number with thousands separator
-            else:
-                pattern = '#,##0.' + '0' * decimal_places  # Number with decimals
-
-            requests = [{
-                'repeatCell': {
-                    'range': {
-                        'sheetId': sheet_id,
-                        'startRowIndex': range_info['start_row'],
-                        'endRowIndex': range_info['end_row'] + 1,
-                        'startColumnIndex': range_info['start_col'],
-                        'endColumnIndex': range_info['end_col'] + 1
-                    },
-                    'cell': {
-                        'userEnteredFormat': {
-                            'numberFormat': {
-                                'type': 'NUMBER',
-                                'pattern': pattern
-                            }
-                        }
-                    },
-                    'fields': 'userEnteredFormat.numberFormat'
-                }
-            }]
+            number_format = self._number_format(('number', decimal_places))
+            requests = [self._repeat_cell_request(sheet_id, range_info, number_format)]
 
             body = {'requests': requests}
 
-            self.service.spreadsheets().batchUpdate(
+            self._execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.spreadsheet_id,
                 body=body
-            ).execute()
+            ), 'write')
 
             print(f"Formatted {range_notation} in {sheet_name} as number with {decimal_places} decimals")
 
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            self._handle_http_error(error)
+
+    @staticmethod
+    def _cell_data(value, as_text=False):
+        """
+        Convert a Python value to CellData for an updateCells request
+
+        Numbers stay numbers, '=...' strings become formulas and plain numeric
+        strings (see NUMBER_PATTERN, e.g. "1,199") become numbers. Everything
+        else, including dates, percents, "nan"/"inf" and NaN/infinite floats
+        (which JSON can't carry), is written as a string. Columns formatted as
+        text keep strings as-is.
+        """
+        if value is None or value == '':
+            return {}
+        if isinstance(value, bool):
+            return {'userEnteredValue': {'boolValue': value}}
+        if isinstance(value, (int, float)):
+            if math.isfinite(value):
+                return {'userEnteredValue': {'numberValue': value}}
+            return {'userEnteredValue': {'stringValue': str(value)}}
+
+        text = str(value)
+        if not as_text:
+            if text.startswith('='):
+                return {'userEnteredValue': {'formulaValue': text}}
+            if NUMBER_PATTERN.match(text):
+                return {'userEnteredValue': {'numberValue': float(text.replace(',', ''))}}
+        return {'userEnteredValue': {'stringValue': text}}
+
+    def _row_data(self, row, text_columns=()):
+        """RowData for updateCells/appendCells (text_columns: column indexes kept as strings)"""
+        return {'values': [
+            self._cell_data(value, as_text=(col_index in text_columns))
+            for col_index, value in enumerate(row)
+        ]}
+
+    @staticmethod
+    def _split_row_data(row_data, chunk_rows, chunk_bytes):
+        """
+        Split RowData into chunks bounded by row count and serialized JSON size
+
+        Sized on the RowData actually sent (each cell wrapped in
+        userEnteredValue), which is several times larger than the plain values.
+
+        Returns:
+            List of (row_offset, row_data)
+        """
+        chunks = []
+        current, current_bytes, offset = [], 0, 0
+
+        for row in row_data:
+            size = len(json.dumps(row)) + 2  # plus the ', ' separating rows
+
+            if current and (len(current) >= chunk_rows or current_bytes + size > chunk_bytes):
+                chunks.append((offset, current))
+                offset += len(current)
+                current, current_bytes = [], 0
+
+            current.append(row)
+            current_bytes += size
+
+        if current:
+            chunks.append((offset, current))
+
+        return chunks
+
+    def replace_sheet(self, sheet_name, rows, formats=None):
+        """
+        Replace a sheet's contents and formatting in a single batchUpdate
+
+        Creating the tab if missing, resizing the grid, clearing old values,
+        writing new values and applying column formats go in one API call,
+        which Sheets applies atomically. The row count is shrunk to fit the
+        data, so stale trailing rows disappear.
+
+        Data larger than one write chunk (see WRITE_CHUNK_ROWS/BYTES) goes in
+        with the first chunk; the remaining chunks follow as further
+        updateCells requests into the already resized and formatted grid, so
+        every cell is converted the same way (see _cell_data). Each of those
+        is a separate request: if one fails, the tab is left holding only the
+        rows before it, and calling replace_sheet again rewrites it.
+
+        Args:
+            sheet_name: Name of the sheet tab
+            rows: List of lists (header row first)
+            formats: Optional {column: format} dict, as accepted by apply_formats().
+                Applied from row 2 to the last data row.
+
+        Returns:
+            The batchUpdate response, or None on error
+        """
+        return self.replace_sheets({sheet_name: (rows, formats)})
+
+    def replace_sheets(self, tables):
+        """
+        Replace several sheets' contents and formatting, batching the tabs together
+
+        Same as replace_sheet() for each tab, but the requests for the tabs
+        (up to each tab's first chunk) share a batchUpdate while they fit in
+        WRITE_CHUNK_BYTES, so related output tabs are usually updated in one
+        write request. Only a single request is atomic: when the tabs need
+        several (large outputs), or a tab has further chunks, a failure part
+        way leaves the tabs written so far in place and the rest unchanged
+        or partly written. Calling replace_sheets again rewrites them all.
+
+        Args:
+            tables: Dict of sheet name -> (rows, formats), as taken by replace_sheet()
+
+        Returns:
+            The batchUpdate response (replies from every request), or None on error
+        """
+        written = []
+        # Tabs created in this batch need IDs distinct from each other too
+        new_ids = []
+
+        try:
+            # New tabs get sheet IDs chosen here, so when a tab has to be
+            # created the sheet list is fetched fresh (a failure aborts the
+            # write rather than guessing IDs from a missing or stale list)
+            if self._sheet_metadata is None or any(name not in self._sheet_metadata for name in tables):
+                self._load_sheet_metadata()
+
+            for sheet_name, (rows, formats) in tables.items():
+                formats = formats or {}
+                text_columns = {
+                    self._column_letter_to_index(column)
+                    for column, column_format in formats.items() if column_format == 'text'
+                }
+                requests = []
+
+                # Keep at least 2 rows so a frozen header row never blocks the resize
+                row_count = max(len(rows), 2)
+                width = max((len(row) for row in rows), default=1)
+
+                self._mark_spreadsheet_changed(sheet_name)
+                properties = self._get_sheet_properties(sheet_name)
+
+                if properties is None:
+                    # Create the tab inside the same batch with an ID we choose
+                    existing_ids = [p['sheetId'] for p in (self._sheet_metadata or {}).values()]
+                    sheet_id = max(existing_ids + new_ids, default=0) + 1
+                    new_ids.append(sheet_id)
+                    column_count = max(width, 26)
+                    requests.append({
+                        'addSheet': {
+                            'properties': {
+                                'sheetId': sheet_id,
+                                'title': sheet_name,
+                                'gridProperties': {'rowCount': row_count, 'columnCount': column_count}
+                            }
+                        }
+                    })
+                else:
+                    sheet_id = properties['sheetId']
+                    column_count = max(width, properties['columnCount'])
+                    requests.append({
+                        'updateSheetProperties': {
+                            'properties': {
+                                'sheetId': sheet_id,
+                                'gridProperties': {'rowCount': row_count, 'columnCount': column_count}
+                            },
+                            'fields': 'gridProperties.rowCount,gridProperties.columnCount'
+                        }
+                    })
+                    # Clear every remaining value (no rows given = clear the fields)
+                    requests.append({
+                        'updateCells': {
+                            'range': {'sheetId': sheet_id},
+                            'fields': 'userEnteredValue'
+                        }
+                    })
+
+                row_data = [
+                    self._row_data(row, text_columns if row_index > 0 else ())
+                    for row_index, row in enumerate(rows)
+                ]
+                chunks = self._split_row_data(row_data, WRITE_CHUNK_ROWS, WRITE_CHUNK_BYTES)
+
+                if chunks:
+                    requests.append({
+                        'updateCells': {
+                            'start': {'sheetId': sheet_id, 'rowIndex': 0, 'columnIndex': 0},
+                            'rows': chunks[0][1],
+                            'fields': 'userEnteredValue'
+                        }
+                    })
+
+                if formats and len(rows) > 1:
+                    requests.extend(self._column_format_requests(sheet_id, formats, end_row=len(rows)))
+
+                written.append({
+                    'sheet_name': sheet_name,
+                    'row_total': len(rows),
+                    'sheet_id': sheet_id,
+                    'row_count': row_count,
+                    'column_count': column_count,
+                    'requests': requests,
+                    'size': len(json.dumps(requests)),
+                    'chunks': chunks[1:],
+                })
+
+            if not written:
+                return None
+
+            # Tabs share a batchUpdate while their requests fit in one write chunk
+            batches = []
+            for tab in written:
+                if batches and batches[-1]['size'] + tab['size'] <= WRITE_CHUNK_BYTES:
+                    batches[-1]['tabs'].append(tab)
+                    batches[-1]['size'] += tab['size']
+                else:
+                    batches.append({'tabs': [tab], 'size': tab['size']})
+
+            response = None
+            for batch in batches:
+                reply = self._execute(self.service.spreadsheets().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={'requests': [request for tab in batch['tabs'] for request in tab['requests']]}
+                ), 'write')
+                if response is None:
+                    response = reply
+                else:
+                    response.setdefault('replies', []).extend(reply.get('replies', []))
+
+                for tab in batch['tabs']:
+                    if self._sheet_metadata is not None:
+                        self._sheet_metadata[tab['sheet_name']] = {
+                            'sheetId': tab['sheet_id'],
+                            'rowCount': tab['row_count'],
+                            'columnCount': tab['column_count'],
+                        }
+
+            if len(batches) > 1:
+                print(f"[INFO] {len(written)} tabs were too large for one request; written in {len(batches)} batches")
+
+            for tab in written:
+                for offset, chunk_rows in tab['chunks']:
+                    self._execute(self.service.spreadsheets().batchUpdate(
+                        spreadsheetId=self.spreadsheet_id,
+                        body={'requests': [{
+                            'updateCells': {
+                                'start': {'sheetId': tab['sheet_id'], 'rowIndex': offset, 'columnIndex': 0},
+                                'rows': chunk_rows,
+                                'fields': 'userEnteredValue'
+                            }
+                        }]}
+                    ), 'write')
+
+                print(f"{tab['row_total']} rows written to {tab['sheet_name']} (replaced)")
+
+            return response
+
+        except HttpError as error:
+            self._handle_http_error(error)
+            return None
+
+    @staticmethod
+    def _comparable(value):
+        """
+        Normalize a cell value for diffing
+
+        New rows hold Python values while the sheet reads back numbers,
+        strings and booleans, so numbers and numeric strings compare as
+        floats ("1,199" == 1199.0) and blanks compare as ''.
+        """
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return round(float(value), 9)
+        text = str(value)
+        try:
+            return round(float(text.replace(',', '')), 9)
+        except ValueError:
+            return text
+
+    def _keyed_rows(self, rows, key_indexes):
+        """
+        Map row keys to row positions
+
+        Duplicate keys (e.g. the same item twice on one invoice) get an
+        occurrence number so the n-th duplicate pairs with the n-th duplicate.
+
+        Returns:
+            Dict of (key..., occurrence) -> index into rows
+        """
+        keyed = {}
+        seen = {}
+        for index, row in enumerate(rows):
+            key = tuple(self._comparable(row[i] if i < len(row) else '') for i in key_indexes)
+            occurrence = seen.get(key, 0)
+            seen[key] = occurrence + 1
+            keyed[key + (occurrence,)] = index
+        return keyed
+
+    @staticmethod
+    def _runs(indexes):
+        """Group sorted row indexes into (start, end) runs of consecutive rows (end exclusive)"""
+        runs = []
+        for index in indexes:
+            if runs and runs[-1][1] == index:
+                runs[-1][1] = index + 1
+            else:
+                runs.append([index, index + 1])
+        return [tuple(run) for run in runs]
+
+    def upsert_rows(self, sheet_name, rows, key_columns, formats=None):
+        """
+        Bring a sheet in line with new rows by sending only the differences
+
+        The current tab is read straight from the API (never from the local
+        sheet cache, whose Drive revision can lag behind browser edits, so a
+        stale copy would produce wrong updates) and matched to the new rows
+        by key. Rows whose values changed are rewritten in place,
+        rows that disappeared are deleted and new rows are appended at the
+        bottom - all in one batchUpdate. Falls back to replace_sheet() when the
+        tab is missing, the header changed, or so much changed that a full
+        rewrite is cheaper (see UPSERT_MAX_CHANGE_RATIO in config.py).
+
+        Note that appended rows go to the end, so the tab keeps its existing
+        order rather than the order of `rows`.
+
+        Args:
+            sheet_name: Name of the sheet tab
+            rows: List of lists (header row first), as for replace_sheet()
+            key_columns: Header names that identify a row, e.g. ['ID']
+            formats: Optional {column: format} dict, as accepted by apply_formats()
+
+        Returns:
+            Dict with 'updated', 'appended' and 'deleted' row counts, or None on error
+        """
+        formats = formats or {}
+        header = rows[0] if rows else []
+        missing = [column for column in key_columns if column not in header]
+        if missing:
+            raise ValueError(f"Key columns not in header: {', '.join(missing)}")
+
+        if not self.sheet_exists(sheet_name):
+            return self._upsert_by_replacing(sheet_name, rows, formats, "new sheet")
+
+        # FORMULA render returns formulas as written and raw values otherwise,
+        # which is what the new rows hold
+        current = self.read_sheet(sheet_name, value_render_option='FORMULA', use_cache=False)
+        if not current or [self._comparable(v) for v in current[0]] != [self._comparable(v) for v in header]:
+            return self._upsert_by_replacing(sheet_name, rows, formats, "header changed")
+
+        width = len(header)
+        key_indexes = [header.index(column) for column in key_columns]
+        old_keyed = self._keyed_rows(current[1:], key_indexes)
+        new_keyed = self._keyed_rows(rows[1:], key_indexes)
+
+        def padded(row):
+            return [self._comparable(v) for v in row[:width]] + [''] * (width - len(row))
+
+        changed = []  # (sheet row index, new row)
+        for key, new_index in new_keyed.items():
+            old_index = old_keyed.get(key)
+            if old_index is not None and padded(current[1 + old_index]) != padded(rows[1 + new_index]):
+                changed.append((1 + old_index, rows[1 + new_index]))
+        deleted = sorted(1 + old_index for key, old_index in old_keyed.items() if key not in new_keyed)
+        appended = [rows[1 + new_index] for key, new_index in sorted(new_keyed.items(), key=lambda item: item[1])
+                    if key not in old_keyed]
+
+        total = len(changed) + len(deleted) + len(appended)
+        if total == 0:
+            print(f"{sheet_name} is already up to date")
+            return {'updated': 0, 'appended': 0, 'deleted': 0}
+        if total > max(len(rows) - 1, 1) * UPSERT_MAX_CHANGE_RATIO or total > WRITE_CHUNK_ROWS:
+            return self._upsert_by_replacing(sheet_name, rows, formats, f"{total} rows changed")
+
+        text_columns = {
+            self._column_letter_to_index(column)
+            for column, column_format in formats.items() if column_format == 'text'
+        }
+
+        self._mark_spreadsheet_changed(sheet_name)
+        try:
+            sheet_id = self._get_sheet_id(sheet_name)
+            requests = []
+
+            # In-place updates first, while row positions are still the ones we read
+            for row_index, row in sorted(changed):
+                requests.append({
+                    'updateCells': {
+                        'start': {'sheetId': sheet_id, 'rowIndex': row_index, 'columnIndex': 0},
+                        'rows': [self._row_data(row[:width] + [''] * (width - len(row)), text_columns)],
+                        'fields': 'userEnteredValue'
+                    }
+                })
+
+            # Deletes bottom-up so earlier indexes stay valid
+            for start, end in reversed(self._runs(deleted)):
+                requests.append({
+                    'deleteDimension': {
+                        'range': {'sheetId': sheet_id, 'dimension': 'ROWS', 'startIndex': start, 'endIndex': end}
+                    }
+                })
+
+            if appended:
+                requests.append({
+                    'appendCells': {
+                        'sheetId': sheet_id,
+                        'rows': [self._row_data(row, text_columns) for row in appended],
+                        'fields': 'userEnteredValue'
+                    }
+                })
+                # Formats were applied down to the old last row, so extend them
+                first_new = len(current) - len(deleted) + 1
+                if formats:
+                    requests.extend(self._column_format_requests(
+                        sheet_id, formats, start_row=first_new, end_row=first_new + len(appended) - 1))
+
+            self._execute(self.service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'requests': requests}
+            ), 'write')
+
+            properties = (self._sheet_metadata or {}).get(sheet_name)
+            if properties:
+                properties['rowCount'] = max(properties['rowCount'] - len(deleted) + len(appended), 2)
+
+            print(f"{sheet_name}: {len(changed)} rows updated, {len(appended)} appended, {len(deleted)} deleted")
+            return {'updated': len(changed), 'appended': len(appended), 'deleted': len(deleted)}
+
+        except HttpError as error:
+            self._handle_http_error(error)
+            return None
+
+    def _upsert_by_replacing(self, sheet_name, rows, formats, reason):
+        """Full rewrite path for upsert_rows()"""
+        print(f"Rewriting {sheet_name} in full ({reason})")
+        if self.replace_sheet(sheet_name, rows, formats=formats) is None:
+            return None
+        return {'updated': 0, 'appended': len(rows) - 1, 'deleted': 0, 'replaced': True}
 
     def write_formulas(self, sheet_name, formulas, start_cell='A1'):
         """
@@ -349,6 +1448,7 @@ class SheetsManager:
             formulas: List of lists containing formulas
             start_cell: Starting cell (default 'A1')
         """
+        self._mark_spreadsheet_changed(sheet_name)
         try:
             # Create sheet if it doesn't exist
             if not self.sheet_exists(sheet_name):
@@ -360,18 +1460,20 @@ class SheetsManager:
                 'values': formulas
             }
 
-            result = self.service.spreadsheets().values().update(
+            result = self._execute(self.service.spreadsheets().values().update(
                 spreadsheetId=self.spreadsheet_id,
                 range=range_name,
                 valueInputOption='USER_ENTERED',  # Important: USER_ENTERED to process formulas
                 body=body
-            ).execute()
+            ), 'write')
+
+            self._note_written_range(sheet_name, result.get('updatedRange'))
 
             print(f"{result.get('updatedCells')} formula cells updated in {sheet_name}")
             return result
 
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            self._handle_http_error(error)
             return None
 
     @staticmethod